@@ -1,60 +1,144 @@
+import os
+import time
 import tkinter as tk
 from tkinter import messagebox
-import math
-import sqlite3
-from datetime import datetime
-import pickle
-import tkinter.ttk as ttk
-
-# Функция для расчета мощности ветрогенератора.
-# Принимает на вход скорость ветра (в м/с), радиус ротора (в метрах),
-# коэффициенты КПД генератора и редуктора.
-# Возвращает прогнозируемую мощность ветрогенератора (в ваттах).
-def wind_power(speed, rotor_radius, generator_efficiency, gearbox_efficiency):
-    # Плотность воздуха (кг/м³)
-    density = 1.2041  
-    # Коэффициент мощности (КПД) ветроэнергетической установки
-    cp = 0.593  
-    # Площадь поперечного сечения ротора (м²)
-    area = math.pi * rotor_radius ** 2  
-    # Расчет мощности ветрогенератора по формуле
-    power = 0.5 * area * density * speed ** 3 * cp * generator_efficiency * gearbox_efficiency
-    return power
-
-
-# Функция для расчета энергии
-def calculate_energy(power):
-    hours_in_day = 24
-    days_in_month = 30
-    months_in_year = 12
-    energy_per_day = power / 1000 * hours_in_day
-    energy_per_month = energy_per_day * days_in_month
-    energy_per_year = energy_per_month * months_in_year
-    return energy_per_day, energy_per_month, energy_per_year
-
-# Функция для сохранения в базу данных SQLite
-def save_to_database(speed, radius, generator_efficiency, gearbox_efficiency, power, date_time):
-    conn = sqlite3.connect('wind_power_results.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS wind_power_results
-                 (speed REAL, radius REAL, generator_efficiency REAL,
-                 gearbox_efficiency REAL, power REAL, date_time TEXT)''')
-    c.execute("INSERT INTO wind_power_results VALUES (?, ?, ?, ?, ?, ?)",
-              (speed, radius, generator_efficiency, gearbox_efficiency, power, date_time))
-    conn.commit()
-    conn.close()
-
-
-
-
 
+from calcveu_core import (wind_power, calculate_energy, calculate_nominal_power, calculate_ground_area,
+                          calculate_battery_bank_cost, calculate_wind_turbine_economics,
+                          calculate_wind_turbine_parameters)
+from calcveu_metrics import PROFILE_VARIABLE, metrics, start_run, finish_run
+from calcveu_settings import SettingsStore
 
+# Модули, которые нужны только в отдельных окнах и при работе с базой данных (ttk, datetime,
+# sqlite3 в calcveu_db, concurrent.futures в calcveu_tasks), импортируются при первом
+# обращении: так главное окно появляется быстрее.
 
+# Переменная окружения для проверки времени запуска (calcveu_bench.py --startup)
+STARTUP_CHECK_VARIABLE = "CALCVEU_STARTUP_CHECK"
+
+# Введенные значения и история ввода всех окон (calcveu_settings.json)
+settings = SettingsStore()
+
+
+# Подключение истории ввода к полям окна dialog (entries — {имя поля: Entry}).
+# Поля заполняются последними введенными значениями, клавиши ↑ и ↓ в любом поле перебирают
+# историю ввода окна. Возвращает команду для кнопки расчета: она сохраняет значения полей
+# в историю и вызывает command.
+def attach_history(dialog, entries, command):
+    for name, value in settings.values(dialog).items():
+        if name in entries:
+            entries[name].insert(0, value)
+    position = {"index": -1}
+
+    def show_history(step):
+        history = settings.history(dialog)
+        if history:
+            position["index"] = min(max(position["index"] + step, 0), len(history) - 1)
+            for name, entry in entries.items():
+                entry.delete(0, tk.END)
+                entry.insert(0, history[position["index"]].get(name, ""))
+        return "break"
+
+    for entry in entries.values():
+        entry.bind("<Up>", lambda event: show_history(1))
+        entry.bind("<Down>", lambda event: show_history(-1))
+
+    def submit():
+        position["index"] = -1
+        settings.record(dialog, {name: entry.get() for name, entry in entries.items()})
+        command()
+
+    return submit
+
+
+# Фоновый исполнитель: расчеты и работа с базой данных выполняются вне главного цикла Tk,
+# а результаты передаются обратно через очередь, которую опрашивает poll_background_tasks.
+# Создается при первой фоновой задаче.
+background = None
+
+
+def get_background_executor():
+    global background
+    if background is None:
+        from calcveu_tasks import BackgroundExecutor
+
+        background = BackgroundExecutor()
+    return background
+
+
+# Периодическая обработка результатов фоновых задач в потоке интерфейса
+def poll_background_tasks():
+    if background is not None:
+        background.process_events()
+    root.after(50, poll_background_tasks)
+
+
+# Окно хода выполнения длительной задачи с кнопкой отмены
+def show_progress_window(task, title):
+    import tkinter.ttk as ttk
+
+    progress_window = tk.Toplevel(root)
+    progress_window.title(title)
+    progress_window.geometry("350x130")
+
+    progress_label = tk.Label(progress_window, text=title, font=("Arial", 12))
+    progress_label.pack(padx=10, pady=10)
+    progress_bar = ttk.Progressbar(progress_window, mode="indeterminate", length=300)
+    progress_bar.pack(padx=10)
+    progress_bar.start(10)
+
+    def update_progress(fraction, text):
+        if not progress_window.winfo_exists():
+            return
+        progress_bar.stop()
+        progress_bar.config(mode="determinate", value=fraction * 100)
+        if text:
+            progress_label.config(text=text)
+
+    def cancel():
+        task.cancel()
+        progress_window.destroy()
+
+    cancel_button = tk.Button(progress_window, text="Отмена", command=cancel)
+    cancel_button.pack(pady=10)
+    progress_window.protocol("WM_DELETE_WINDOW", cancel)
+    task.on_progress = update_progress
+    return progress_window
+
+
+# Запуск функции в фоновом потоке.
+# on_done вызывается с результатом в потоке интерфейса; ошибки показываются в окне сообщения
+# или, если задан on_error, передаются ему (тоже в потоке интерфейса).
+# Если задан title, на время выполнения показывается окно хода выполнения с кнопкой отмены.
+def run_in_background(function, *args, on_done=None, on_error=None, title=None, with_task=False):
+    progress_window = None
+
+    def close_progress_window():
+        if progress_window is not None and progress_window.winfo_exists():
+            progress_window.destroy()
+
+    def done(result):
+        close_progress_window()
+        if on_done is not None:
+            on_done(result)
+
+    def error(e):
+        close_progress_window()
+        if on_error is not None:
+            on_error(e)
+        else:
+            messagebox.showerror("Ошибка", str(e))
 
+    task = get_background_executor().submit(function, *args, on_done=done, on_error=error, with_task=with_task)
+    if title is not None:
+        progress_window = show_progress_window(task, title)
+    return task
 
 
 # Функция для отображения окна с результатами
 def show_results(power, energy_per_day, energy_per_month, energy_per_year):
+    from calcveu_db import save_to_database
+
     result_window = tk.Toplevel(root)
     result_window.title("Результаты расчета")
     result_window.geometry("400x300")
@@ -67,66 +151,228 @@ def show_results(power, energy_per_day, energy_per_month, energy_per_year):
                              font=("Arial", 12))
     result_label.pack(padx=10, pady=10)
 
-    save_button = tk.Button(result_window, text="Сохранить в базу данных", command=lambda: save_to_database(
-        float(speed_entry.get()), float(radius_entry.get()), float(generator_eff_entry.get()),
-        float(gearbox_eff_entry.get()), power, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    save_button = tk.Button(result_window, text="Сохранить в базу данных", command=lambda: run_in_background(
+        save_to_database, float(speed_entry.get()), float(radius_entry.get()), float(generator_eff_entry.get()),
+        float(gearbox_eff_entry.get()), power, energy_per_day, energy_per_month, energy_per_year))
     save_button.pack(pady=5)
 
     show_database_button = tk.Button(result_window, text="Просмотреть базу данных", command=show_database)
     show_database_button.pack(pady=5)
 
 
+# Количество строк, загружаемых в таблицу за один запрос
+DATABASE_PAGE_SIZE = 200
+
+
 def show_database():
-    conn = sqlite3.connect('wind_power_results.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM wind_power_results")
-    rows = c.fetchall()
-    conn.close()
+    import threading
+    import tkinter.ttk as ttk
+    from datetime import datetime
+    from calcveu_db import RESULT_COLUMNS, open_results_reader
 
     # Отображение результатов из базы данных
     result_window = tk.Toplevel(root)
     result_window.title("Результаты из базы данных")
     result_window.geometry("1500x400")
 
-    tree = ttk.Treeview(result_window)
-    tree["columns"] = ("speed", "radius", "generator_efficiency", "gearbox_efficiency", "power", "date_time")
-    tree.heading("speed", text="Скорость")
-    tree.heading("radius", text="Радиус")
-    tree.heading("generator_efficiency", text="КПД генератора")
-    tree.heading("gearbox_efficiency", text="КПД редуктора")
-    tree.heading("power", text="Мощность")
-    tree.heading("date_time", text="Дата и время")
-    
-    for row in rows:
-        formatted_datetime = datetime.fromisoformat(row[5]).strftime("%Y-%m-%d %H:%M:%S")
-        tree.insert("", "end", values=(row[0], row[1], row[2], row[3], row[4], formatted_datetime))
-
-    tree.pack(expand=True, fill="both")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # Панель фильтров: диапазоны скорости, радиуса, даты и номера запуска
+    filter_frame = tk.Frame(result_window)
+    filter_frame.pack(fill="x", padx=10, pady=5)
+    filter_entries = {}
+    filter_columns = (("speed", "Скорость"), ("radius", "Радиус"), ("timestamp", "Дата"), ("run_id", "Запуск"))
+    for column, (name, text) in enumerate(filter_columns):
+        tk.Label(filter_frame, text=f"{text} от:").grid(row=0, column=column * 4, padx=5)
+        low_entry = tk.Entry(filter_frame, width=12)
+        low_entry.grid(row=0, column=column * 4 + 1)
+        tk.Label(filter_frame, text="до:").grid(row=0, column=column * 4 + 2, padx=5)
+        high_entry = tk.Entry(filter_frame, width=12)
+        high_entry.grid(row=0, column=column * 4 + 3)
+        filter_entries[name] = (low_entry, high_entry)
+
+    status_label = tk.Label(result_window, text="", anchor="w")
+
+    tree_frame = tk.Frame(result_window)
+    tree_frame.pack(expand=True, fill="both")
+    tree = ttk.Treeview(tree_frame)
+    scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+    tree["columns"] = RESULT_COLUMNS
+    headings = {"run_id": "Запуск", "timestamp": "Дата и время", "speed": "Скорость", "radius": "Радиус",
+                "generator_efficiency": "КПД генератора", "gearbox_efficiency": "КПД редуктора", "power": "Мощность",
+                "energy_per_day": "Энергия в сутки", "energy_per_month": "Энергия в месяц",
+                "energy_per_year": "Энергия в год"}
+
+    # Состояние просмотра: сортировка, фильтры и ключ последней загруженной строки.
+    # Запросы выполняются в фоне; generation отбрасывает ответы, пришедшие после смены
+    # сортировки или фильтров.
+    state = {"sort_column": "timestamp", "descending": False, "filters": {}, "generation": 0,
+             "after": None, "exhausted": False, "loading": False, "loaded": 0, "total": 0}
+
+    # У окна свое соединение только для чтения (открывается в фоне при первом запросе):
+    # отмена подсчета прерывает только запросы этого окна и не затрагивает запись результатов
+    reader = {"repository": None, "closed": False}
+    reader_lock = threading.Lock()
+
+    def get_reader():
+        with reader_lock:
+            if reader["closed"]:
+                raise ValueError("Окно просмотра базы данных закрыто")
+            if reader["repository"] is None:
+                reader["repository"] = open_results_reader()
+            return reader["repository"]
+
+    # При закрытии окна выполняющийся запрос прерывается, и соединение закрывается
+    def close_reader(event):
+        if event.widget is not result_window:
+            return
+        with reader_lock:
+            repository, reader["repository"] = reader["repository"], None
+            reader["closed"] = True
+        if repository is not None:
+            repository.interrupt()
+            repository.close()
+
+    result_window.bind("<Destroy>", close_reader)
+
+    # Ошибки запросов показываются, только пока окно открыто
+    def show_error(e):
+        if tree.winfo_exists():
+            messagebox.showerror("Ошибка", str(e))
 
+    def fetch_page(sort_column, descending, after, filters):
+        return get_reader().fetch_page(sort_column, descending, after, DATABASE_PAGE_SIZE, filters)
+
+    def load_next_page():
+        if state["exhausted"] or state["loading"]:
+            return
+        state["loading"] = True
+        generation = state["generation"]
+        run_in_background(fetch_page, state["sort_column"], state["descending"], state["after"], state["filters"],
+                          on_done=lambda result: insert_page(generation, result),
+                          on_error=lambda e: page_failed(generation, e))
+
+    # После ошибки загрузка страницы повторяется при следующей прокрутке
+    def page_failed(generation, e):
+        if generation == state["generation"]:
+            state["loading"] = False
+        show_error(e)
+
+    def insert_page(generation, result):
+        if generation != state["generation"] or not tree.winfo_exists():
+            return
+        rows, state["after"] = result
+        state["loading"] = False
+        if len(rows) < DATABASE_PAGE_SIZE:
+            state["exhausted"] = True
+        timestamp_index = RESULT_COLUMNS.index("timestamp") + 1
+        for row in rows:
+            values = list(row[1:])
+            values[timestamp_index - 1] = datetime.fromtimestamp(row[timestamp_index]).strftime("%Y-%m-%d %H:%M:%S")
+            tree.insert("", "end", iid=row[0], values=values)
+        state["loaded"] += len(rows)
+        status_label.config(text=f"Показано {state['loaded']} из {state['total']}")
+
+    # Подсчет строк может занять время на большой таблице, поэтому показывается окно
+    # хода выполнения; отмена прерывает запрос к базе данных
+    def count_rows(task, filters):
+        repository = get_reader()
+        task.cancel_callbacks.append(repository.interrupt)
+        return repository.count(filters)
+
+    def reload():
+        tree.delete(*tree.get_children())
+        state["generation"] += 1
+        generation = state["generation"]
+        state.update(after=None, exhausted=False, loading=False, loaded=0, total=0)
+        status_label.config(text="Загрузка...")
+
+        def counted(total):
+            if generation != state["generation"] or not tree.winfo_exists():
+                return
+            state["total"] = total
+            load_next_page()
+
+        task = run_in_background(count_rows, state["filters"], on_done=counted, on_error=show_error,
+                                 title="Загрузка результатов", with_task=True)
+        task.cancel_callbacks.append(lambda: status_label.config(text="Загрузка отменена"))
+
+    # Строки подгружаются, когда пользователь прокручивает таблицу к концу
+    def on_scroll(first, last):
+        scrollbar.set(first, last)
+        if float(last) > 0.9:
+            load_next_page()
+
+    # Сортировка на стороне базы данных; повторное нажатие меняет направление
+    def sort_by(column):
+        if state["sort_column"] == column:
+            state["descending"] = not state["descending"]
+        else:
+            state["sort_column"] = column
+            state["descending"] = False
+        reload()
 
+    def apply_filters():
+        filters = {}
+        try:
+            for name, (low_entry, high_entry) in filter_entries.items():
+                low, high = low_entry.get().strip() or None, high_entry.get().strip() or None
+                if name == "timestamp":
+                    # Дата без времени в верхней границе включает весь день; время хранится в секундах Unix
+                    if high is not None and len(high) == 10:
+                        high += " 23:59:59"
+                    low = int(datetime.fromisoformat(low).timestamp()) if low is not None else None
+                    high = int(datetime.fromisoformat(high).timestamp()) if high is not None else None
+                else:
+                    low = float(low) if low is not None else None
+                    high = float(high) if high is not None else None
+                if low is not None or high is not None:
+                    filters[name] = (low, high)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Пожалуйста, введите корректные числовые значения.")
+            return
+        state["filters"] = filters
+        reload()
 
+    apply_button = tk.Button(filter_frame, text="Применить", command=apply_filters)
+    apply_button.grid(row=0, column=len(filter_columns) * 4, padx=10)
+    summary_button = tk.Button(filter_frame, text="Сводка по запускам", command=show_run_summaries)
+    summary_button.grid(row=0, column=len(filter_columns) * 4 + 1, padx=10)
 
+    for column in RESULT_COLUMNS:
+        tree.heading(column, text=headings[column], command=lambda c=column: sort_by(c))
+    tree.configure(yscrollcommand=on_scroll)
 
+    scrollbar.pack(side="right", fill="y")
+    tree.pack(expand=True, fill="both")
+    status_label.pack(fill="x", padx=10)
+    reload()
+
+
+# Окно сводки по запускам: итоги читаются из сводной таблицы базы данных, а не из всех результатов
+def show_run_summaries():
+    import tkinter.ttk as ttk
+    from datetime import datetime
+    from calcveu_db import get_results_repository
+
+    summary_window = tk.Toplevel(root)
+    summary_window.title("Сводка по запускам")
+    summary_window.geometry("1200x300")
+    columns = (("run_id", "Запуск"), ("name", "Название"), ("created", "Создан"), ("rows", "Результатов"),
+               ("power_mean", "Средняя мощность"), ("power_min", "Мин. мощность"), ("power_max", "Макс. мощность"),
+               ("energy_per_year_sum", "Энергия в год (сумма)"))
+    tree = ttk.Treeview(summary_window, columns=[column for column, _ in columns], show="headings")
+    for column, text in columns:
+        tree.heading(column, text=text)
+        tree.column(column, width=140)
+    tree.pack(expand=True, fill="both")
 
+    def show(summaries):
+        if not tree.winfo_exists():
+            return
+        for summary in summaries:
+            summary["created"] = datetime.fromtimestamp(summary["created"]).strftime("%Y-%m-%d %H:%M:%S")
+            tree.insert("", "end", values=[summary[column] for column, _ in columns])
 
+    run_in_background(lambda: get_results_repository().run_summaries(), on_done=show)
 
 
 def calculate_power():
@@ -150,15 +396,17 @@ def calculate_power():
         if not (0.85 <= gearbox_efficiency <= 0.98):
             raise ValueError("КПД редуктора должен быть в диапазоне от 0.85 до 0.98")
 
-        # Расчет мощности ветрогенератора и соответствующей энергии
-        power = wind_power(speed, rotor_radius, generator_efficiency, gearbox_efficiency)
-        energy_per_day, energy_per_month, energy_per_year = calculate_energy(power)
+        # Расчет мощности и энергии выполняется в фоне
+        def calculate():
+            # Расчет мощности ветрогенератора и соответствующей энергии
+            with metrics.stage("wind_power"):
+                power = wind_power(speed, rotor_radius, generator_efficiency, gearbox_efficiency)
+            with metrics.stage("energy"):
+                energy_per_day, energy_per_month, energy_per_year = calculate_energy(power)
+            return power, energy_per_day, energy_per_month, energy_per_year
 
         # Отображение результатов расчетов
-        show_results(power, energy_per_day, energy_per_month, energy_per_year)
-
-        # Сохранение введенных значений в файл
-        save_values(speed, rotor_radius, generator_efficiency, gearbox_efficiency)
+        run_in_background(calculate, on_done=lambda result: show_results(*result))
 
     except ValueError as e:
         # В случае некорректного ввода отображается сообщение об ошибке
@@ -167,26 +415,6 @@ def calculate_power():
 
 
 
-# Функция для сохранения введенных данных
-def save_values(speed, radius, generator_efficiency, gearbox_efficiency):
-    # Сохраняем значения в файл
-    with open("values.pkl", "wb") as f:
-        pickle.dump((speed, radius, generator_efficiency, gearbox_efficiency), f)
-
-# Функция для загрузки последних введенных данных
-def load_values():
-    try:
-        # Загружаем значения из файла
-        with open("values.pkl", "rb") as f:
-            speed, radius, generator_efficiency, gearbox_efficiency = pickle.load(f)
-        # Вставляем загруженные значения в соответствующие поля
-        speed_entry.insert(0, speed)
-        radius_entry.insert(0, radius)
-        generator_eff_entry.insert(0, generator_efficiency)
-        gearbox_eff_entry.insert(0, gearbox_efficiency)
-    except FileNotFoundError:
-        pass  # Файл с сохраненными значениями не найден, игнорируем это
-
 # Создаем окно программы
 root = tk.Tk()
 root.title("Калькулятор ветрогенератора")
@@ -233,27 +461,17 @@ gearbox_eff_entry.grid(row=3, column=1, padx=10, pady=10)
 gearbox_eff_range_label = tk.Label(frame, text="от 0.85 до 0.98", font=("Arial", 10))
 gearbox_eff_range_label.grid(row=3, column=2, sticky="w", padx=5, pady=10)
 
-calculate_button = tk.Button(frame, text="Рассчитать", command=calculate_power, font=("Arial", 14))
+# Поля главного окна заполняются последними введенными значениями
+main_entries = {"speed": speed_entry, "radius": radius_entry, "generator_efficiency": generator_eff_entry,
+                "gearbox_efficiency": gearbox_eff_entry}
+calculate_button = tk.Button(frame, text="Рассчитать", command=attach_history("wind_power", main_entries, calculate_power),
+                             font=("Arial", 14))
 calculate_button.grid(row=10, columnspan=10, pady=30)
 
 
 
 
 
-def calculate_nominal_power(rotor_radius, generator_efficiency, wind_speed):
-    # Параметры для расчета номинальной мощности
-    density = 1.225  # Плотность воздуха в кг/м^3 (значение для стандартных атмосферных условий)
-    cp = 0.35  # Коэффициент мощности ветроэнергетической установки (может меняться в зависимости от типа и модели)
-    
-    # Вычисление площади поперечного сечения ротора
-    rotor_area = math.pi * (rotor_radius ** 2)
-    
-    # Вычисление номинальной мощности
-    nominal_power = 0.5 * density * cp * rotor_area * (wind_speed ** 3) * generator_efficiency
-    
-    return nominal_power
-
-
 def open_nominal_power_window():
     # Создание нового окна для ввода данных
     nominal_power_window = tk.Toplevel(root)
@@ -295,7 +513,11 @@ def open_nominal_power_window():
             messagebox.showerror("Ошибка", "Пожалуйста, введите корректные числовые значения.")
 
     # Создание кнопки для запуска расчета номинальной мощности
-    calculate_button = tk.Button(nominal_power_window, text="Рассчитать", command=calculate_nominal_power_from_window, font=("Arial", 12))
+    entries = {"rotor_radius": rotor_radius_entry, "generator_efficiency": generator_efficiency_entry,
+               "wind_speed": wind_speed_entry}
+    calculate_button = tk.Button(nominal_power_window, text="Рассчитать",
+                                 command=attach_history("nominal_power", entries, calculate_nominal_power_from_window),
+                                 font=("Arial", 12))
     calculate_button.grid(row=4, columnspan=2, pady=10)
 
 # Создание кнопки "Определение номинальной мощности ВЭУ"
@@ -333,7 +555,10 @@ def open_calculation_window():
     angle_entry.grid(row=2, column=1, padx=10, pady=5)
 
     # Создаем кнопку для выполнения расчета
-    calculate_button = tk.Button(calculation_window, text="Рассчитать", command=lambda: calculate_area_of_ground_surface(diameter_entry, height_entry, angle_entry), font=("Arial", 14))
+    entries = {"diameter": diameter_entry, "height": height_entry, "angle": angle_entry}
+    calculate_button = tk.Button(calculation_window, text="Рассчитать", command=attach_history(
+        "ground_area", entries, lambda: calculate_area_of_ground_surface(diameter_entry, height_entry, angle_entry)),
+        font=("Arial", 14))
     calculate_button.grid(row=3, columnspan=2, pady=10)
 
 def calculate_area_of_ground_surface(diameter_entry, height_entry, angle_entry):
@@ -343,21 +568,8 @@ def calculate_area_of_ground_surface(diameter_entry, height_entry, angle_entry):
         h = float(height_entry.get())
         omega = float(angle_entry.get())
 
-        # Проверка соответствия значений диапазонам
-        if not (5 <= d <= 100):
-            raise ValueError("Диаметр трубы мачты должен быть в диапазоне от 5 до 100 м")
-
-        if not (0 <= h <= 200):
-            raise ValueError("Высота мачты должна быть в диапазоне от 0 до 200 м")
-
-        if not (0 <= omega <= 90):
-            raise ValueError("Угол натяжения растяжек должен быть в диапазоне от 0 до 90 градусов")
-
         # Расчет площади занимаемой ВЭУ
-        S_m = math.pi * d ** 2 / 4
-        D_r = 2 * h * math.sin(math.radians(omega))
-        S_r = math.pi * D_r ** 2 / 4
-        total_area = S_m + S_r
+        total_area = calculate_ground_area(d, h, omega)
 
         # Отображение результата
         result_text = "Площадь занимаемой ВЭУ: {:.2f} кв.м".format(total_area)
@@ -418,7 +630,7 @@ def open_battery_parameters_window():
     # Создание нового окна для ввода параметров
     battery_window = tk.Toplevel()
     battery_window.title("Параметры аккумуляторных батарей")
-    battery_window.geometry("600x200")
+    battery_window.geometry("600x270")
 
     # Создание и размещение элементов управления для ввода параметров
     capacity_label = tk.Label(battery_window, text="Емкость батареи (А·ч):")
@@ -436,34 +648,79 @@ def open_battery_parameters_window():
     hours_entry = tk.Entry(battery_window)
     hours_entry.grid(row=2, column=1, padx=10, pady=5)
 
+    # Необязательные поля: при заданной нагрузке количество батарей подбирается по ней
+    load_label = tk.Label(battery_window, text="Средняя нагрузка (кВт, необязательно):")
+    load_label.grid(row=3, column=0, padx=10, pady=5)
+    load_entry = tk.Entry(battery_window)
+    load_entry.grid(row=3, column=1, padx=10, pady=5)
+
+    voltage_label = tk.Label(battery_window, text="Напряжение батареи (В):")
+    voltage_label.grid(row=4, column=0, padx=10, pady=5)
+    voltage_entry = tk.Entry(battery_window)
+    voltage_entry.grid(row=4, column=1, padx=10, pady=5)
+
     # Создание кнопки для запуска расчета
-    calculate_button = tk.Button(battery_window, text="Рассчитать", command=lambda: calculate_battery_cost(battery_window, capacity_entry.get(), quantity_entry.get(), hours_entry.get()))
-    calculate_button.grid(row=3, columnspan=2, pady=10)
+    entries = {"capacity": capacity_entry, "quantity": quantity_entry, "hours": hours_entry, "load": load_entry,
+               "voltage": voltage_entry}
+    calculate_button = tk.Button(battery_window, text="Рассчитать", command=attach_history(
+        "battery", entries,
+        lambda: calculate_battery_cost(battery_window, capacity_entry.get(), quantity_entry.get(), hours_entry.get(),
+                                       load_entry.get(), voltage_entry.get())))
+    calculate_button.grid(row=5, columnspan=2, pady=10)
+    if not voltage_entry.get():
+        voltage_entry.insert(0, "12")
 
     # Фокусируемся на первом поле ввода
     capacity_entry.focus_set()
 
-def calculate_battery_cost(window, capacity, quantity, hours):
+# Подбор батарей по нагрузке: график нагрузки на время гарантированного энергоснабжения без выработки,
+# емкость — минимальная без недоотпуска (size_battery_bank), с учетом допустимого остатка заряда
+def size_batteries_for_load(capacity, hours, load, voltage):
+    import numpy as np
+    from calcveu_hybrid import size_battery_bank
+
+    if hours <= 0 or load <= 0:
+        raise ValueError("Время энергоснабжения и нагрузка должны быть положительными")
+    steps = max(int(np.ceil(hours)), 1)
+    return size_battery_bank(np.zeros(steps), np.full(steps, load), step_hours=hours / steps,
+                             battery_capacity_ah=capacity, voltage=voltage)
+
+
+def calculate_battery_cost(window, capacity, quantity, hours, load="", voltage=""):
     try:
         # Преобразование входных данных в числа
         capacity = float(capacity)
         quantity = int(quantity)
         hours = int(hours)
+        load = float(load) if load.strip() else None
+        voltage = float(voltage) if voltage.strip() else 12.0
+    except ValueError:
+        messagebox.showerror("Ошибка", "Пожалуйста, введите корректные числовые значения.")
+        return
 
+    def show(sizing):
         # Расчет стоимости батарей
-        battery_cost_per_unit = 2000  # Стоимость одной аккумуляторной батареи
-        total_cost = quantity * battery_cost_per_unit
+        total_cost = calculate_battery_bank_cost(capacity, quantity)
+        result_text = f"Стоимость аккумуляторных батарей: {total_cost:.2f} руб."
+        if sizing is not None:
+            required = sizing['battery_count']
+            result_text += (f"\n\nТребуемая емкость при нагрузке {load} кВт: {sizing['capacity']:.2f} кВт·ч\n"
+                            f"Требуемое количество батарей: {required}\n"
+                            f"Стоимость требуемых батарей: {calculate_battery_bank_cost(capacity, required):.2f} руб.")
+            if required > quantity:
+                result_text += f"\nЗаданного количества ({quantity}) недостаточно."
 
         # Отображение результата
-        result_text = f"Стоимость аккумуляторных батарей: {total_cost} руб."
         messagebox.showinfo("Результат", result_text)
 
         # Закрытие окна после отображения результата
-        window.destroy()
+        if window.winfo_exists():
+            window.destroy()
 
-    except Exception as e:
-        # Обработка исключений, если что-то пошло не так
-        messagebox.showerror("Ошибка", str(e))
+    if load is None:
+        show(None)
+    else:
+        run_in_background(size_batteries_for_load, capacity, hours, load, voltage, on_done=show)
 
 
 def open_payback_period_window():
@@ -490,6 +747,25 @@ def open_payback_period_window():
 
 
 
+# Годовая выработка ГЭУ по синтетическим почасовым профилям (synthetic_profiles) и балансу
+# с нагрузкой и АКБ (simulate_dispatch). Мощность ВЭУ растет как куб скорости ветра до
+# расчетной скорости, выше — ограничена установленной; СБ — по модели модуля calcveu_solar.
+def geu_yearly_output(veu_power, sb_power, wind_speed, irradiance, temperature, load, battery_capacity):
+    import numpy as np
+    from calcveu_hybrid import (RATED_WIND_SPEED, simulate_dispatch, solar_unit_profile, synthetic_profiles,
+                                wind_unit_profile)
+
+    if veu_power < 0 or sb_power < 0 or load < 0 or battery_capacity < 0:
+        raise ValueError("Мощности, нагрузка и емкость АКБ не могут быть отрицательными")
+    wind_speeds, irradiances = synthetic_profiles(wind_speed, irradiance)
+    wind_profile = wind_unit_profile(np.minimum(wind_speeds, RATED_WIND_SPEED))
+    scale = veu_power / float(wind_unit_profile(RATED_WIND_SPEED))
+    solar_profile = solar_unit_profile(irradiances, temperature)
+    result = simulate_dispatch(wind_profile, solar_profile, np.full(len(wind_profile), load), scale, sb_power,
+                               battery_capacity)
+    return {name: float(value[0]) for name, value in result.items()}
+
+
 def calculate_geu_output():
     def open_geu_parameters_window():
         geu_params_window = tk.Toplevel()
@@ -515,36 +791,74 @@ def calculate_geu_output():
         sb_price_entry = tk.Entry(geu_params_window)
         sb_price_entry.grid(row=3, column=1, padx=10, pady=5)
 
-        calculate_button = tk.Button(geu_params_window, text="Рассчитать", command=lambda: calculate_geu_output_internal(veu_power_entry.get(), sb_power_entry.get(), veu_price_entry.get(), sb_price_entry.get()))
-        calculate_button.grid(row=4, columnspan=2, pady=10)
-
-    def calculate_geu_output_internal(veu_power, sb_power, veu_price, sb_price):
+        # Условия площадки для синтетических почасовых профилей ветра и освещенности
+        wind_speed_label = tk.Label(geu_params_window, text="Средняя скорость ветра (м/с):")
+        wind_speed_label.grid(row=4, column=0, padx=10, pady=5)
+        wind_speed_entry = tk.Entry(geu_params_window)
+        wind_speed_entry.grid(row=4, column=1, padx=10, pady=5)
+
+        irradiance_label = tk.Label(geu_params_window, text="Освещенность в полдень (Вт/м²):")
+        irradiance_label.grid(row=5, column=0, padx=10, pady=5)
+        irradiance_entry = tk.Entry(geu_params_window)
+        irradiance_entry.grid(row=5, column=1, padx=10, pady=5)
+
+        temperature_label = tk.Label(geu_params_window, text="Температура воздуха (°C):")
+        temperature_label.grid(row=6, column=0, padx=10, pady=5)
+        temperature_entry = tk.Entry(geu_params_window)
+        temperature_entry.grid(row=6, column=1, padx=10, pady=5)
+
+        # Необязательные поля: при заданной нагрузке рассчитываются недоотпуск и сброс выработки
+        load_label = tk.Label(geu_params_window, text="Средняя нагрузка (кВт, необязательно):")
+        load_label.grid(row=7, column=0, padx=10, pady=5)
+        load_entry = tk.Entry(geu_params_window)
+        load_entry.grid(row=7, column=1, padx=10, pady=5)
+
+        battery_label = tk.Label(geu_params_window, text="Емкость АКБ (кВт·ч, необязательно):")
+        battery_label.grid(row=8, column=0, padx=10, pady=5)
+        battery_entry = tk.Entry(geu_params_window)
+        battery_entry.grid(row=8, column=1, padx=10, pady=5)
+
+        entries = {"veu_power": veu_power_entry, "sb_power": sb_power_entry, "veu_price": veu_price_entry,
+                   "sb_price": sb_price_entry, "wind_speed": wind_speed_entry, "irradiance": irradiance_entry,
+                   "temperature": temperature_entry, "load": load_entry, "battery_capacity": battery_entry}
+        calculate_button = tk.Button(geu_params_window, text="Рассчитать", command=attach_history(
+            "geu", entries, lambda: calculate_geu_output_internal(
+                veu_power_entry.get(), sb_power_entry.get(), veu_price_entry.get(), sb_price_entry.get(),
+                wind_speed_entry.get(), irradiance_entry.get(), temperature_entry.get(), load_entry.get(),
+                battery_entry.get())))
+        calculate_button.grid(row=9, columnspan=2, pady=10)
+        for entry, default in ((wind_speed_entry, "5"), (irradiance_entry, "700"), (temperature_entry, "25")):
+            if not entry.get():
+                entry.insert(0, default)
+
+    def calculate_geu_output_internal(veu_power, sb_power, veu_price, sb_price, wind_speed, irradiance,
+                                      temperature, load, battery_capacity):
         try:
             veu_power = float(veu_power)
             sb_power = float(sb_power)
             veu_price = float(veu_price)
             sb_price = float(sb_price)
-            
-            geu_power = veu_power + sb_power  # Общая мощность ГЭУ, кВт
-            service_life = 20   # Срок службы оборудования, лет
-            repair_cost_per_year = 3000  # Расходы на ремонт в год, руб.
-            geu_amortization_per_hour = 1.83  # Амортизация ГЭУ в час, руб.
-            average_wind_speed = 5.0  # Средняя скорость ветра в регионе (м/с)
-            average_illumination = 700  # Средняя освещенность в регионе (Вт/м^2)
-            veu_power_at_avg_wind_speed = 0.400  # Мощность ВЭУ на средней скорости ветра, кВт
-            sb_power_at_avg_illumination = 2.1  # Мощность СБ на средней освещенности, кВт
-
-            # Расчет выработки электроэнергии ГЭУ
-            veu_output = veu_power_at_avg_wind_speed * veu_power  # Выработка энергии ВЭУ при средней скорости ветра, кВт*ч
-            sb_output = sb_power_at_avg_illumination * sb_power      # Выработка энергии СБ при средней освещенности, кВт*ч
-            geu_output = veu_output + sb_output                      # Общая выработка ГЭУ, кВт*ч
-           
+            wind_speed = float(wind_speed)
+            irradiance = float(irradiance)
+            temperature = float(temperature)
+            load = float(load) if load.strip() else 0.0
+            battery_capacity = float(battery_capacity) if battery_capacity.strip() else 0.0
+        except ValueError:
+            messagebox.showerror("Ошибка", "Пожалуйста, введите корректные числовые значения.")
+            return
+
+        def show(result):
             # Отображение результата
-            result_text = f"Выработка электроэнергии ГЭУ: {geu_output:.2f} кВт*ч"
+            result_text = (f"Выработка электроэнергии ГЭУ за год: {result['wind_energy'] + result['solar_energy']:.2f} кВт*ч\n"
+                           f"ВЭУ: {result['wind_energy']:.2f} кВт*ч, СБ: {result['solar_energy']:.2f} кВт*ч")
+            if load > 0:
+                result_text += (f"\n\nПотребление за год: {result['load']:.2f} кВт*ч\n"
+                                f"Недоотпуск: {result['unmet_load']:.2f} кВт*ч ({result['unmet_fraction']:.1%})\n"
+                                f"Сброс избытка выработки: {result['curtailment']:.2f} кВт*ч")
             messagebox.showinfo("Результат", result_text)
 
-        except Exception as e:
-            messagebox.showerror("Ошибка", str(e))
+        run_in_background(geu_yearly_output, veu_power, sb_power, wind_speed, irradiance, temperature, load,
+                          battery_capacity, on_done=show)
 
     # Открываем окно для ввода параметров
     open_geu_parameters_window()
@@ -552,23 +866,36 @@ def calculate_geu_output():
 
 
     
-def calculate_solar_panel_output(modules, nominal_power_per_module, radiation_per_day):
+# Выработка солнечной батареи по модели модуля (calcveu_solar): номинальная мощность, потери
+# и снижение мощности при нагреве модуля при заданной температуре воздуха
+def solar_panel_yield(modules, nominal_power_per_module, radiation_per_day, temperature):
+    from calcveu_solar import make_module, daily_module_yield
+
+    daily_output_per_module = float(daily_module_yield(radiation_per_day, temperature,
+                                                       make_module(nominal_power_per_module))[0])
+    yearly_output_per_module = daily_output_per_module * 365
+    return daily_output_per_module, yearly_output_per_module, yearly_output_per_module * modules
+
+
+def calculate_solar_panel_output(modules, nominal_power_per_module, radiation_per_day, temperature=""):
     try:
         modules = int(modules)
         nominal_power_per_module = float(nominal_power_per_module)
         radiation_per_day = float(radiation_per_day)
-
-        daily_output_per_module = radiation_per_day * 1.27  # Дневная выработка одного модуля, кВт·ч/день
-        yearly_output_per_module = daily_output_per_module * 365  # Годовая выработка одного модуля, кВт·ч
-        total_yearly_output = yearly_output_per_module * modules  # Годовая выработка всей солнечной батареи, кВт·ч
-
-        result_text = f"Годовая выработка солнечной батареи: {total_yearly_output} кВт·ч\n"
+        temperature = float(temperature) if temperature.strip() else 25.0
+    except ValueError:
+        messagebox.showerror("Ошибка", "Пожалуйста, введите корректные числовые значения.")
+        return
+
+    def show(result):
+        daily_output_per_module, yearly_output_per_module, total_yearly_output = result
+        result_text = f"Годовая выработка солнечной батареи: {total_yearly_output:.2f} кВт·ч\n"
         result_text += f"Дневная выработка одного модуля: {daily_output_per_module:.2f} кВт·ч/день\n"
         result_text += f"Годовая выработка одного модуля: {yearly_output_per_module:.2f} кВт·ч"
         messagebox.showinfo("Результат", result_text)
 
-    except Exception as e:
-        messagebox.showerror("Ошибка", str(e))
+    run_in_background(solar_panel_yield, modules, nominal_power_per_module, radiation_per_day, temperature,
+                      on_done=show)
 
 
 
@@ -587,13 +914,25 @@ def open_solar_panel_parameters_window():
     nominal_power_entry = tk.Entry(solar_params_window)
     nominal_power_entry.grid(row=1, column=1, padx=10, pady=5)
 
-    radiation_label = tk.Label(solar_params_window, text="Радиация в день, кВт·ч:")
+    radiation_label = tk.Label(solar_params_window, text="Радиация в день, кВт·ч/м²:")
     radiation_label.grid(row=2, column=0, padx=10, pady=5)
     radiation_entry = tk.Entry(solar_params_window)
     radiation_entry.grid(row=2, column=1, padx=10, pady=5)
 
-    calculate_button = tk.Button(solar_params_window, text="Рассчитать", command=lambda: calculate_solar_panel_output(modules_entry.get(), nominal_power_entry.get(), radiation_entry.get()))
-    calculate_button.grid(row=3, columnspan=2, pady=10)
+    temperature_label = tk.Label(solar_params_window, text="Средняя температура воздуха, °C:")
+    temperature_label.grid(row=3, column=0, padx=10, pady=5)
+    temperature_entry = tk.Entry(solar_params_window)
+    temperature_entry.grid(row=3, column=1, padx=10, pady=5)
+
+    entries = {"modules": modules_entry, "nominal_power": nominal_power_entry, "radiation": radiation_entry,
+               "temperature": temperature_entry}
+    calculate_button = tk.Button(solar_params_window, text="Рассчитать", command=attach_history(
+        "solar", entries,
+        lambda: calculate_solar_panel_output(modules_entry.get(), nominal_power_entry.get(), radiation_entry.get(),
+                                             temperature_entry.get())))
+    calculate_button.grid(row=4, columnspan=2, pady=10)
+    if not temperature_entry.get():
+        temperature_entry.insert(0, "25")
 
 
 
@@ -637,35 +976,21 @@ def open_wind_turbine_parameters_window():
     maintenance_cost_entry.grid(row=4, column=1, padx=10, pady=5)
 
     # Кнопка для запуска расчета
-    calculate_button = tk.Button(wind_turbine_params_window, text="Рассчитать", command=lambda: calculate_wind_turbine_economics(power_entry.get(), cost_per_kWh_entry.get(), cost_entry.get(), service_life_entry.get(), maintenance_cost_entry.get()))
+    entries = {"power": power_entry, "cost": cost_entry, "cost_per_kWh": cost_per_kWh_entry,
+               "service_life": service_life_entry, "maintenance_cost": maintenance_cost_entry}
+    calculate_button = tk.Button(wind_turbine_params_window, text="Рассчитать", command=attach_history(
+        "economics", entries,
+        lambda: display_wind_turbine_economics(power_entry.get(), cost_per_kWh_entry.get(), cost_entry.get(),
+                                               service_life_entry.get(), maintenance_cost_entry.get())))
     calculate_button.grid(row=5, columnspan=2, pady=10)
-def calculate_wind_turbine_economics(power, cost_per_kWh, cost, service_life, maintenance_cost):
+def display_wind_turbine_economics(power, cost_per_kWh, cost, service_life, maintenance_cost):
     try:
-        # Преобразование введенных значений в нужный формат
-        power = float(power)
-        cost_per_kWh = float(cost_per_kWh)
-        cost = float(cost)
-        service_life = int(service_life)
-        maintenance_cost = float(maintenance_cost)
-
-        # Расчет общих затрат за срок службы
-        total_cost = cost + (maintenance_cost * service_life)
-
-        # Расчет среднегодовых затрат
-        average_annual_cost = total_cost / service_life
-
-
-        # Расчет годового дохода от ветрогенератора
-        annual_income = power * cost_per_kWh * 365  # Годовой доход = мощность * стоимость кВт-ч * количество дней в году
-
-        # Расчет прибыли в год
-        annual_profit = annual_income - average_annual_cost
-
-        # Расчет прибыли на весь срок службы
-        total_profit = annual_profit * service_life
+        economics = calculate_wind_turbine_economics(power, cost_per_kWh, cost, service_life, maintenance_cost)
+        annual_profit = economics['annual_profit']
+        total_profit = economics['total_profit']
 
         # Проверка на целесообразность строительства
-        if average_annual_cost <= annual_income:
+        if economics['feasible']:
             messagebox.showinfo("Информация", f"Строительство ветрогенератора целесообразно.\nПрибыль в год: {annual_profit:.2f} руб.\nПрибыль за весь срок службы: {total_profit:.2f} руб.")
         else:
             messagebox.showinfo("Информация", f"Строительство ветрогенератора нецелесообразно.\nПрибыль в год: {annual_profit:.2f} руб.\nПрибыль за весь срок службы: {total_profit:.2f} руб.")
@@ -682,38 +1007,6 @@ def calculate_wind_turbine_economics(power, cost_per_kWh, cost, service_life, ma
 
 
 
-def calculate_wind_turbine_parameters(power, average_wind_speed, number_of_blades):
-    try:
-        # Преобразование введенных значений в нужный формат
-        power = float(power)
-        average_wind_speed = float(average_wind_speed)
-        number_of_blades = int(number_of_blades)
-        air_density = 1.225  # Плотность воздуха, кг/м^3
-        wind_speed = 3  # Средняя скорость ветра, м/с
-        air_density = 1.225  # Плотность воздуха, кг/м^3
-        filling_coefficient = 0.3  # Коэффициент заполняемости
-        
-        # Расчет параметров ВЭУ
-        rotor_diameter = math.sqrt(power / (0.5 * air_density * wind_speed**3 * filling_coefficient))
-        swept_area = 3.14 * (rotor_diameter / 2) ** 2
-        aspect_ratio = rotor_diameter / (number_of_blades * 2)
-        solidity_factor = number_of_blades / swept_area
-        blade_area = swept_area / number_of_blades
-        blade_length = (blade_area / aspect_ratio) ** 0.5
-
-        # Возвращаем рассчитанные параметры ВЭУ
-        return {
-            'rotor_diameter': round(rotor_diameter, 2),
-            'swept_area': round(swept_area, 2),
-            'aspect_ratio': round(aspect_ratio, 2),
-            'solidity_factor': round(solidity_factor, 2),
-            'blade_area': round(blade_area, 2),
-            'blade_length': round(blade_length, 2)
-        }
-
-    except Exception as e:
-        messagebox.showerror("Ошибка", str(e))
-
 def open_wind_turbine_parameters_window():
     wind_turbine_params_window = tk.Toplevel()
     wind_turbine_params_window.title("Параметры ветроэнергетической установки")
@@ -737,12 +1030,21 @@ def open_wind_turbine_parameters_window():
     number_of_blades_entry.grid(row=2, column=1, padx=10, pady=5)
 
     # Кнопка для запуска расчета
-    calculate_button = tk.Button(wind_turbine_params_window, text="Рассчитать", command=lambda: display_calculated_parameters(power_entry.get(), average_wind_speed_entry.get(), number_of_blades_entry.get()))
+    entries = {"power": power_entry, "average_wind_speed": average_wind_speed_entry,
+               "number_of_blades": number_of_blades_entry}
+    calculate_button = tk.Button(wind_turbine_params_window, text="Рассчитать", command=attach_history(
+        "turbine_parameters", entries,
+        lambda: display_calculated_parameters(power_entry.get(), average_wind_speed_entry.get(),
+                                              number_of_blades_entry.get())))
     calculate_button.grid(row=3, columnspan=2, pady=10)
 
 def display_calculated_parameters(power, average_wind_speed, number_of_blades):
     # Вызываем функцию расчета параметров ВЭУ
-    parameters = calculate_wind_turbine_parameters(power, average_wind_speed, number_of_blades)
+    try:
+        parameters = calculate_wind_turbine_parameters(power, average_wind_speed, number_of_blades)
+    except Exception as e:
+        messagebox.showerror("Ошибка", str(e))
+        return
     if parameters:
         # Отображаем рассчитанные параметры
         result_text = f"Рассчитанные параметры ВЭУ:\n"
@@ -789,24 +1091,48 @@ def display_calculated_parameters(power, average_wind_speed, number_of_blades):
 
 
 
-
-# Загружаем сохраненные значения при запуске программы
-load_values()
 
 # Создаем функцию закрытия окна
 def on_closing():
-    # Получаем текущие значения из полей ввода
-    speed = speed_entry.get()
-    radius = radius_entry.get()
-    generator_efficiency = generator_eff_entry.get()
-    gearbox_efficiency = gearbox_eff_entry.get()
-    # Сохраняем введенные значения перед закрытием
-    save_values(speed, radius, generator_efficiency, gearbox_efficiency)
+    # Сохраняем введенные значения перед закрытием (без добавления в историю ввода)
+    settings.record("wind_power", {name: entry.get() for name, entry in main_entries.items()}, history=False)
+    try:
+        settings.close()
+    except OSError as e:
+        messagebox.showerror("Ошибка", f"Не удалось сохранить настройки: {e}")
+    # Останавливаем фоновые задачи и закрываем соединение с базой данных, если оно было открыто
+    if background is not None:
+        background.shutdown()
+    from calcveu_db import close_results_repository
+
+    close_results_repository()
+    # Записываем отчет о метриках, если сбор был включен
+    finish_run()
     # Закрываем окно
     root.destroy()
 
 # Привязываем функцию закрытия окна к событию закрытия окна
 root.protocol("WM_DELETE_WINDOW", on_closing)
 
-# Запускаем главный цикл программы
-root.mainloop()
+# Запускаем обработку результатов фоновых задач
+poll_background_tasks()
+
+# Включаем сбор метрик, если он задан переменной окружения CALCVEU_PROFILE
+if os.environ.get(PROFILE_VARIABLE):
+    try:
+        start_run("calcveu")
+    except ValueError as e:
+        messagebox.showerror("Ошибка", str(e))
+
+startup_check_path = os.environ.get(STARTUP_CHECK_VARIABLE)
+if startup_check_path:
+    # Проверка времени запуска: после первой отрисовки главного окна время (секунды Unix)
+    # записывается в файл, и программа завершается без сохранения введенных значений
+    root.wait_visibility()
+    root.update()
+    with open(startup_check_path, "w") as f:
+        f.write(repr(time.time()))
+    root.destroy()
+else:
+    # Запускаем главный цикл программы
+    root.mainloop()
@@ -0,0 +1,275 @@
+import itertools
+import math
+import numpy as np
+
+from calcveu_core import WIND_POWER_DENSITY, WIND_POWER_CP, NOMINAL_POWER_DENSITY, NOMINAL_POWER_CP
+
+# Функция для пакетного (векторизованного) расчета мощности ветрогенератора.
+# Принимает массивы NumPy (или числа) скоростей ветра, радиусов ротора и
+# коэффициентов КПД генератора и редуктора, согласованные по правилам
+# broadcasting (например, speed[:, None] и rotor_radius[None, :] дают сетку).
+# Возвращает массив мощностей (в ваттах), поэлементно совпадающий с wind_power
+# с точностью до ошибки округления (относительная разница порядка 1e-15).
+# Необязательный параметр out позволяет записать результат в готовый массив.
+def wind_power_batch(speed, rotor_radius, generator_efficiency, gearbox_efficiency, out=None):
+    speed = np.asarray(speed, dtype=np.float64)
+    rotor_radius = np.asarray(rotor_radius, dtype=np.float64)
+    generator_efficiency = np.asarray(generator_efficiency, dtype=np.float64)
+    gearbox_efficiency = np.asarray(gearbox_efficiency, dtype=np.float64)
+
+    out = _prepare_output(out, speed, rotor_radius, generator_efficiency, gearbox_efficiency)
+
+    # Умножения выполняются в том же порядке, что и в wind_power.
+    # Все операции выполняются на месте, без промежуточных массивов полного размера.
+    np.power(rotor_radius, 2, out=out)
+    out *= math.pi
+    out *= 0.5
+    out *= WIND_POWER_DENSITY
+    out *= np.power(speed, 3)
+    out *= WIND_POWER_CP
+    out *= generator_efficiency
+    out *= gearbox_efficiency
+    return out
+
+
+# Подготовка массива результата для пакетных функций: размер определяется по правилам broadcasting
+def _prepare_output(out, *arrays):
+    shape = np.broadcast_shapes(*(array.shape for array in arrays))
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if out.shape != shape:
+        raise ValueError("Размер массива out не совпадает с размером результата")
+    return out
+
+
+# Функция для пакетного расчета номинальной мощности ВЭУ.
+# Принимает массивы (или числа) радиусов ротора, КПД генератора и скоростей ветра,
+# согласованные по правилам broadcasting. Возвращает массив мощностей (в ваттах),
+# совпадающий с calculate_nominal_power с точностью до ошибки округления.
+def calculate_nominal_power_batch(rotor_radius, generator_efficiency, wind_speed, out=None):
+    rotor_radius = np.asarray(rotor_radius, dtype=np.float64)
+    generator_efficiency = np.asarray(generator_efficiency, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+    out = _prepare_output(out, rotor_radius, generator_efficiency, wind_speed)
+
+    # Порядок умножений как в calculate_nominal_power
+    np.power(rotor_radius, 2, out=out)
+    out *= math.pi
+    out *= 0.5 * NOMINAL_POWER_DENSITY * NOMINAL_POWER_CP
+    out *= np.power(wind_speed, 3)
+    out *= generator_efficiency
+    return out
+
+
+# Функция для расчета энергии по временному ряду скоростей ветра.
+# Принимает итерируемый объект пар (время, скорость ветра в м/с), где время —
+# datetime, строка ISO ("2024-03-20 11:51:03") или секунды Unix, параметры ротора
+# и размер порции. Данные обрабатываются порциями по chunk_size отсчетов,
+# поэтому расход памяти не зависит от длины ряда.
+# Возвращает словари энергии (в кВт·ч) по суткам, месяцам и годам.
+def calculate_energy_series(samples, rotor_radius, generator_efficiency, gearbox_efficiency,
+                            chunk_size=100000, max_gap=3600):
+    samples = iter(samples)
+
+    def chunks():
+        while True:
+            chunk = list(itertools.islice(samples, chunk_size))
+            if not chunk:
+                return
+            times, speeds = zip(*chunk)
+            yield np.array(times, dtype="datetime64[s]"), np.array(speeds, dtype=np.float64)
+
+    return integrate_energy_chunks(chunks(), rotor_radius, generator_efficiency,
+                                   gearbox_efficiency, max_gap)
+
+
+# Вариант calculate_energy_series для готовых массивов времени и скоростей.
+# Массивы не копируются: в расчет передаются срезы по chunk_size отсчетов.
+def calculate_energy_series_arrays(timestamps, speeds, rotor_radius, generator_efficiency,
+                                   gearbox_efficiency, chunk_size=1000000, max_gap=3600):
+    timestamps = np.asarray(timestamps)
+    if not np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype("datetime64[s]")
+    speeds = np.asarray(speeds)
+    if len(timestamps) != len(speeds):
+        raise ValueError("Количество отметок времени и скоростей ветра не совпадает")
+
+    chunks = ((timestamps[start:start + chunk_size], speeds[start:start + chunk_size])
+              for start in range(0, len(speeds), chunk_size))
+    return integrate_energy_chunks(chunks, rotor_radius, generator_efficiency,
+                                   gearbox_efficiency, max_gap)
+
+
+# Интегрирование мощности по порциям (время, скорость).
+# Мощность отсчета считается постоянной до следующего отсчета; энергия интервала
+# относится к суткам, в которых интервал начался. Интервалы длиннее max_gap секунд
+# считаются пропусками в данных и в энергию не входят. Последний отсчет ряда
+# получает длительность предыдущего интервала.
+def integrate_energy_chunks(chunks, rotor_radius, generator_efficiency, gearbox_efficiency,
+                            max_gap=3600):
+    integrator = EnergyIntegrator(rotor_radius, generator_efficiency, gearbox_efficiency, max_gap)
+    for times, speeds in chunks:
+        integrator.add(times, speeds)
+    return integrator.result()
+
+
+# Накопление энергии по порциям ряда для integrate_energy_chunks.
+# Порции передаются в add по очереди; состояние между порциями (последний отсчет) хранится
+# в объекте, поэтому несколько рядов (например, одна порция измерений, пересчитанная на разные
+# высоты ступицы) можно интегрировать одновременно за один проход по данным.
+class EnergyIntegrator:
+    def __init__(self, rotor_radius, generator_efficiency, gearbox_efficiency, max_gap=3600):
+        self.rotor_radius = rotor_radius
+        self.generator_efficiency = generator_efficiency
+        self.gearbox_efficiency = gearbox_efficiency
+        self.max_gap = max_gap
+        self.daily = {}
+        self.previous_time = None
+        self.previous_power = None
+        self.previous_interval = 0
+
+    def add(self, times, speeds):
+        if len(times) == 0:
+            return
+        times = times.astype("datetime64[s]").astype(np.int64)
+        power = wind_power_batch(speeds, self.rotor_radius, self.generator_efficiency, self.gearbox_efficiency)
+
+        # Последний отсчет предыдущей порции продолжается до первого отсчета текущей
+        if self.previous_time is not None:
+            times = np.concatenate(([self.previous_time], times))
+            power = np.concatenate(([self.previous_power], power))
+
+        intervals = np.diff(times)
+        if np.any(intervals < 0):
+            raise ValueError("Отметки времени должны идти по возрастанию")
+        if len(intervals):
+            self.previous_interval = int(intervals[-1])
+        intervals[intervals > self.max_gap] = 0
+
+        # Энергия интервалов в кВт·ч (Вт·с / 3 600 000)
+        energy = power[:-1] * intervals / 3600000.0
+        _add_daily_energy(self.daily, times[:-1], energy)
+
+        self.previous_time = times[-1]
+        self.previous_power = power[-1]
+
+    # Энергия (в кВт·ч) по суткам, месяцам и годам с учетом последнего отсчета ряда
+    def result(self):
+        daily = dict(self.daily)
+        if self.previous_time is not None and self.previous_interval <= self.max_gap:
+            _add_daily_energy(daily, np.array([self.previous_time]),
+                              np.array([self.previous_power * self.previous_interval / 3600000.0]))
+
+        # Суммы по месяцам и годам получаются из суточных сумм
+        energy_per_day = {}
+        energy_per_month = {}
+        energy_per_year = {}
+        for day in sorted(daily):
+            date = str(np.datetime64(day, "D"))
+            energy_per_day[date] = daily[day]
+            energy_per_month[date[:7]] = energy_per_month.get(date[:7], 0.0) + daily[day]
+            energy_per_year[date[:4]] = energy_per_year.get(date[:4], 0.0) + daily[day]
+        return energy_per_day, energy_per_month, energy_per_year
+
+
+# Количество часов в году для расчета годовой выработки по распределению скоростей
+HOURS_IN_YEAR = 8760
+
+
+# Функция для расчета энергии по гистограмме скоростей ветра.
+# Принимает границы интервалов скоростей (м/с) и повторяемость каждого интервала
+# (количество отсчетов, часы или доли — нормируется автоматически), параметры ротора.
+# Кривая мощности строится через wind_power_batch по серединам интервалов,
+# поэтому время расчета зависит только от числа интервалов, а не от длины ряда.
+# Возвращает среднюю выработку (в кВт·ч) за сутки, месяц и год, как calculate_energy.
+def calculate_energy_histogram(bin_edges, frequencies, rotor_radius, generator_efficiency,
+                               gearbox_efficiency):
+    bin_edges = np.asarray(bin_edges, dtype=np.float64)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    if len(bin_edges) != len(frequencies) + 1:
+        raise ValueError("Количество границ интервалов должно быть на единицу больше числа интервалов")
+    total = frequencies.sum()
+    if total <= 0:
+        raise ValueError("Повторяемость скоростей ветра должна быть положительной")
+
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    power_curve = wind_power_batch(bin_centers, rotor_radius, generator_efficiency, gearbox_efficiency)
+    # Средняя мощность (Вт) с учетом повторяемости скоростей
+    average_power = float(np.dot(power_curve, frequencies) / total)
+
+    energy_per_year = average_power / 1000 * HOURS_IN_YEAR
+    return energy_per_year / 365, energy_per_year / 12, energy_per_year
+
+
+# Функция для расчета энергии по распределению Вейбулла.
+# Принимает параметр формы k, параметр масштаба c (м/с), параметры ротора,
+# ширину интервала скоростей и максимальную скорость ветра (м/с).
+# Вероятность каждого интервала вычисляется по функции распределения Вейбулла.
+# Возвращает среднюю выработку (в кВт·ч) за сутки, месяц и год.
+def calculate_energy_weibull(k, c, rotor_radius, generator_efficiency, gearbox_efficiency,
+                             bin_width=0.25, max_speed=30):
+    if k <= 0 or c <= 0:
+        raise ValueError("Параметры распределения Вейбулла должны быть положительными")
+    bin_edges = np.arange(0, max_speed + bin_width, bin_width)
+    cdf = 1 - np.exp(-(bin_edges / c) ** k)
+    probabilities = np.diff(cdf)
+    # Скорости выше max_speed не учитываются (остановка ВЭУ). calculate_energy_histogram
+    # нормирует повторяемость, поэтому результат умножается на долю времени до max_speed.
+    energy_per_day, energy_per_month, energy_per_year = calculate_energy_histogram(
+        bin_edges, probabilities, rotor_radius, generator_efficiency, gearbox_efficiency)
+    covered = float(cdf[-1])
+    return energy_per_day * covered, energy_per_month * covered, energy_per_year * covered
+
+
+# Проверка точности расчета по гистограмме на тех же данных.
+# Строит гистограмму скоростей ряда с шагом bin_width и сравнивает годовую выработку
+# по гистограмме с полным интегрированием ряда (calculate_energy_series_arrays),
+# приведенным к году по длительности учтенных интервалов. Каждый отсчет входит в гистограмму
+# с весом, равным его длительности в интегрировании (интервал до следующего отсчета, пропуски
+# длиннее max_gap не учитываются), поэтому разница оценок определяется только шириной интервалов.
+# Возвращает словарь с обеими оценками и относительной погрешностью.
+def check_energy_histogram_accuracy(timestamps, speeds, rotor_radius, generator_efficiency,
+                                    gearbox_efficiency, bin_width=0.25, max_gap=3600):
+    timestamps = np.asarray(timestamps).astype("datetime64[s]")
+    speeds = np.asarray(speeds, dtype=np.float64)
+
+    # Полное интегрирование ряда
+    energy_per_day, _, _ = calculate_energy_series_arrays(
+        timestamps, speeds, rotor_radius, generator_efficiency, gearbox_efficiency, max_gap=max_gap)
+    durations = _sample_durations(timestamps.astype(np.int64), max_gap)
+    covered_seconds = int(durations.sum())
+    if covered_seconds <= 0:
+        raise ValueError("Недостаточно данных для проверки точности")
+    series_energy = sum(energy_per_day.values()) / (covered_seconds / 3600) * HOURS_IN_YEAR
+
+    # Расчет по гистограмме тех же скоростей, взвешенных по длительности отсчетов
+    bin_edges = np.arange(0, speeds.max() + 2 * bin_width, bin_width)
+    frequencies, _ = np.histogram(speeds, bins=bin_edges, weights=durations)
+    _, _, histogram_energy = calculate_energy_histogram(
+        bin_edges, frequencies, rotor_radius, generator_efficiency, gearbox_efficiency)
+
+    return {
+        'series_energy_per_year': series_energy,
+        'histogram_energy_per_year': histogram_energy,
+        'relative_error': abs(histogram_energy - series_energy) / series_energy,
+    }
+
+
+# Длительность (с) каждого отсчета так же, как в integrate_energy_chunks: интервал до следующего
+# отсчета, последний отсчет получает длительность предыдущего интервала, пропуски дают ноль
+def _sample_durations(times, max_gap):
+    if len(times) < 2:
+        return np.zeros(len(times), dtype=np.int64)
+    intervals = np.diff(times)
+    durations = np.append(intervals, intervals[-1])
+    durations[durations > max_gap] = 0
+    return durations
+
+
+# Добавление энергии интервалов к суточным суммам (ключ — номер суток от 1970-01-01)
+def _add_daily_energy(daily, times, energy):
+    days = times // 86400
+    unique_days, index = np.unique(days, return_inverse=True)
+    sums = np.bincount(index, weights=energy, minlength=len(unique_days))
+    for day, value in zip(unique_days.tolist(), sums.tolist()):
+        daily[day] = daily.get(day, 0.0) + value
@@ -0,0 +1,586 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from calcveu_core import (wind_power, calculate_energy, calculate_nominal_power, calculate_ground_area,
+                          calculate_wind_turbine_economics, calculate_wind_turbine_parameters)
+from calcveu_batch import wind_power_batch, calculate_energy_series_arrays
+from calcveu_cache import PowerCurveCache
+from calcveu_db import WindPowerResultsRepository
+from calcveu_sizing import size_wind_turbines
+from calcveu_economics import evaluate_projects
+from calcveu_montecarlo import make_uncertainty, run_monte_carlo
+from calcveu_hybrid import wind_unit_profile, solar_unit_profile, wind_scale, simulate_dispatch, size_battery_bank
+from calcveu_solar import make_module, solar_array_output
+from calcveu_winddata import ingest_wind_csv, load_wind_data
+from calcveu_correction import calculate_hub_height_energy
+from calcveu_layout import calculate_site_layout
+from calcveu_wake import calculate_farm_energy
+
+# Размеры синтетических наборов данных: количество отсчетов для расчетных функций
+# и количество строк для базы данных
+BENCHMARK_SIZES = {
+    "quick": {"samples": (10 ** 3, 10 ** 4, 10 ** 5), "rows": (10 ** 2, 10 ** 3, 10 ** 4)},
+    "full": {"samples": (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7),
+             "rows": (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)},
+}
+# Пределы для медленных путей: цикл Python по скалярным функциям и запись по одной строке
+SCALAR_LIMIT = 10 ** 6
+SINGLE_ROW_LIMIT = 10 ** 4
+# Пределы для расчетных модулей, которым нужны матрицы (проекты × годы, розыгрыши × интервалы
+# скоростей, часы × ориентации) или цикл Python по мачтам и порциям
+MATRIX_LIMIT = 10 ** 6
+LAYOUT_LIMIT = 10 ** 4
+# Цель по времени появления главного окна (с) и переменная окружения, по которой
+# calcveu.py сообщает о первой отрисовке окна и завершается
+STARTUP_TARGET = 0.3
+STARTUP_CHECK_VARIABLE = "CALCVEU_STARTUP_CHECK"
+# Начальное значение генератора: наборы данных одинаковы при каждом запуске
+SEED = 20240320
+
+
+# Синтетический набор отсчетов: скорости ветра, радиусы, КПД и отметки времени с шагом 10 минут
+def make_samples(size):
+    rng = np.random.default_rng(SEED)
+    return {
+        "speed": rng.weibull(2.0, size) * 7,
+        "radius": rng.uniform(1, 40, size),
+        "generator_efficiency": rng.uniform(0.8, 0.98, size),
+        "gearbox_efficiency": rng.uniform(0.85, 0.99, size),
+        "time": np.datetime64("2023-01-01T00:00:00") + np.arange(size) * np.timedelta64(600, "s"),
+    }
+
+
+# Синтетические строки таблицы результатов (в порядке RESULT_COLUMNS): десять запусков
+# подряд идущих отсчетов
+def make_rows(size):
+    samples = make_samples(size)
+    power = wind_power_batch(samples["speed"], samples["radius"], samples["generator_efficiency"],
+                             samples["gearbox_efficiency"])
+    energy_per_day, energy_per_month, energy_per_year = calculate_energy(power)
+    run_ids = np.arange(size) * 10 // size + 1
+    return list(zip(run_ids.tolist(), samples["time"].astype(np.int64).tolist(), samples["speed"].tolist(),
+                    samples["radius"].tolist(), samples["generator_efficiency"].tolist(),
+                    samples["gearbox_efficiency"].tolist(), power.tolist(), energy_per_day.tolist(),
+                    energy_per_month.tolist(), energy_per_year.tolist()))
+
+
+# Тесты: имя → (вид набора данных, функция подготовки).
+# Функция подготовки получает размер набора и рабочий каталог и возвращает
+# (операция, количество элементов, обрабатываемых одной операцией) или None,
+# если размер для теста слишком велик. Третьим элементом может быть функция подготовки
+# повтора: она вызывается перед каждым выполнением операции вне измеряемого времени.
+def _bench_wind_power(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    s = make_samples(size)
+    columns = list(zip(s["speed"].tolist(), s["radius"].tolist(), s["generator_efficiency"].tolist(),
+                       s["gearbox_efficiency"].tolist()))
+    return (lambda: [wind_power(*row) for row in columns]), size
+
+
+def _bench_calculate_energy(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    power = wind_power_batch(*(make_samples(size)[key] for key in
+                               ("speed", "radius", "generator_efficiency", "gearbox_efficiency"))).tolist()
+    return (lambda: [calculate_energy(value) for value in power]), size
+
+
+def _bench_nominal_power(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    s = make_samples(size)
+    columns = list(zip(s["radius"].tolist(), s["generator_efficiency"].tolist(), s["speed"].tolist()))
+    return (lambda: [calculate_nominal_power(*row) for row in columns]), size
+
+
+def _bench_ground_area(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    columns = list(zip(rng.uniform(5, 100, size).tolist(), rng.uniform(0, 200, size).tolist(),
+                       rng.uniform(0, 90, size).tolist()))
+    return (lambda: [calculate_ground_area(*row) for row in columns]), size
+
+
+def _bench_economics(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    columns = list(zip(rng.uniform(1, 100, size).tolist(), rng.uniform(3, 8, size).tolist(),
+                       rng.uniform(1e5, 1e7, size).tolist(), rng.integers(5, 30, size).tolist(),
+                       rng.uniform(1e3, 1e5, size).tolist()))
+    return (lambda: [calculate_wind_turbine_economics(*row) for row in columns]), size
+
+
+def _bench_turbine_parameters(size, workdir):
+    if size > SCALAR_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    columns = list(zip(rng.uniform(1e3, 1e6, size).tolist(), rng.uniform(3, 12, size).tolist(),
+                       rng.integers(2, 6, size).tolist()))
+    return (lambda: [calculate_wind_turbine_parameters(*row) for row in columns]), size
+
+
+def _bench_wind_power_batch(size, workdir):
+    s = make_samples(size)
+    out = np.empty(size)
+    return (lambda: wind_power_batch(s["speed"], s["radius"], s["generator_efficiency"],
+                                     s["gearbox_efficiency"], out=out)), size
+
+
+def _bench_energy_series(size, workdir):
+    s = make_samples(size)
+    return (lambda: calculate_energy_series_arrays(s["time"], s["speed"], 10, 0.9, 0.95)), size
+
+
+def _bench_power_curve_lookup(size, workdir):
+    s = make_samples(size)
+    cache = PowerCurveCache()
+    cache.get(10, 0.9, 0.95)
+    return (lambda: cache.power(s["speed"], 10, 0.9, 0.95)), size
+
+
+# Подбор конструкций на сетке из size сочетаний: радиусы × 3 количества лопастей × 10 × 10 КПД
+def _bench_size_wind_turbines(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    radii = np.linspace(1, 40, max(size // 300, 1))
+    efficiencies = np.linspace(0.8, 0.98, 10)
+    return (lambda: size_wind_turbines(2e5, radii, (2, 3, 4), efficiencies, efficiencies,
+                                       weibull=(2.0, 7.0))), size
+
+
+# Портфель из size проектов со сроком службы до 25 лет
+def _bench_evaluate_projects(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    capex = rng.uniform(1e5, 1e7, size)
+    annual_energy = rng.uniform(1e3, 1e6, size)
+    maintenance_cost = rng.uniform(1e3, 1e5, size)
+    service_life = rng.integers(10, 26, size)
+    return (lambda: evaluate_projects(capex, annual_energy, 5.0, maintenance_cost, service_life, 0.1,
+                                      tariff_escalation=0.04)), size
+
+
+def _bench_monte_carlo(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    uncertainty = make_uncertainty(2.0, 7.0, 5.0, weibull_k_std=0.1, weibull_c_std=0.5, air_density_std=0.02,
+                                   degradation_max=0.01, tariff_std=0.5)
+    return (lambda: run_monte_carlo((20, 0.9, 0.95), 5e6, 1e5, 25, 0.1, uncertainty, draws=size,
+                                    seed=SEED, workers=1)), size
+
+
+# Моделирование месяца по часам для size / 720 конфигураций ГЭУ; элемент — час одной конфигурации
+def _bench_simulate_dispatch(size, workdir):
+    hours = 24 * 30
+    configurations = max(size // hours, 1)
+    rng = np.random.default_rng(SEED)
+    wind_profile = wind_unit_profile(rng.weibull(2.0, hours) * 7)
+    solar_profile = solar_unit_profile(np.clip(np.sin(np.arange(hours) * np.pi / 12), 0, None) * 800)
+    load = rng.uniform(0.5, 2.0, hours)
+    scale = wind_scale(rng.uniform(1, 3, configurations), 0.9, 0.95)
+    solar_power = rng.uniform(0, 5, configurations)
+    capacity = rng.uniform(0, 20, configurations)
+    return (lambda: simulate_dispatch(wind_profile, solar_profile, load, scale, solar_power, capacity,
+                                      battery_power=3.0)), hours * configurations
+
+
+# Подбор емкости АКБ по ряду из size шагов с допустимым недоотпуском (бисекция)
+def _bench_size_battery_bank(size, workdir):
+    rng = np.random.default_rng(SEED)
+    generation = rng.weibull(2.0, size) * 1.5
+    load = rng.uniform(0.5, 2.0, size)
+    return (lambda: size_battery_bank(generation, load, max_unmet_fraction=0.05, battery_power=3.0)), size
+
+
+# Выработка СБ по size часам для четырех ориентаций и трех количеств модулей
+def _bench_solar_array_output(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    timestamps = np.datetime64("2023-01-01T00:00:00") + np.arange(size) * np.timedelta64(3600, "s")
+    ghi = np.clip(np.sin(np.arange(size) * np.pi / 12), 0, None) * rng.uniform(300, 900, size)
+    temperature = rng.uniform(-10, 30, size)
+    module = make_module(300)
+    return (lambda: solar_array_output(timestamps, ghi, temperature, module, [20, 30, 40, 30], [180, 180, 180, 135],
+                                       55.75, 37.62, [10, 20, 40])), size
+
+
+# Журнал анемометра из size строк: разбор CSV в двоичный файл и загрузка актуального файла
+def _wind_log(size, workdir):
+    path = os.path.join(workdir, f"wind_{size}.csv")
+    if not os.path.exists(path):
+        s = make_samples(size)
+        with open(path, "w") as f:
+            f.write("time,speed\n")
+            for start in range(0, size, 100000):
+                times = s["time"][start:start + 100000].astype(np.int64).tolist()
+                speeds = s["speed"][start:start + 100000].tolist()
+                f.write("".join(f"{t},{v:.2f}\n" for t, v in zip(times, speeds)))
+    return path
+
+
+def _bench_ingest_wind_csv(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    path = _wind_log(size, workdir)
+    return (lambda: ingest_wind_csv(path)), size
+
+
+def _bench_load_wind_data(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    path = _wind_log(size, workdir)
+    ingest_wind_csv(path)
+
+    def run():
+        timestamps, speeds = load_wind_data(path)
+        return float(speeds.sum())
+    return run, size
+
+
+# Пересчет ряда из size отсчетов на три высоты ступицы с поправкой на плотность воздуха
+def _bench_hub_height_energy(size, workdir):
+    s = make_samples(size)
+    temperature = np.random.default_rng(SEED).uniform(-20, 30, size)
+    return (lambda: calculate_hub_height_energy(s["time"], s["speed"], 10, (40, 60, 100), 20, 0.9, 0.95,
+                                                temperature=temperature, pressure=101325.0)), size
+
+
+# Площадка из size мачт на случайной сетке с частично пересекающимися участками растяжек
+def _bench_site_layout(size, workdir):
+    if size > LAYOUT_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    side = np.sqrt(size) * 120
+    x = rng.uniform(0, side, size)
+    y = rng.uniform(0, side, size)
+    return (lambda: calculate_site_layout(x, y, 10, 50, 60)), size
+
+
+# Ветропарк из 25 ВЭУ (сетка 5 × 5) по ряду из size часов
+def _bench_farm_energy(size, workdir):
+    if size > MATRIX_LIMIT:
+        return None
+    rng = np.random.default_rng(SEED)
+    x, y = (value.ravel() for value in np.meshgrid(np.arange(5) * 300.0, np.arange(5) * 400.0))
+    speeds = rng.weibull(2.0, size) * 8
+    directions = rng.uniform(0, 360, size)
+    return (lambda: calculate_farm_energy(x, y, speeds, directions, 40, 0.9, 0.95)), size
+
+
+# Хранилища, открытые тестами; закрываются в конце run_benchmarks
+_repositories = []
+
+
+def _open_repository(workdir, name):
+    path = os.path.join(workdir, name)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+    repository = WindPowerResultsRepository(path)
+    _repositories.append(repository)
+    return repository
+
+
+# Пустая база для каждого повтора теста записи: запись в растущую таблицу сделала бы время
+# зависимым от номера повтора. Возвращает функцию подготовки повтора и функцию, возвращающую
+# текущее хранилище.
+def _empty_repository(workdir, name):
+    current = []
+
+    def setup():
+        if current:
+            repository = current.pop()
+            _repositories.remove(repository)
+            repository.close()
+        current.append(_open_repository(workdir, name))
+    return setup, lambda: current[0]
+
+
+# Запись по одной строке с фиксацией транзакции — путь save_to_database
+def _bench_save_row(size, workdir):
+    if size > SINGLE_ROW_LIMIT:
+        return None
+    rows = make_rows(size)
+    setup, repository = _empty_repository(workdir, "save_row.db")
+
+    def run():
+        save = repository().save
+        for row in rows:
+            save(*row)
+    return run, size, setup
+
+
+def _bench_save_many(size, workdir):
+    rows = make_rows(size)
+    setup, repository = _empty_repository(workdir, "save_many.db")
+    return (lambda: repository().save_many(rows)), size, setup
+
+
+# Запросы окна просмотра базы данных (show_database): первая страница, страница
+# с фильтром и сортировкой по скорости, подсчет строк и сводки по запускам и дням
+def _prepared_repository(size, workdir):
+    repository = _open_repository(workdir, f"browse_{size}.db")
+    repository.save_many(make_rows(size))
+    return repository
+
+
+def _bench_fetch_page(size, workdir):
+    repository = _prepared_repository(size, workdir)
+    filters = {"speed": (3.0, 12.0), "radius": (5.0, None)}
+
+    def run():
+        repository.fetch_page("timestamp", limit=200)
+        repository.fetch_page("speed", descending=True, limit=200, filters=filters)
+    return run, 1
+
+
+def _bench_count(size, workdir):
+    repository = _prepared_repository(size, workdir)
+    return (lambda: repository.count({"speed": (3.0, 12.0)})), 1
+
+
+def _bench_summary(size, workdir):
+    repository = _prepared_repository(size, workdir)
+
+    def run():
+        repository.count()
+        repository.run_summaries()
+        repository.daily_summaries()
+    return run, 1
+
+
+BENCHMARKS = {
+    "core.wind_power": ("samples", _bench_wind_power),
+    "core.calculate_energy": ("samples", _bench_calculate_energy),
+    "core.calculate_nominal_power": ("samples", _bench_nominal_power),
+    "core.calculate_ground_area": ("samples", _bench_ground_area),
+    "core.calculate_wind_turbine_economics": ("samples", _bench_economics),
+    "core.calculate_wind_turbine_parameters": ("samples", _bench_turbine_parameters),
+    "batch.wind_power_batch": ("samples", _bench_wind_power_batch),
+    "batch.calculate_energy_series_arrays": ("samples", _bench_energy_series),
+    "cache.wind_power_lookup": ("samples", _bench_power_curve_lookup),
+    "sizing.size_wind_turbines": ("samples", _bench_size_wind_turbines),
+    "economics.evaluate_projects": ("samples", _bench_evaluate_projects),
+    "montecarlo.run_monte_carlo": ("samples", _bench_monte_carlo),
+    "hybrid.simulate_dispatch": ("samples", _bench_simulate_dispatch),
+    "hybrid.size_battery_bank": ("samples", _bench_size_battery_bank),
+    "solar.solar_array_output": ("samples", _bench_solar_array_output),
+    "winddata.ingest_wind_csv": ("samples", _bench_ingest_wind_csv),
+    "winddata.load_wind_data": ("samples", _bench_load_wind_data),
+    "correction.calculate_hub_height_energy": ("samples", _bench_hub_height_energy),
+    "layout.calculate_site_layout": ("samples", _bench_site_layout),
+    "wake.calculate_farm_energy": ("samples", _bench_farm_energy),
+    "db.save_to_database": ("rows", _bench_save_row),
+    "db.save_many": ("rows", _bench_save_many),
+    "db.fetch_page": ("rows", _bench_fetch_page),
+    "db.count": ("rows", _bench_count),
+    "db.summary": ("rows", _bench_summary),
+}
+
+
+# Измерение одной операции: после прогрева операция повторяется не менее repeats раз
+# и не менее min_time секунд (но не более max_repeats раз). Пиковая память измеряется
+# отдельным запуском под tracemalloc, чтобы не искажать время. setup, если задана,
+# вызывается перед каждым выполнением операции и в измеряемое время не входит.
+def measure(operation, items, repeats=5, min_time=0.2, max_repeats=1000, setup=None):
+    setup = setup or (lambda: None)
+    setup()
+    operation()
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < max_repeats and (len(durations) < repeats or time.perf_counter() - started < min_time):
+        setup()
+        begin = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - begin)
+
+    setup()
+    tracemalloc.start()
+    try:
+        operation()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    durations = np.array(durations)
+    p50 = float(np.percentile(durations, 50))
+    return {
+        "items": items,
+        "repeats": len(durations),
+        "p50": p50,
+        "p99": float(np.percentile(durations, 99)),
+        "throughput": items / p50 if p50 > 0 else float("inf"),
+        "peak_memory": peak_memory,
+    }
+
+
+# Запуск тестов, имена которых содержат одну из подстрок selected (все, если не задано).
+# Возвращает словарь {"meta": ..., "results": {"имя[размер]": результаты measure}}.
+def run_benchmarks(size_set="quick", selected=None, repeats=5, progress=None):
+    sizes = BENCHMARK_SIZES[size_set]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for name, (kind, prepare) in BENCHMARKS.items():
+                if selected and not any(part in name for part in selected):
+                    continue
+                for size in sizes[kind]:
+                    prepared = prepare(size, workdir)
+                    if prepared is None:
+                        continue
+                    operation, items, *setup = prepared
+                    key = f"{name}[{size}]"
+                    results[key] = measure(operation, items, repeats, setup=setup[0] if setup else None)
+                    if progress is not None:
+                        progress(key, results[key])
+                    while _repositories:
+                        _repositories.pop().close()
+        finally:
+            while _repositories:
+                _repositories.pop().close()
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": size_set,
+        },
+        "results": results,
+    }
+
+
+# Время от запуска процесса до первой отрисовки главного окна (нужен дисплей).
+# command — команда запуска (по умолчанию calcveu.py текущим интерпретатором; для собранной
+# программы — путь к исполняемому файлу). Каждый запуск — новый процесс, поэтому измеряется
+# холодный импорт модулей (кэш файлов ОС после первого запуска уже прогрет).
+# Возвращает результаты в формате measure, где items — один запуск.
+def measure_startup(command=None, repeats=5, timeout=60):
+    if command is None:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "calcveu.py")]
+    durations = []
+    with tempfile.TemporaryDirectory() as workdir:
+        marker = os.path.join(workdir, "ready")
+        environment = dict(os.environ, **{STARTUP_CHECK_VARIABLE: marker})
+        for _ in range(repeats + 1):
+            if os.path.exists(marker):
+                os.unlink(marker)
+            started = time.time()
+            process = subprocess.run(command, cwd=workdir, env=environment, timeout=timeout,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if not os.path.exists(marker):
+                error = process.stderr.decode(errors="replace").strip().splitlines()
+                raise RuntimeError("Программа не открыла окно" + (f": {error[-1]}" if error else ""))
+            with open(marker) as f:
+                durations.append(float(f.read()) - started)
+    # Первый запуск прогревает кэш файлов и не учитывается
+    durations = np.array(durations[1:])
+    p50 = float(np.percentile(durations, 50))
+    return {
+        "items": 1,
+        "repeats": len(durations),
+        "p50": p50,
+        "p99": float(np.percentile(durations, 99)),
+        "throughput": 1 / p50 if p50 > 0 else float("inf"),
+        "peak_memory": 0,
+        "target": STARTUP_TARGET,
+    }
+
+
+# Сравнение с сохраненными результатами: регрессией считается падение пропускной способности,
+# рост медианного времени или пиковой памяти больше чем на tolerance (доли).
+# Возвращает список описаний регрессий.
+def compare_with_baseline(report, baseline, tolerance=0.2):
+    regressions = []
+    for key, current in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: пропускная способность {current['throughput']:.4g} "
+                               f"вместо {previous['throughput']:.4g} в секунду")
+        if current["p50"] > previous["p50"] * (1 + tolerance):
+            regressions.append(f"{key}: медианное время {current['p50']:.4g} с вместо {previous['p50']:.4g} с")
+        # Небольшой допуск в 64 КБ, чтобы не реагировать на служебные выделения памяти
+        if current["peak_memory"] > previous["peak_memory"] * (1 + tolerance) + 65536:
+            regressions.append(f"{key}: пиковая память {current['peak_memory']} байт "
+                               f"вместо {previous['peak_memory']} байт")
+    return regressions
+
+
+def print_result(key, result):
+    sys.stderr.write(f"{key:50} {result['throughput']:>14,.0f}/с  p50 {result['p50'] * 1000:9.3f} мс  "
+                     f"p99 {result['p99'] * 1000:9.3f} мс  память {result['peak_memory'] / 2 ** 20:8.2f} МБ\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Измерение производительности расчетных функций и базы данных")
+    parser.add_argument("--sizes", choices=tuple(BENCHMARK_SIZES), default="quick",
+                        help="набор размеров данных (full — до 10^7 отсчетов и 10^6 строк)")
+    parser.add_argument("--only", nargs="*", help="запускать только тесты, в имени которых есть эти подстроки")
+    parser.add_argument("--repeats", type=int, default=5, help="минимальное количество повторов")
+    parser.add_argument("--output", help="файл JSON для результатов (по умолчанию — stdout)")
+    parser.add_argument("--baseline", help="файл JSON с эталонными результатами для сравнения")
+    parser.add_argument("--save-baseline", help="сохранить результаты как эталонные в этот файл")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение (доли)")
+    parser.add_argument("--quiet", action="store_true", help="не выводить результаты по ходу измерений")
+    parser.add_argument("--startup", action="store_true",
+                        help=f"измерить время появления главного окна (цель — {STARTUP_TARGET * 1000:.0f} мс); "
+                             "только этот тест: --startup --only startup")
+    parser.add_argument("--startup-command", nargs="+",
+                        help="команда запуска программы для --startup (например, dist/calcveu_onedir/calcveu)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.only, args.repeats, None if args.quiet else print_result)
+    startup_slow = False
+    if args.startup:
+        try:
+            report["results"]["startup"] = measure_startup(args.startup_command, args.repeats)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            sys.stderr.write(f"Ошибка измерения времени запуска: {e}\n")
+            return 1
+        if not args.quiet:
+            print_result("startup", report["results"]["startup"])
+        startup_slow = report["results"]["startup"]["p50"] > STARTUP_TARGET
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if startup_slow:
+        sys.stderr.write(f"\nГлавное окно появляется за {report['results']['startup']['p50'] * 1000:.0f} мс, "
+                         f"цель — {STARTUP_TARGET * 1000:.0f} мс\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            sys.stderr.write("\nРЕГРЕССИЯ ПРОИЗВОДИТЕЛЬНОСТИ:\n" + "\n".join(regressions) + "\n")
+            return 1
+        sys.stderr.write("\nРегрессий относительно эталона нет\n")
+    return 1 if startup_slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from calcveu_batch import wind_power_batch
+
+
+# Таблица кривой мощности для одной конфигурации ВЭУ (радиус ротора и КПД).
+# Мощность заранее рассчитывается через wind_power_batch на сетке скоростей с шагом
+# bin_width от 0 до max_speed; между узлами используется линейная интерполяция.
+# Скорости вне таблицы рассчитываются точно, без интерполяции.
+class PowerCurveTable:
+    def __init__(self, rotor_radius, generator_efficiency, gearbox_efficiency, bin_width=0.01, max_speed=30):
+        self.rotor_radius = rotor_radius
+        self.generator_efficiency = generator_efficiency
+        self.gearbox_efficiency = gearbox_efficiency
+        self.max_speed = max_speed
+        self.bins = int(round(max_speed / bin_width))
+        self.speeds = np.linspace(0, max_speed, self.bins + 1)
+        self.power_curve = wind_power_batch(self.speeds, rotor_radius, generator_efficiency, gearbox_efficiency)
+        # Приращение мощности на каждом интервале сетки
+        self.slopes = np.diff(self.power_curve)
+
+    # Мощность (в ваттах) для массива (или числа) скоростей ветра.
+    # Сетка равномерная, поэтому номер интервала вычисляется делением, без двоичного поиска.
+    # Пропуски (NaN) и бесконечные значения рассчитываются как в wind_power_batch.
+    def power(self, speed):
+        speed = np.asarray(speed, dtype=np.float64)
+        if speed.ndim == 0:
+            return self.power(speed.reshape(1))[0]
+        position = speed * (self.bins / self.max_speed)
+        # NaN не ограничивается np.clip и дает недопустимый номер интервала
+        invalid = ~np.isfinite(position)
+        if np.any(invalid):
+            position[invalid] = 0
+        index = np.clip(position, 0, self.bins - 1).astype(np.intp)
+        position -= index
+        power = self.slopes[index]
+        power *= position
+        power += self.power_curve[index]
+        outside = (speed < 0) | (speed > self.max_speed) | invalid
+        if np.any(outside):
+            power[outside] = wind_power_batch(speed[outside], self.rotor_radius,
+                                              self.generator_efficiency, self.gearbox_efficiency)
+        return power
+
+    # Объем памяти, занимаемый таблицей (в байтах)
+    def nbytes(self):
+        return self.speeds.nbytes + self.power_curve.nbytes + self.slopes.nbytes
+
+
+# Кэш таблиц кривых мощности с вытеснением давно не использованных (LRU).
+# Ключ — конфигурация ВЭУ (радиус ротора, КПД генератора, КПД редуктора) и параметры сетки.
+# Счетчики попаданий, промахов и вытеснений помогают подобрать размер кэша (maxsize).
+class PowerCurveCache:
+    def __init__(self, maxsize=128, bin_width=0.01, max_speed=30):
+        self.maxsize = maxsize
+        self.bin_width = bin_width
+        self.max_speed = max_speed
+        self.tables = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Таблица для конфигурации ВЭУ; при отсутствии в кэше строится и добавляется
+    def get(self, rotor_radius, generator_efficiency, gearbox_efficiency):
+        key = (float(rotor_radius), float(generator_efficiency), float(gearbox_efficiency),
+               self.bin_width, self.max_speed)
+        with self.lock:
+            table = self.tables.get(key)
+            if table is not None:
+                self.hits += 1
+                self.tables.move_to_end(key)
+                return table
+            self.misses += 1
+
+        # Таблица строится вне блокировки, чтобы не задерживать другие потоки
+        table = PowerCurveTable(*key)
+        with self.lock:
+            self.tables[key] = table
+            self.tables.move_to_end(key)
+            while len(self.tables) > self.maxsize:
+                self.tables.popitem(last=False)
+                self.evictions += 1
+        return table
+
+    # Мощность (в ваттах) для скоростей ветра при заданной конфигурации ВЭУ
+    def power(self, speed, rotor_radius, generator_efficiency, gearbox_efficiency):
+        return self.get(rotor_radius, generator_efficiency, gearbox_efficiency).power(speed)
+
+    # Изменение размера кэша; лишние таблицы вытесняются сразу
+    def resize(self, maxsize):
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.tables) > self.maxsize:
+                self.tables.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    # Статистика использования кэша
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'size': len(self.tables),
+                'maxsize': self.maxsize,
+                'nbytes': sum(table.nbytes() for table in self.tables.values()),
+            }
+
+
+# Общий кэш кривых мощности
+power_curve_cache = PowerCurveCache()
+
+
+# Функция для расчета мощности ветрогенератора по кэшированной кривой мощности.
+# Принимает те же параметры, что и wind_power_batch; скорость может быть массивом.
+def wind_power_lookup(speed, rotor_radius, generator_efficiency, gearbox_efficiency):
+    return power_curve_cache.power(speed, rotor_radius, generator_efficiency, gearbox_efficiency)
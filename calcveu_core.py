@@ -0,0 +1,145 @@
+import math
+
+# Плотность воздуха (кг/м³), используемая при расчете мощности ветрогенератора
+WIND_POWER_DENSITY = 1.2041
+# Коэффициент мощности (КПД) ветроэнергетической установки
+WIND_POWER_CP = 0.593
+# Плотность воздуха (кг/м³) и коэффициент мощности для расчета номинальной мощности
+NOMINAL_POWER_DENSITY = 1.225
+NOMINAL_POWER_CP = 0.35
+# Стоимость аккумуляторных батарей (руб. за А·ч емкости): батарея 100 А·ч — 2000 руб.
+BATTERY_COST_PER_AH = 20
+
+# Функция для расчета мощности ветрогенератора.
+# Принимает на вход скорость ветра (в м/с), радиус ротора (в метрах),
+# коэффициенты КПД генератора и редуктора.
+# Возвращает прогнозируемую мощность ветрогенератора (в ваттах).
+def wind_power(speed, rotor_radius, generator_efficiency, gearbox_efficiency):
+    # Плотность воздуха (кг/м³)
+    density = WIND_POWER_DENSITY
+    # Коэффициент мощности (КПД) ветроэнергетической установки
+    cp = WIND_POWER_CP
+    # Площадь поперечного сечения ротора (м²)
+    area = math.pi * rotor_radius ** 2  
+    # Расчет мощности ветрогенератора по формуле
+    power = 0.5 * area * density * speed ** 3 * cp * generator_efficiency * gearbox_efficiency
+    return power
+
+
+# Функция для расчета энергии
+def calculate_energy(power):
+    hours_in_day = 24
+    days_in_month = 30
+    months_in_year = 12
+    energy_per_day = power / 1000 * hours_in_day
+    energy_per_month = energy_per_day * days_in_month
+    energy_per_year = energy_per_month * months_in_year
+    return energy_per_day, energy_per_month, energy_per_year
+
+
+def calculate_nominal_power(rotor_radius, generator_efficiency, wind_speed):
+    # Параметры для расчета номинальной мощности
+    density = NOMINAL_POWER_DENSITY  # Плотность воздуха в кг/м^3 (значение для стандартных атмосферных условий)
+    cp = NOMINAL_POWER_CP  # Коэффициент мощности ветроэнергетической установки (может меняться в зависимости от типа и модели)
+    
+    # Вычисление площади поперечного сечения ротора
+    rotor_area = math.pi * (rotor_radius ** 2)
+    
+    # Вычисление номинальной мощности
+    nominal_power = 0.5 * density * cp * rotor_area * (wind_speed ** 3) * generator_efficiency
+    
+    return nominal_power
+
+
+# Функция для расчета площади, занимаемой ВЭУ с мачтой на растяжках.
+# Принимает диаметр трубы мачты (м), высоту мачты (м) и угол натяжения растяжек (градусы).
+# Возвращает площадь (в кв. м).
+def calculate_ground_area(d, h, omega):
+    # Проверка соответствия значений диапазонам
+    if not (5 <= d <= 100):
+        raise ValueError("Диаметр трубы мачты должен быть в диапазоне от 5 до 100 м")
+
+    if not (0 <= h <= 200):
+        raise ValueError("Высота мачты должна быть в диапазоне от 0 до 200 м")
+
+    if not (0 <= omega <= 90):
+        raise ValueError("Угол натяжения растяжек должен быть в диапазоне от 0 до 90 градусов")
+
+    # Расчет площади занимаемой ВЭУ
+    S_m = math.pi * d ** 2 / 4
+    D_r = 2 * h * math.sin(math.radians(omega))
+    S_r = math.pi * D_r ** 2 / 4
+    return S_m + S_r
+
+
+# Функция для расчета стоимости аккумуляторных батарей.
+# Принимает емкость одной батареи (А·ч) и количество батарей.
+# Возвращает стоимость (в рублях) по удельной цене за ампер-час.
+def calculate_battery_bank_cost(capacity, quantity):
+    return capacity * quantity * BATTERY_COST_PER_AH
+
+
+# Функция для расчета экономических показателей ВЭУ.
+# Принимает суточную выработку (кВт·ч), цену за киловатт (руб.), стоимость установки (руб.),
+# срок службы (лет) и расходы на обслуживание (руб./год).
+# Возвращает словарь с затратами, доходом, прибылью и признаком целесообразности.
+def calculate_wind_turbine_economics(power, cost_per_kWh, cost, service_life, maintenance_cost):
+    # Преобразование введенных значений в нужный формат
+    power = float(power)
+    cost_per_kWh = float(cost_per_kWh)
+    cost = float(cost)
+    service_life = int(service_life)
+    maintenance_cost = float(maintenance_cost)
+
+    # Расчет общих затрат за срок службы
+    total_cost = cost + (maintenance_cost * service_life)
+
+    # Расчет среднегодовых затрат
+    average_annual_cost = total_cost / service_life
+
+    # Расчет годового дохода от ветрогенератора
+    annual_income = power * cost_per_kWh * 365  # Годовой доход = мощность * стоимость кВт-ч * количество дней в году
+
+    # Расчет прибыли в год
+    annual_profit = annual_income - average_annual_cost
+
+    # Расчет прибыли на весь срок службы
+    total_profit = annual_profit * service_life
+
+    return {
+        'average_annual_cost': average_annual_cost,
+        'annual_income': annual_income,
+        'annual_profit': annual_profit,
+        'total_profit': total_profit,
+        'feasible': average_annual_cost <= annual_income
+    }
+
+
+# Функция для расчета параметров компонентов ВЭУ по мощности и количеству лопастей.
+# Возвращает словарь с диаметром ротора, ометаемой площадью и параметрами лопастей.
+def calculate_wind_turbine_parameters(power, average_wind_speed, number_of_blades):
+    # Преобразование введенных значений в нужный формат
+    power = float(power)
+    average_wind_speed = float(average_wind_speed)
+    number_of_blades = int(number_of_blades)
+    air_density = 1.225  # Плотность воздуха, кг/м^3
+    wind_speed = average_wind_speed  # Средняя скорость ветра, м/с
+    filling_coefficient = 0.3  # Коэффициент заполняемости
+    
+    # Расчет параметров ВЭУ
+    rotor_diameter = math.sqrt(power / (0.5 * air_density * wind_speed**3 * filling_coefficient))
+    swept_area = 3.14 * (rotor_diameter / 2) ** 2
+    aspect_ratio = rotor_diameter / (number_of_blades * 2)
+    solidity_factor = number_of_blades / swept_area
+    blade_area = swept_area / number_of_blades
+    blade_length = (blade_area / aspect_ratio) ** 0.5
+
+    # Возвращаем рассчитанные параметры ВЭУ
+    return {
+        'rotor_diameter': round(rotor_diameter, 2),
+        'swept_area': round(swept_area, 2),
+        'aspect_ratio': round(aspect_ratio, 2),
+        'solidity_factor': round(solidity_factor, 2),
+        'blade_area': round(blade_area, 2),
+        'blade_length': round(blade_length, 2)
+    }
@@ -0,0 +1,111 @@
+import numpy as np
+
+from calcveu_core import WIND_POWER_DENSITY
+from calcveu_batch import EnergyIntegrator
+
+# Газовая постоянная сухого воздуха (Дж/(кг·К)) и ускорение свободного падения (м/с²)
+GAS_CONSTANT_DRY_AIR = 287.05
+GRAVITY = 9.80665
+# Вертикальный градиент температуры стандартной атмосферы (К/м)
+TEMPERATURE_LAPSE_RATE = 0.0065
+# Показатель степени профиля ветра для открытой местности
+DEFAULT_SHEAR_EXPONENT = 1 / 7
+# Параметр шероховатости (м) для открытой местности с низкой растительностью
+DEFAULT_ROUGHNESS_LENGTH = 0.03
+
+
+# Коэффициент пересчета скорости ветра с высоты измерения на высоты hub_heights (м).
+# method="power" — степенной закон (shear_exponent), method="log" — логарифмический
+# закон (roughness_length, м). Результат согласуется с hub_heights по правилам broadcasting.
+def shear_factor(measurement_height, hub_heights, method="power", shear_exponent=DEFAULT_SHEAR_EXPONENT,
+                 roughness_length=DEFAULT_ROUGHNESS_LENGTH):
+    hub_heights = np.asarray(hub_heights, dtype=np.float64)
+    if measurement_height <= 0 or np.any(hub_heights <= 0):
+        raise ValueError("Высоты должны быть положительными")
+    if method == "power":
+        return (hub_heights / measurement_height) ** shear_exponent
+    if method == "log":
+        if roughness_length <= 0 or measurement_height <= roughness_length or np.any(hub_heights <= roughness_length):
+            raise ValueError("Высоты должны быть больше параметра шероховатости")
+        return np.log(hub_heights / roughness_length) / np.log(measurement_height / roughness_length)
+    raise ValueError(f"Неизвестный закон профиля ветра: {method}")
+
+
+# Оценка показателя степени профиля ветра по измерениям на двух высотах мачты
+def estimate_shear_exponent(speed_low, speed_high, height_low, height_high):
+    mean_low = float(np.mean(speed_low))
+    mean_high = float(np.mean(speed_high))
+    if mean_low <= 0 or mean_high <= 0 or height_low <= 0 or height_high <= height_low:
+        raise ValueError("Неверные данные для оценки профиля ветра")
+    return np.log(mean_high / mean_low) / np.log(height_high / height_low)
+
+
+# Плотность сухого воздуха (кг/м³) по температуре (°C) и давлению (Па) на высоте измерения.
+# При height_difference (м) температура пересчитывается по стандартному градиенту,
+# а давление — по барометрической формуле. Массивы согласуются по правилам broadcasting.
+def air_density(temperature, pressure, height_difference=0.0):
+    temperature = np.asarray(temperature, dtype=np.float64) + 273.15
+    pressure = np.asarray(pressure, dtype=np.float64)
+    height_difference = np.asarray(height_difference, dtype=np.float64)
+    hub_temperature = temperature - TEMPERATURE_LAPSE_RATE * height_difference
+    # Барометрическая формула для слоя со средней температурой
+    mean_temperature = (temperature + hub_temperature) / 2
+    hub_pressure = pressure * np.exp(-GRAVITY * height_difference / (GAS_CONSTANT_DRY_AIR * mean_temperature))
+    return hub_pressure / (GAS_CONSTANT_DRY_AIR * hub_temperature)
+
+
+# Приведение ряда скоростей к высотам ступицы и к плотности воздуха формул мощности.
+# Мощность пропорциональна ρ·v³, поэтому поправка на плотность выполняется через
+# эквивалентную скорость v·(ρ/ρ₀)^(1/3), где ρ₀ = WIND_POWER_DENSITY; такие скорости можно
+# передавать в wind_power_batch и функции расчета энергии без изменений.
+# speed, temperature (°C) и pressure (Па) — ряды длины T на высоте измерения (температура и
+# давление необязательны); hub_heights — H высот. Возвращает массив H × T (для числа — T).
+def correct_wind_speed(speed, measurement_height, hub_heights, method="power",
+                       shear_exponent=DEFAULT_SHEAR_EXPONENT, roughness_length=DEFAULT_ROUGHNESS_LENGTH,
+                       temperature=None, pressure=None):
+    speed = np.asarray(speed, dtype=np.float64)
+    hub_heights = np.asarray(hub_heights, dtype=np.float64)
+    factor = shear_factor(measurement_height, hub_heights, method, shear_exponent, roughness_length)
+    corrected = np.multiply.outer(factor, speed)
+    if (temperature is None) != (pressure is None):
+        raise ValueError("Для расчета плотности воздуха нужны и температура, и давление")
+    if temperature is not None:
+        density = air_density(temperature, pressure, np.expand_dims(hub_heights - measurement_height, -1))
+        corrected *= np.cbrt(density / WIND_POWER_DENSITY)
+    return corrected
+
+
+# Энергия ВЭУ для нескольких высот ступицы по одному ряду измерений.
+# Ряд читается один раз порциями по chunk_size отсчетов: порция пересчитывается сразу на все
+# высоты (массив H × порция) и передается в накопители энергии отдельных высот, поэтому память
+# не зависит от длины ряда, а ряд, отображенный в память, не перечитывается для каждой высоты.
+# Температура и давление — ряды длины T или числа.
+# Возвращает словарь {высота: (энергия по суткам, месяцам, годам)} в формате calculate_energy_series.
+def calculate_hub_height_energy(timestamps, speeds, measurement_height, hub_heights, rotor_radius,
+                                generator_efficiency, gearbox_efficiency, method="power",
+                                shear_exponent=DEFAULT_SHEAR_EXPONENT, roughness_length=DEFAULT_ROUGHNESS_LENGTH,
+                                temperature=None, pressure=None, chunk_size=1000000, max_gap=3600):
+    timestamps = np.asarray(timestamps)
+    if not np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype("datetime64[s]")
+    if len(timestamps) != len(speeds):
+        raise ValueError("Количество отметок времени и скоростей ветра не совпадает")
+    hub_heights = np.atleast_1d(np.asarray(hub_heights, dtype=np.float64))
+
+    integrators = [EnergyIntegrator(rotor_radius, generator_efficiency, gearbox_efficiency, max_gap)
+                   for _ in hub_heights]
+    for start in range(0, len(speeds), chunk_size):
+        part = slice(start, start + chunk_size)
+        corrected = correct_wind_speed(speeds[part], measurement_height, hub_heights, method, shear_exponent,
+                                       roughness_length, _series_part(temperature, part),
+                                       _series_part(pressure, part))
+        for integrator, hub_speeds in zip(integrators, corrected):
+            integrator.add(timestamps[part], hub_speeds)
+    return {float(hub_height): integrator.result() for hub_height, integrator in zip(hub_heights, integrators)}
+
+
+# Порция ряда температуры или давления; число (и None) используется для всех отсчетов
+def _series_part(values, part):
+    if values is None or np.ndim(values) == 0:
+        return values
+    return np.asarray(values)[part]
@@ -0,0 +1,348 @@
+import itertools
+import sqlite3
+import threading
+import time
+
+from calcveu_core import calculate_energy
+from calcveu_metrics import metrics
+
+# Версия схемы базы данных (PRAGMA user_version). Версия 1 — таблица wind_power_results
+# из шести столбцов со временем в виде текста; при открытии такая база переводится на версию 2.
+SCHEMA_VERSION = 2
+# Столбцы таблицы результатов (по ним разрешены сортировка и фильтрация) в порядке записи:
+# номер запуска, время (секунды Unix), входные параметры, мощность и энергия
+RESULT_COLUMNS = ("run_id", "timestamp", "speed", "radius", "generator_efficiency", "gearbox_efficiency", "power",
+                  "energy_per_day", "energy_per_month", "energy_per_year")
+# Столбцы таблицы результатов, объявленные NOT NULL (остальные могут не иметь значения)
+NOT_NULL_COLUMNS = ("run_id", "timestamp", "power")
+# Столбцы сводных таблиц, которые обновляются при каждой записи результатов
+SUMMARY_COLUMNS = ("rows", "power_sum", "power_min", "power_max", "energy_per_day_sum", "energy_per_month_sum",
+                   "energy_per_year_sum")
+SECONDS_PER_DAY = 86400
+
+_INSERT_RESULT = (f"INSERT INTO wind_power_results ({', '.join(RESULT_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(RESULT_COLUMNS))})")
+_SUMMARY_SELECT = ("COUNT(*), TOTAL(power), MIN(power), MAX(power), TOTAL(energy_per_day), "
+                   "TOTAL(energy_per_month), TOTAL(energy_per_year)")
+_SUMMARY_UPDATE = ("rows = rows + excluded.rows, power_sum = power_sum + excluded.power_sum, "
+                   "power_min = MIN(power_min, excluded.power_min), power_max = MAX(power_max, excluded.power_max), "
+                   "energy_per_day_sum = energy_per_day_sum + excluded.energy_per_day_sum, "
+                   "energy_per_month_sum = energy_per_month_sum + excluded.energy_per_month_sum, "
+                   "energy_per_year_sum = energy_per_year_sum + excluded.energy_per_year_sum")
+
+
+# Хранилище результатов расчета в базе данных SQLite.
+# Держит одно долговременное соединение, создает таблицы один раз при открытии,
+# включает режим WAL и поддерживает пакетную запись через executemany.
+# Результаты хранятся с целым временем (секунды Unix) и номером запуска (таблица runs);
+# сводки по запускам (run_summary) и по дням (daily_summary) обновляются в той же транзакции,
+# что и запись строк, поэтому итоги читаются из небольших таблиц без просмотра всех результатов.
+# Соединение защищено блокировкой, поэтому хранилищем можно пользоваться из разных потоков.
+# С read_only=True открывается соединение только для чтения существующей базы (без создания
+# таблиц и перевода схемы): в режиме WAL оно читает параллельно с записью через другое соединение.
+class WindPowerResultsRepository:
+    def __init__(self, path='wind_power_results.db', batch_size=10000, read_only=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        if read_only:
+            from pathlib import Path
+
+            self.conn = sqlite3.connect(Path(path).absolute().as_uri() + "?mode=ro", uri=True,
+                                        check_same_thread=False)
+            return
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # В режиме WAL synchronous=NORMAL не нарушает целостность базы и ускоряет запись
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(wind_power_results)")]
+        if version < SCHEMA_VERSION and "date_time" in columns:
+            self.migrate_v1()
+        else:
+            with self.conn:
+                self.create_schema()
+
+    # Создание таблиц, индексов и сводных таблиц (если их нет)
+    def create_schema(self):
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS runs
+                 (run_id INTEGER PRIMARY KEY, name TEXT, source TEXT, created INTEGER)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS wind_power_results
+                 (run_id INTEGER NOT NULL, timestamp INTEGER NOT NULL, speed REAL, radius REAL,
+                 generator_efficiency REAL, gearbox_efficiency REAL, power REAL NOT NULL,
+                 energy_per_day REAL, energy_per_month REAL, energy_per_year REAL)""")
+        # Индексы для постраничного просмотра, сортировки и фильтрации
+        for column in ("timestamp", "speed", "radius", "run_id"):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_wind_power_results_{column} "
+                              f"ON wind_power_results ({column})")
+        summary = ("rows INTEGER, power_sum REAL, power_min REAL, power_max REAL, energy_per_day_sum REAL, "
+                   "energy_per_month_sum REAL, energy_per_year_sum REAL")
+        self.conn.execute(f"""CREATE TABLE IF NOT EXISTS run_summary
+                 (run_id INTEGER PRIMARY KEY, {summary}, first_timestamp INTEGER, last_timestamp INTEGER)""")
+        self.conn.execute(f"""CREATE TABLE IF NOT EXISTS daily_summary
+                 (run_id INTEGER, day INTEGER, {summary}, PRIMARY KEY (run_id, day)) WITHOUT ROWID""")
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Перевод базы версии 1 на текущую схему: строки переносятся в один запуск, текстовое время
+    # (местное) переводится в секунды Unix, энергия рассчитывается по мощности, как в интерфейсе.
+    # Перенос выполняется одной транзакцией: при ошибке база остается в прежнем виде.
+    def migrate_v1(self):
+        from datetime import datetime
+
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("ALTER TABLE wind_power_results RENAME TO wind_power_results_v1")
+            for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                                             "AND tbl_name = 'wind_power_results_v1'").fetchall():
+                self.conn.execute(f"DROP INDEX {name}")
+            self.create_schema()
+            run_id = self.insert_run("Перенесено из прежней версии", self.path)
+            cursor = self.conn.execute("SELECT speed, radius, generator_efficiency, gearbox_efficiency, power, "
+                                       "date_time FROM wind_power_results_v1 ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                converted = []
+                for speed, radius, generator_efficiency, gearbox_efficiency, power, date_time in rows:
+                    try:
+                        timestamp = int(datetime.fromisoformat(date_time).timestamp())
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Не удалось перенести результат с датой {date_time!r}")
+                    converted.append((run_id, timestamp, speed, radius, generator_efficiency, gearbox_efficiency,
+                                      power) + calculate_energy(power))
+                self.insert_rows(converted)
+            self.conn.execute("DROP TABLE wind_power_results_v1")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def insert_run(self, name, source, created=None):
+        created = int(time.time()) if created is None else created
+        return self.conn.execute("INSERT INTO runs (name, source, created) VALUES (?, ?, ?)",
+                                 (name, source, created)).lastrowid
+
+    # Создание запуска (сценария расчета). Возвращает его номер для столбца run_id.
+    def create_run(self, name, source="", created=None):
+        with self.lock:
+            with self.conn:
+                return self.insert_run(name, source, created)
+
+    # Запись строк и обновление сводок в текущей транзакции.
+    # Новые строки получают rowid больше прежнего максимального, поэтому сводки пересчитываются
+    # только по ним. NOT INDEXED нужен, чтобы диапазон rowid читался по первичному ключу:
+    # иначе SQLite выбирает индекс run_id и просматривает всю таблицу.
+    def insert_rows(self, rows):
+        last_rowid = self.conn.execute("SELECT IFNULL(MAX(rowid), 0) FROM wind_power_results").fetchone()[0]
+        self.conn.executemany(_INSERT_RESULT, rows)
+        self.conn.execute(f"""INSERT INTO run_summary (run_id, {', '.join(SUMMARY_COLUMNS)}, first_timestamp,
+                 last_timestamp)
+                 SELECT run_id, {_SUMMARY_SELECT}, MIN(timestamp), MAX(timestamp)
+                 FROM wind_power_results NOT INDEXED WHERE rowid > ? GROUP BY run_id
+                 ON CONFLICT (run_id) DO UPDATE SET {_SUMMARY_UPDATE},
+                 first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+                 last_timestamp = MAX(last_timestamp, excluded.last_timestamp)""", (last_rowid,))
+        self.conn.execute(f"""INSERT INTO daily_summary (run_id, day, {', '.join(SUMMARY_COLUMNS)})
+                 SELECT run_id, timestamp / {SECONDS_PER_DAY}, {_SUMMARY_SELECT}
+                 FROM wind_power_results NOT INDEXED WHERE rowid > ? GROUP BY run_id, timestamp / {SECONDS_PER_DAY}
+                 ON CONFLICT (run_id, day) DO UPDATE SET {_SUMMARY_UPDATE}""", (last_rowid,))
+
+    # Сохранение одного результата (аргументы — в порядке RESULT_COLUMNS).
+    # Если энергия не передана, она рассчитывается по мощности (calculate_energy), как в интерфейсе.
+    def save(self, run_id, timestamp, speed, radius, generator_efficiency, gearbox_efficiency, power,
+             energy_per_day=None, energy_per_month=None, energy_per_year=None):
+        if energy_per_day is None and energy_per_month is None and energy_per_year is None:
+            energy_per_day, energy_per_month, energy_per_year = calculate_energy(power)
+        with metrics.stage("db.save"), self.lock:
+            with self.conn:
+                self.insert_rows([(run_id, timestamp, speed, radius, generator_efficiency, gearbox_efficiency, power,
+                                   energy_per_day, energy_per_month, energy_per_year)])
+        metrics.count("db.rows")
+
+    # Пакетное сохранение результатов.
+    # Принимает итерируемый объект кортежей в порядке RESULT_COLUMNS; записывает их порциями
+    # по batch_size строк, каждая порция вместе с обновлением сводок — одна транзакция.
+    # Возвращает количество записанных строк.
+    def save_many(self, rows, batch_size=None):
+        batch_size = batch_size or self.batch_size
+        rows = iter(rows)
+        count = 0
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return count
+            with metrics.stage("db.save_many"), self.lock:
+                with self.conn:
+                    self.insert_rows(batch)
+            count += len(batch)
+            metrics.count("db.rows", len(batch))
+
+    # Условия WHERE для фильтров вида {столбец: (от, до)}; любая граница может быть None
+    def filter_conditions(self, filters):
+        conditions = []
+        params = []
+        for column, (low, high) in (filters or {}).items():
+            if column not in RESULT_COLUMNS:
+                raise ValueError(f"Неизвестный столбец: {column}")
+            if low is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(high)
+        return conditions, params
+
+    # Получение одной страницы результатов с постраничной навигацией по ключу.
+    # Строки упорядочены по (sort_column, rowid); after — ключ последней строки
+    # предыдущей страницы (None для первой страницы). Благодаря индексам запрос
+    # не зависит от номера страницы и не читает всю таблицу.
+    # Возвращает список строк (rowid, run_id, timestamp, ...) и ключ для следующей страницы.
+    def fetch_page(self, sort_column="timestamp", descending=False, after=None, limit=200, filters=None):
+        if sort_column not in RESULT_COLUMNS:
+            raise ValueError(f"Неизвестный столбец: {sort_column}")
+        conditions, params = self.filter_conditions(filters)
+        order = "DESC" if descending else "ASC"
+        rows = []
+        with metrics.stage("db.fetch_page"), self.lock:
+            for condition, segment_params in _page_segments(sort_column, descending, after):
+                where = " AND ".join(conditions + ([condition] if condition else []))
+                query = (f"SELECT rowid, {', '.join(RESULT_COLUMNS)} FROM wind_power_results "
+                         f"{'WHERE ' + where if where else ''} "
+                         f"ORDER BY {sort_column} {order}, rowid {order} LIMIT ?")
+                rows += self.conn.execute(query, params + segment_params + [limit - len(rows)]).fetchall()
+                if len(rows) >= limit:
+                    break
+        if not rows:
+            return rows, after
+        last = rows[-1]
+        return rows, (last[RESULT_COLUMNS.index(sort_column) + 1], last[0])
+
+    # Количество результатов, удовлетворяющих фильтрам.
+    # Без фильтров или с фильтром только по run_id количество берется из сводки по запускам.
+    def count(self, filters=None):
+        conditions, params = self.filter_conditions(filters)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        if set(filters or ()) <= {"run_id"}:
+            query = f"SELECT IFNULL(SUM(rows), 0) FROM run_summary {where}"
+        else:
+            query = f"SELECT COUNT(*) FROM wind_power_results {where}"
+        with metrics.stage("db.count"), self.lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    # Сводка по запускам: список словарей с названием, временем создания, количеством строк,
+    # средней, минимальной и максимальной мощностью и суммами энергии (читается из run_summary)
+    def run_summaries(self):
+        query = (f"SELECT runs.run_id, runs.name, runs.source, runs.created, "
+                 f"{', '.join('run_summary.' + column for column in SUMMARY_COLUMNS)}, "
+                 f"run_summary.first_timestamp, run_summary.last_timestamp "
+                 f"FROM run_summary JOIN runs USING (run_id) ORDER BY runs.run_id")
+        with metrics.stage("db.summary"), self.lock:
+            rows = self.conn.execute(query).fetchall()
+        names = ("run_id", "name", "source", "created") + SUMMARY_COLUMNS + ("first_timestamp", "last_timestamp")
+        return [_with_mean_power(dict(zip(names, row))) for row in rows]
+
+    # Сводка по дням (UTC) для одного запуска или всех запусков вместе; start и end — секунды Unix.
+    # Возвращает список словарей с началом суток (day_start) и теми же итогами, что run_summaries.
+    def daily_summaries(self, run_id=None, start=None, end=None):
+        conditions = []
+        params = []
+        if run_id is not None:
+            conditions.append("run_id = ?")
+            params.append(run_id)
+        if start is not None:
+            conditions.append("day >= ?")
+            params.append(start // SECONDS_PER_DAY)
+        if end is not None:
+            conditions.append("day <= ?")
+            params.append(end // SECONDS_PER_DAY)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        query = (f"SELECT day, SUM(rows), TOTAL(power_sum), MIN(power_min), MAX(power_max), "
+                 f"TOTAL(energy_per_day_sum), TOTAL(energy_per_month_sum), TOTAL(energy_per_year_sum) "
+                 f"FROM daily_summary {where} GROUP BY day ORDER BY day")
+        with metrics.stage("db.summary"), self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [_with_mean_power(dict(zip(("day_start",) + SUMMARY_COLUMNS, (row[0] * SECONDS_PER_DAY,) + row[1:])))
+                for row in rows]
+
+    # Прерывание выполняющегося запроса (вызывается из другого потока, без блокировки);
+    # прерванный запрос завершается исключением sqlite3.OperationalError
+    def interrupt(self):
+        self.conn.interrupt()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Условия WHERE для строк после ключа after = (значение, rowid) в порядке fetch_page.
+# Столбцы энергии и входных параметров могут быть NULL; SQLite ставит NULL перед любыми значениями
+# при сортировке по возрастанию и после них при сортировке по убыванию, а сравнение с NULL
+# не выполняется, поэтому строки с NULL выбираются отдельным запросом. Возвращает список
+# частей (условие, параметры) в порядке просмотра: каждая часть — простое условие, для которого
+# используется индекс, а следующая часть читается, только если предыдущей не хватило на страницу.
+def _page_segments(sort_column, descending, after):
+    if after is None:
+        return [(None, [])]
+    value, rowid = after
+    if sort_column in NOT_NULL_COLUMNS:
+        return [(f"({sort_column}, rowid) {'<' if descending else '>'} (?, ?)", [value, rowid])]
+    if not descending:
+        if value is None:
+            return [(f"{sort_column} IS NULL AND rowid > ?", [rowid]), (f"{sort_column} IS NOT NULL", [])]
+        return [(f"({sort_column}, rowid) > (?, ?)", [value, rowid])]
+    if value is None:
+        return [(f"{sort_column} IS NULL AND rowid < ?", [rowid])]
+    return [(f"({sort_column}, rowid) < (?, ?)", [value, rowid]), (f"{sort_column} IS NULL", [])]
+
+
+# Средняя мощность по сумме и количеству строк сводки
+def _with_mean_power(summary):
+    summary["power_mean"] = summary["power_sum"] / summary["rows"] if summary["rows"] else 0.0
+    return summary
+
+
+# Общее хранилище результатов, открывается при первом обращении
+results_repository = None
+results_repository_lock = threading.Lock()
+# Запуск, в который записываются результаты, сохраненные из интерфейса в текущем сеансе
+session_run_id = None
+
+
+def get_results_repository():
+    global results_repository
+    with results_repository_lock:
+        if results_repository is None:
+            results_repository = WindPowerResultsRepository()
+        return results_repository
+
+
+# Отдельное соединение только для чтения с той же базой (например, для окна просмотра результатов):
+# прерывание его запросов не затрагивает запись через общее хранилище. База при необходимости
+# создается или переводится на новую схему общим хранилищем. Закрывает соединение вызывающий.
+def open_results_reader():
+    return WindPowerResultsRepository(get_results_repository().path, read_only=True)
+
+
+# Функция для сохранения в базу данных SQLite.
+# Результаты одного сеанса программы относятся к одному запуску, который создается при первом сохранении.
+def save_to_database(speed, radius, generator_efficiency, gearbox_efficiency, power, energy_per_day=None,
+                     energy_per_month=None, energy_per_year=None, timestamp=None):
+    global session_run_id
+    repository = get_results_repository()
+    with results_repository_lock:
+        if session_run_id is None:
+            session_run_id = repository.create_run("Расчеты в интерфейсе", "calcveu.py")
+    repository.save(session_run_id, int(time.time()) if timestamp is None else timestamp, speed, radius,
+                    generator_efficiency, gearbox_efficiency, power, energy_per_day, energy_per_month,
+                    energy_per_year)
+
+
+# Закрытие общего хранилища результатов, если оно было открыто
+def close_results_repository():
+    global results_repository, session_run_id
+    with results_repository_lock:
+        if results_repository is not None:
+            results_repository.close()
+            results_repository = None
+            session_run_id = None
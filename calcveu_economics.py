@@ -0,0 +1,117 @@
+import numpy as np
+
+
+# Построение матрицы годовых денежных потоков для набора проектов.
+# Все параметры — массивы одной длины (по проекту) или числа:
+# capex — капитальные затраты (руб.), annual_energy — годовая выработка (кВт·ч),
+# tariff — цена электроэнергии в первый год (руб./кВт·ч), maintenance_cost — расходы
+# на обслуживание в первый год (руб./год), service_life — срок службы (лет),
+# tariff_escalation и maintenance_escalation — ежегодный рост цены и расходов (доли).
+# Вместо роста цены можно передать готовую траекторию тарифов tariff_path (проекты × годы).
+# energy_degradation — ежегодное снижение выработки (доли), например из-за износа оборудования.
+# Возвращает матрицу (проекты × (годы + 1)): столбец 0 — инвестиции, далее — чистый доход
+# по годам; годы после окончания срока службы проекта заполнены нулями.
+def build_cash_flows(capex, annual_energy, tariff, maintenance_cost, service_life,
+                     tariff_escalation=0.0, maintenance_escalation=0.0, tariff_path=None, energy_degradation=0.0):
+    (capex, annual_energy, tariff, maintenance_cost, service_life, tariff_escalation, maintenance_escalation,
+     energy_degradation) = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in
+                                                 (capex, annual_energy, tariff, maintenance_cost, service_life,
+                                                  tariff_escalation, maintenance_escalation, energy_degradation)))
+    service_life = service_life.astype(np.int64)
+    if np.any(service_life <= 0):
+        raise ValueError("Срок службы должен быть положительным")
+    years = int(service_life.max())
+    # Номер года эксплуатации начиная с нуля: показатель степени для роста цен
+    year = np.arange(years)
+
+    if tariff_path is not None:
+        tariffs = np.broadcast_to(np.asarray(tariff_path, dtype=np.float64), (len(capex), years))
+    else:
+        tariffs = tariff[:, None] * (1 + tariff_escalation[:, None]) ** year
+    maintenance = maintenance_cost[:, None] * (1 + maintenance_escalation[:, None]) ** year
+
+    energy = annual_energy[:, None] * (1 - energy_degradation[:, None]) ** year
+
+    cash_flows = np.zeros((len(capex), years + 1))
+    cash_flows[:, 0] = -capex
+    cash_flows[:, 1:] = energy * tariffs - maintenance
+    cash_flows[:, 1:][year >= service_life[:, None]] = 0
+    return cash_flows
+
+
+# Коэффициенты дисконтирования (проекты × годы) для ставок discount_rate
+def discount_factors(discount_rate, years, projects):
+    discount_rate = np.broadcast_to(np.asarray(discount_rate, dtype=np.float64), (projects,))
+    return (1 + discount_rate[:, None]) ** -np.arange(years)
+
+
+# Чистая приведенная стоимость (руб.) для каждой строки матрицы денежных потоков
+def calculate_npv(cash_flows, discount_rate):
+    return np.einsum("ij,ij->i", cash_flows, discount_factors(discount_rate, cash_flows.shape[1], len(cash_flows)))
+
+
+# Внутренняя норма доходности для каждой строки матрицы денежных потоков.
+# Все проекты решаются одновременно методом бисекции на интервале [low, high];
+# для проектов, у которых ЧПС не меняет знак на интервале, возвращается NaN.
+def calculate_irr(cash_flows, low=-0.99, high=10.0, iterations=100):
+    projects = len(cash_flows)
+    low = np.full(projects, low)
+    high = np.full(projects, high)
+    npv_low = calculate_npv(cash_flows, low)
+    npv_high = calculate_npv(cash_flows, high)
+    valid = np.sign(npv_low) != np.sign(npv_high)
+
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        npv_middle = calculate_npv(cash_flows, middle)
+        # Корень остается на той половине интервала, где ЧПС меняет знак
+        same_sign = np.sign(npv_middle) == np.sign(npv_low)
+        low = np.where(same_sign, middle, low)
+        npv_low = np.where(same_sign, npv_middle, npv_low)
+        high = np.where(same_sign, high, middle)
+    return np.where(valid, (low + high) / 2, np.nan)
+
+
+# Приведенная стоимость электроэнергии LCOE (руб./кВт·ч):
+# дисконтированные затраты (инвестиции и обслуживание), деленные на дисконтированную выработку.
+def calculate_lcoe(capex, annual_energy, maintenance_cost, service_life, discount_rate, maintenance_escalation=0.0,
+                   energy_degradation=0.0):
+    energy_flows = build_cash_flows(0, annual_energy, 1, 0, service_life, energy_degradation=energy_degradation)
+    cost_flows = -build_cash_flows(capex, 0, 0, maintenance_cost, service_life,
+                                   maintenance_escalation=maintenance_escalation)
+    return calculate_npv(cost_flows, discount_rate) / calculate_npv(energy_flows, discount_rate)
+
+
+# Дисконтированный срок окупаемости (лет) для каждой строки матрицы денежных потоков.
+# Год окупаемости уточняется линейной интерполяцией внутри года;
+# для проектов, которые не окупаются за срок службы, возвращается inf.
+def calculate_discounted_payback(cash_flows, discount_rate):
+    discounted = cash_flows * discount_factors(discount_rate, cash_flows.shape[1], len(cash_flows))
+    cumulative = np.cumsum(discounted, axis=1)
+    paid_back = cumulative >= 0
+    # Первый год, в конце которого накопленный поток неотрицателен (столбец 0 — инвестиции)
+    year = np.where(paid_back.any(axis=1), paid_back.argmax(axis=1), -1)
+    rows = np.arange(len(cash_flows))
+    previous = cumulative[rows, np.maximum(year - 1, 0)]
+    current = discounted[rows, year]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(year > 0, -previous / current, 0.0)
+    return np.where(year >= 0, np.maximum(year - 1, 0) + fraction, np.inf)
+
+
+# Расчет экономических показателей для портфеля проектов за один проход.
+# Параметры как у build_cash_flows, discount_rate — ставка дисконтирования (доли).
+# Возвращает словарь массивов: npv (руб.), irr (доли), lcoe (руб./кВт·ч),
+# discounted_payback (лет) и cash_flows — матрицу денежных потоков.
+def evaluate_projects(capex, annual_energy, tariff, maintenance_cost, service_life, discount_rate,
+                      tariff_escalation=0.0, maintenance_escalation=0.0, tariff_path=None, energy_degradation=0.0):
+    cash_flows = build_cash_flows(capex, annual_energy, tariff, maintenance_cost, service_life,
+                                  tariff_escalation, maintenance_escalation, tariff_path, energy_degradation)
+    return {
+        'npv': calculate_npv(cash_flows, discount_rate),
+        'irr': calculate_irr(cash_flows),
+        'lcoe': calculate_lcoe(capex, annual_energy, maintenance_cost, service_life, discount_rate,
+                               maintenance_escalation, energy_degradation),
+        'discounted_payback': calculate_discounted_payback(cash_flows, discount_rate),
+        'cash_flows': cash_flows,
+    }
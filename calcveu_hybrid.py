@@ -0,0 +1,240 @@
+import math
+
+import numpy as np
+
+from calcveu_batch import wind_power_batch, HOURS_IN_YEAR
+from calcveu_solar import STC_TEMPERATURE, make_module, module_power
+
+# Номинальная мощность модуля (Вт) для удельного профиля СБ: 1 кВт установленной мощности
+UNIT_MODULE_POWER = 1000.0
+# Расчетная скорость ветра (м/с), при которой ВЭУ выходит на установленную мощность
+RATED_WIND_SPEED = 12.0
+
+
+# Мощность ВЭУ (кВт) на единицу масштаба r² · КПД генератора · КПД редуктора.
+# Формула wind_power пропорциональна этому произведению, поэтому профиль ветра рассчитывается
+# один раз, а для каждой конфигурации умножается на свой масштаб (wind_scale).
+def wind_unit_profile(wind_speed):
+    return wind_power_batch(np.asarray(wind_speed, dtype=np.float64), 1.0, 1.0, 1.0) / 1000
+
+
+# Масштаб ветровой части конфигурации: количество ВЭУ · r² · КПД генератора · КПД редуктора
+def wind_scale(rotor_radius, generator_efficiency, gearbox_efficiency, turbines=1):
+    return (np.asarray(turbines, dtype=np.float64) * np.asarray(rotor_radius, dtype=np.float64) ** 2
+            * generator_efficiency * gearbox_efficiency)
+
+
+# Выработка СБ (кВт) на 1 кВт установленной мощности по освещенности (Вт/м²) в плоскости модулей
+# и температуре воздуха (°C). Используется модель модуля calcveu_solar (module_power): потери
+# и снижение мощности при нагреве; module — параметры make_module (номинальная мощность не важна).
+def solar_unit_profile(irradiance, temperature=STC_TEMPERATURE, module=None):
+    irradiance = np.atleast_1d(np.asarray(irradiance, dtype=np.float64))
+    if module is None:
+        module = make_module(UNIT_MODULE_POWER)
+    temperature = np.broadcast_to(np.asarray(temperature, dtype=np.float64), irradiance.shape)
+    return module_power(irradiance[:, None], temperature, module)[:, 0] / module['nominal_power']
+
+
+# Синтетические почасовые профили для оценки ГЭУ, когда рядов наблюдений нет:
+# скорость ветра (м/с) — распределение Вейбулла с параметром формы weibull_k и средним
+# average_wind_speed, освещенность (Вт/м²) — синусоида с 6 до 18 часов с максимумом
+# peak_irradiance в полдень. Розыгрыш ветра зависит только от seed.
+def synthetic_profiles(average_wind_speed, peak_irradiance, hours=HOURS_IN_YEAR, weibull_k=2.0, seed=0):
+    if average_wind_speed < 0 or peak_irradiance < 0 or weibull_k <= 0:
+        raise ValueError("Средняя скорость ветра и освещенность не могут быть отрицательными")
+    scale = average_wind_speed / math.gamma(1 + 1 / weibull_k)
+    wind_speed = scale * np.random.default_rng(seed).weibull(weibull_k, hours)
+    hour_of_day = np.arange(hours) % 24
+    irradiance = peak_irradiance * np.maximum(np.sin((hour_of_day - 6) * np.pi / 12), 0)
+    return wind_speed, irradiance
+
+
+# Почасовое (или с шагом step_hours) моделирование гибридной энергоустановки ВЭУ + СБ + АКБ
+# сразу для набора конфигураций.
+# wind_profile и solar_profile — удельные профили выработки (кВт) длиной T
+# (wind_unit_profile и solar_unit_profile), load — нагрузка (кВт) длиной T.
+# Параметры конфигураций — массивы длины N или числа: wind_scale — масштаб ветровой части,
+# solar_power — установленная мощность СБ (кВт), battery_capacity — емкость АКБ (кВт·ч),
+# battery_power — предельная мощность заряда и разряда (кВт), charge_efficiency и
+# discharge_efficiency — КПД заряда и разряда, min_soc — допустимый остаток заряда (доля емкости),
+# initial_soc — начальный заряд (доля емкости).
+# Избыток выработки заряжает АКБ, остальное сбрасывается (curtailment); недостаток покрывается
+# разрядом АКБ, а непокрытая часть учитывается как недоотпуск (unmet_load).
+# Цикл идет по времени, а все конфигурации обрабатываются одной векторной операцией;
+# баланс рассчитывается блоками по block_size шагов, чтобы ограничить память.
+# Возвращает словарь массивов длины N (энергия в кВт·ч), при keep_soc=True — и заряд АКБ (T × N).
+def simulate_dispatch(wind_profile, solar_profile, load, wind_scale, solar_power, battery_capacity,
+                      battery_power=np.inf, charge_efficiency=0.95, discharge_efficiency=0.95,
+                      min_soc=0.2, initial_soc=1.0, step_hours=1.0, block_size=168, keep_soc=False):
+    wind_profile = np.asarray(wind_profile, dtype=np.float64)
+    solar_profile = np.asarray(solar_profile, dtype=np.float64)
+    load = np.asarray(load, dtype=np.float64)
+    if not (wind_profile.shape == solar_profile.shape == load.shape) or load.ndim != 1:
+        raise ValueError("Профили ветра, солнца и нагрузки должны быть одномерными массивами одной длины")
+    (wind_scale, solar_power, battery_capacity, battery_power, charge_efficiency, discharge_efficiency,
+     min_soc, initial_soc) = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in
+                                                   (wind_scale, solar_power, battery_capacity, battery_power,
+                                                    charge_efficiency, discharge_efficiency, min_soc, initial_soc)))
+    if np.any(battery_capacity < 0) or np.any(charge_efficiency <= 0) or np.any(discharge_efficiency <= 0):
+        raise ValueError("Емкость АКБ не может быть отрицательной, КПД должны быть положительными")
+
+    steps = len(load)
+    configurations = len(wind_scale)
+    # Пределы за один шаг: энергия, которую можно запасти и выдать (кВт·ч)
+    charge_limit = battery_power * step_hours * charge_efficiency
+    discharge_limit = battery_power * step_hours
+    soc_floor = battery_capacity * min_soc
+
+    soc = battery_capacity * initial_soc
+    unmet = np.zeros(configurations)
+    curtailed = np.zeros(configurations)
+    charged = np.zeros(configurations)
+    discharged = np.zeros(configurations)
+    unmet_steps = np.zeros(configurations, dtype=np.int64)
+    soc_history = np.empty((steps, configurations)) if keep_soc else None
+    stored = np.empty(configurations)
+    delivered = np.empty(configurations)
+
+    for block_start in range(0, steps, block_size):
+        block = slice(block_start, min(block_start + block_size, steps))
+        # Баланс (кВт·ч) за шаг для всех конфигураций блока: выработка минус нагрузка
+        balance = (np.outer(wind_profile[block], wind_scale) + np.outer(solar_profile[block], solar_power)
+                   - load[block, None]) * step_hours
+        surplus = np.maximum(balance, 0)
+        deficit = np.maximum(-balance, 0)
+
+        for step in range(balance.shape[0]):
+            # Заряд: запасается избыток с учетом КПД, но не больше свободной емкости и предела мощности
+            np.multiply(surplus[step], charge_efficiency, out=stored)
+            np.minimum(stored, battery_capacity - soc, out=stored)
+            np.minimum(stored, charge_limit, out=stored)
+            curtailed += surplus[step] - stored / charge_efficiency
+            # Разряд: выдается недостающая энергия, пока заряд выше допустимого остатка
+            np.multiply(soc - soc_floor, discharge_efficiency, out=delivered)
+            np.minimum(delivered, discharge_limit, out=delivered)
+            np.minimum(delivered, deficit[step], out=delivered)
+            np.maximum(delivered, 0, out=delivered)
+            soc += stored
+            soc -= delivered / discharge_efficiency
+            charged += stored
+            discharged += delivered
+            shortage = deficit[step] - delivered
+            unmet += shortage
+            unmet_steps += shortage > 1e-9
+            if keep_soc:
+                soc_history[block_start + step] = soc
+
+    load_energy = float(load.sum() * step_hours)
+    result = {
+        'load': np.full(configurations, load_energy),
+        'wind_energy': wind_profile.sum() * step_hours * wind_scale,
+        'solar_energy': solar_profile.sum() * step_hours * solar_power,
+        'unmet_load': unmet,
+        'curtailment': curtailed,
+        'battery_charge': charged,
+        'battery_discharge': discharged,
+        # Доля нагрузки, не обеспеченная энергией (LPSP), и число шагов с недоотпуском
+        'unmet_fraction': unmet / load_energy if load_energy > 0 else np.zeros(configurations),
+        'unmet_hours': unmet_steps * step_hours,
+        'final_soc': soc,
+    }
+    if keep_soc:
+        result['soc'] = soc_history
+    return result
+
+
+# Изменение запаса энергии в АКБ (кВт·ч) на каждом шаге, если емкость не ограничена:
+# избыток заряжает АКБ с КПД заряда, недостаток покрывается разрядом с КПД разряда,
+# оба ограничены мощностью battery_power. Возвращает приращения и недоотпуск (кВт·ч),
+# вызванный только ограничением мощности (он не зависит от емкости).
+def battery_increments(generation, load, battery_power=np.inf, charge_efficiency=0.95,
+                       discharge_efficiency=0.95, step_hours=1.0):
+    balance = (np.asarray(generation, dtype=np.float64) - np.asarray(load, dtype=np.float64)) * step_hours
+    limit = battery_power * step_hours
+    charge = np.minimum(np.maximum(balance, 0), limit) * charge_efficiency
+    discharge = np.minimum(np.maximum(-balance, 0), limit)
+    power_unmet = float(np.maximum(-balance - limit, 0).sum())
+    return charge - discharge / discharge_efficiency, power_unmet
+
+
+# Недостаток запаса (кВт·ч) за весь период для АКБ с полезной емкостью usable_capacity,
+# заряженной в начале периода. Рекуррентное соотношение заряда считается простым циклом
+# по списку чисел: без вызовов NumPy на каждом шаге год минутных данных обрабатывается
+# за сотые доли секунды.
+def _battery_shortfall(increments, usable_capacity):
+    soc = usable_capacity
+    shortfall = 0.0
+    for increment in increments:
+        soc += increment
+        if soc < 0:
+            shortfall -= soc
+            soc = 0.0
+        elif soc > usable_capacity:
+            soc = usable_capacity
+    return shortfall
+
+
+# Подбор минимальной емкости АКБ по графику нагрузки и профилю выработки (кВт, шаг step_hours).
+# Целевая автономность: недоотпуск не больше max_unmet_fraction от потребления и
+# запас на autonomy_hours часов средней нагрузки без выработки (время гарантированного
+# энергоснабжения из окна параметров АКБ).
+# Емкость без недоотпуска находится сразу: это наибольшая глубина разряда АКБ неограниченной
+# емкости. При допустимом недоотпуске емкость уточняется бисекцией: недоотпуск не растет
+# с увеличением емкости. battery_capacity_ah и voltage — емкость (А·ч) и напряжение (В)
+# одной батареи для расчета их количества.
+# Возвращает словарь: емкость (кВт·ч, с учетом min_soc), полезная емкость, недоотпуск,
+# количество батарей (если задана battery_capacity_ah).
+def size_battery_bank(generation, load, max_unmet_fraction=0.0, autonomy_hours=0.0, battery_power=np.inf,
+                      charge_efficiency=0.95, discharge_efficiency=0.95, min_soc=0.2, step_hours=1.0,
+                      battery_capacity_ah=None, voltage=12.0, tolerance=1e-4):
+    if not 0 <= max_unmet_fraction < 1 or autonomy_hours < 0 or not 0 <= min_soc < 1:
+        raise ValueError("Неверные параметры целевой автономности")
+    load = np.asarray(load, dtype=np.float64)
+    increments, power_unmet = battery_increments(generation, load, battery_power, charge_efficiency,
+                                                 discharge_efficiency, step_hours)
+    load_energy = float(load.sum() * step_hours)
+    allowed_unmet = max_unmet_fraction * load_energy
+    if power_unmet > allowed_unmet:
+        raise ValueError("Целевая автономность недостижима при заданной мощности АКБ")
+
+    # Глубина разряда АКБ неограниченной емкости (начало — полный заряд):
+    # d[t] = max(0, d[t-1] - increment[t]) = D[t] - min(0, min(D[0..t])), где D — накопленная сумма
+    depth = np.cumsum(-increments)
+    depth -= np.minimum.accumulate(np.minimum(depth, 0))
+    high = float(depth.max()) if len(depth) else 0.0
+    low = 0.0
+
+    increment_list = increments.tolist()
+
+    def unmet(usable_capacity):
+        return power_unmet + _battery_shortfall(increment_list, usable_capacity) * discharge_efficiency
+
+    if allowed_unmet > power_unmet and high > 0:
+        if unmet(0.0) <= allowed_unmet:
+            high = 0.0
+        while high - low > tolerance * max(high, 1.0):
+            middle = (low + high) / 2
+            if unmet(middle) <= allowed_unmet:
+                high = middle
+            else:
+                low = middle
+        unmet_energy = unmet(high)
+    else:
+        unmet_energy = power_unmet
+
+    # Запас на время гарантированного энергоснабжения при средней нагрузке
+    autonomy_capacity = float(autonomy_hours * load.mean() / discharge_efficiency) if len(load) else 0.0
+    usable_capacity = max(high, autonomy_capacity)
+    capacity = usable_capacity / (1 - min_soc)
+    result = {
+        'capacity': capacity,
+        'usable_capacity': usable_capacity,
+        'autonomy_capacity': autonomy_capacity / (1 - min_soc),
+        'unmet_load': unmet_energy,
+        'unmet_fraction': unmet_energy / load_energy if load_energy > 0 else 0.0,
+    }
+    if battery_capacity_ah is not None:
+        if battery_capacity_ah <= 0 or voltage <= 0:
+            raise ValueError("Емкость и напряжение батареи должны быть положительными")
+        result['battery_count'] = int(np.ceil(capacity * 1000 / (battery_capacity_ah * voltage) - 1e-9))
+    return result
@@ -0,0 +1,148 @@
+import numpy as np
+
+# Соседние ячейки сетки, которые проверяются для каждой ячейки: сама ячейка и половина
+# окружения, чтобы каждая пара ячеек рассматривалась один раз
+_NEIGHBOR_OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+# Пакетный расчет площади, занимаемой ВЭУ с мачтами на растяжках (как calculate_ground_area).
+# Принимает массивы (или числа) диаметров трубы мачты d (м), высот мачты h (м) и углов
+# натяжения растяжек omega (градусы). Возвращает массив площадей (в кв. м).
+def calculate_ground_area_batch(d, h, omega):
+    d = np.asarray(d, dtype=np.float64)
+    h = np.asarray(h, dtype=np.float64)
+    omega = np.asarray(omega, dtype=np.float64)
+    # Проверка соответствия значений диапазонам
+    if np.any((d < 5) | (d > 100)):
+        raise ValueError("Диаметр трубы мачты должен быть в диапазоне от 5 до 100 м")
+    if np.any((h < 0) | (h > 200)):
+        raise ValueError("Высота мачты должна быть в диапазоне от 0 до 200 м")
+    if np.any((omega < 0) | (omega > 90)):
+        raise ValueError("Угол натяжения растяжек должен быть в диапазоне от 0 до 90 градусов")
+
+    S_m = np.pi * d ** 2 / 4
+    D_r = 2 * h * np.sin(np.radians(omega))
+    S_r = np.pi * D_r ** 2 / 4
+    return S_m + S_r
+
+
+# Радиус участка вокруг мачты (м): круг той же площади, что calculate_ground_area
+# (площадь трубы мачты плюс площадь круга растяжек), чтобы площадь отдельной мачты
+# и общая площадь площадки считались по одной формуле
+def footprint_radius(d, h, omega):
+    d = np.asarray(d, dtype=np.float64)
+    h = np.asarray(h, dtype=np.float64)
+    return np.sqrt(d ** 2 / 4 + (h * np.sin(np.radians(omega))) ** 2)
+
+
+# Поиск пересекающихся окружностей с центрами (x, y) и радиусами radius через равномерную сетку.
+# Размер ячейки равен наибольшему диаметру, поэтому пересекающиеся окружности всегда лежат
+# в соседних ячейках: проверяются только пары из соседних ячеек, а не все n² пар.
+# Возвращает массив пар индексов (i < j) размером K × 2.
+def find_overlapping_circles(x, y, radius):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), x.shape)
+    if len(x) < 2:
+        return np.empty((0, 2), dtype=np.intp)
+    cell_size = max(2 * float(radius.max()), 1e-9)
+    cells = {}
+    for index, cell in enumerate(zip((x // cell_size).astype(np.int64).tolist(),
+                                     (y // cell_size).astype(np.int64).tolist())):
+        cells.setdefault(cell, []).append(index)
+    cells = {cell: np.array(indexes, dtype=np.intp) for cell, indexes in cells.items()}
+
+    pairs = []
+    for (cx, cy), first in cells.items():
+        for dx, dy in _NEIGHBOR_OFFSETS:
+            second = cells.get((cx + dx, cy + dy))
+            if second is None:
+                continue
+            i, j = np.meshgrid(first, second, indexing="ij")
+            i = i.ravel()
+            j = j.ravel()
+            if dx == 0 and dy == 0:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            distance = np.hypot(x[i] - x[j], y[i] - y[j])
+            overlap = distance < radius[i] + radius[j]
+            pairs.append(np.column_stack((np.minimum(i, j)[overlap], np.maximum(i, j)[overlap])))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(pairs)
+
+
+# Площадь объединения окружностей (кв. м) по формуле Грина: суммируются только дуги,
+# не закрытые другими окружностями. Соседи каждой окружности берутся из списка пересечений
+# pairs (find_overlapping_circles), поэтому расчет не перебирает все пары.
+def circles_union_area(x, y, radius, pairs):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), x.shape)
+    neighbors = [[] for _ in range(len(x))]
+    for i, j in pairs.tolist():
+        neighbors[i].append(j)
+        neighbors[j].append(i)
+
+    area = 0.0
+    for i in range(len(x)):
+        r = radius[i]
+        if r <= 0:
+            continue
+        others = np.array(neighbors[i], dtype=np.intp)
+        dx = x[others] - x[i]
+        dy = y[others] - y[i]
+        distance = np.hypot(dx, dy)
+        # Окружность целиком внутри соседней (для совпадающих учитывается одна из них)
+        inside = distance + r <= radius[others]
+        same = (distance == 0) & (radius[others] == r)
+        if np.any(inside & ~same) or np.any(same & (others < i)):
+            continue
+        # Соседи внутри текущей окружности не закрывают ее границу
+        crossing = (distance > 0) & (distance + radius[others] > r) & ~inside
+        direction = np.arctan2(dy[crossing], dx[crossing])
+        half_width = np.arccos(np.clip((r ** 2 + distance[crossing] ** 2 - radius[others][crossing] ** 2)
+                                       / (2 * r * distance[crossing]), -1, 1))
+        start = np.mod(direction - half_width, 2 * np.pi)
+        stop = start + 2 * half_width
+        # Интервалы, переходящие через 2π, дублируются со сдвигом на −2π; затем закрытые интервалы
+        # объединяются и ищутся открытые дуги на [0, 2π)
+        start = np.concatenate((start, start - 2 * np.pi))
+        stop = np.concatenate((stop, stop - 2 * np.pi))
+        order = np.argsort(start)
+        covered_until = 0.0
+        for a, b in zip(start[order].tolist(), stop[order].tolist()):
+            if a > covered_until and covered_until < 2 * np.pi:
+                area += _arc_area(x[i], y[i], r, covered_until, min(a, 2 * np.pi))
+            covered_until = max(covered_until, b)
+        if covered_until < 2 * np.pi:
+            area += _arc_area(x[i], y[i], r, covered_until, 2 * np.pi)
+    return area
+
+
+# Вклад дуги окружности от угла a до угла b в интеграл ½∮(x dy − y dx)
+def _arc_area(cx, cy, r, a, b):
+    return 0.5 * (r * r * (b - a) + r * (cx * (np.sin(b) - np.sin(a)) - cy * (np.cos(b) - np.cos(a))))
+
+
+# Расчет площадки ветропарка из многих ВЭУ на растяжках.
+# Принимает координаты мачт x, y (м) и их параметры d, h, omega (массивы или числа).
+# Возвращает словарь: footprints — площади отдельных ВЭУ (как calculate_ground_area),
+# overlaps — пары мачт с пересекающимися участками растяжек, land_use — общая площадь
+# земли под ветропарком с учетом пересечений (кв. м).
+def calculate_site_layout(x, y, d, h, omega):
+    x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+    y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("Координаты мачт должны быть одномерными массивами одной длины")
+    d, h, omega = np.broadcast_arrays(d, h, omega, x)[:3]
+    footprints = calculate_ground_area_batch(d, h, omega)
+    radius = footprint_radius(d, h, omega)
+    overlaps = find_overlapping_circles(x, y, radius)
+    return {
+        'footprints': footprints,
+        'footprint_total': float(footprints.sum()),
+        'radius': radius,
+        'overlaps': overlaps,
+        'land_use': circles_union_area(x, y, radius, overlaps),
+    }
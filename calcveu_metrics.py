@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Переменная окружения, включающая сбор метрик для запуска программы.
+# "1" (или "metrics") — таймеры и счетчики этапов; "cprofile", "tracemalloc" (через запятую)
+# — дополнительно профилирование функций и памяти; "all" — все сразу.
+PROFILE_VARIABLE = "CALCVEU_PROFILE"
+# Переменная окружения с префиксом файлов отчета: <префикс>.txt, <префикс>.json, <префикс>.prof
+OUTPUT_VARIABLE = "CALCVEU_PROFILE_OUTPUT"
+DEFAULT_OUTPUT = "calcveu_profile"
+PROFILE_OPTIONS = ("metrics", "cprofile", "tracemalloc")
+# Количество функций и мест выделения памяти в отчете
+REPORT_TOP = 20
+
+# Пустой контекст, который возвращается вместо таймера, когда сбор метрик выключен
+_NULL_STAGE = nullcontext()
+
+
+# Таймер одного выполнения этапа
+class _Stage:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+
+
+# Таймеры и счетчики этапов расчета (разбор входных данных, wind_power, расчет энергии,
+# запись в базу данных). Пока сбор выключен, stage возвращает общий пустой контекст,
+# а count и iterate сразу возвращаются, поэтому вызовы в рабочих функциях почти ничего не стоят.
+# Этапы могут выполняться в разных потоках, данные защищены блокировкой.
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+
+    # Контекст, измеряющий время выполнения этапа name
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, elapsed):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                self.stages[name] = [1, elapsed, elapsed]
+            else:
+                stage[0] += 1
+                stage[1] += elapsed
+                if elapsed > stage[2]:
+                    stage[2] = elapsed
+
+    # Увеличение счетчика name (например, количества обработанных строк)
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # Итерация с измерением времени получения каждого элемента как этапа name
+    # (для генераторов, которые читают и разбирают входные файлы)
+    def iterate(self, name, iterable):
+        if not self.enabled:
+            return iterable
+        return self._timed_iteration(name, iterable)
+
+    def _timed_iteration(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record(name, time.perf_counter() - started)
+                return
+            self.record(name, time.perf_counter() - started)
+            yield item
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+
+    # Текущие значения: {"stages": {этап: {calls, total, mean, max}}, "counters": {...}}
+    def snapshot(self):
+        with self.lock:
+            stages = {name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+                      for name, (calls, total, longest) in self.stages.items()}
+            return {"stages": stages, "counters": dict(self.counters)}
+
+
+# Общий набор метрик, которым пользуются модули расчета и базы данных
+metrics = Metrics()
+
+# Состояние текущего запуска со сбором метрик (None, если сбор не включен)
+_run = None
+
+
+# Разбор значения переменной окружения CALCVEU_PROFILE.
+# Возвращает множество включенных режимов (пустое, если сбор выключен).
+def profile_options(value=None):
+    if value is None:
+        value = os.environ.get(PROFILE_VARIABLE, "")
+    value = value.strip().lower()
+    if value in ("", "0", "off", "no", "false"):
+        return set()
+    if value in ("1", "on", "yes", "true"):
+        return {"metrics"}
+    if value == "all":
+        return set(PROFILE_OPTIONS)
+    options = {option.strip() for option in value.split(",") if option.strip()}
+    unknown = options - set(PROFILE_OPTIONS)
+    if unknown:
+        raise ValueError(f"Неизвестный режим {PROFILE_VARIABLE}: {', '.join(sorted(unknown))}")
+    # Таймеры этапов включаются всегда, когда включено профилирование
+    return options | {"metrics"}
+
+
+# Начало запуска со сбором метрик. Режимы берутся из options или из переменной окружения.
+# cProfile собирает вызовы только в потоке, начавшем запуск (в интерфейсе — в потоке Tk);
+# расчеты в фоновых потоках видны по таймерам этапов.
+# Возвращает True, если сбор включен.
+def start_run(label="calcveu", options=None):
+    global _run
+    options = profile_options() if options is None else set(options)
+    if not options or _run is not None:
+        return _run is not None
+    # json и datetime нужны только при включенном сборе; модуль импортируется при запуске
+    # интерфейса, поэтому они не загружаются заранее
+    from datetime import datetime
+
+    profiler = None
+    if "cprofile" in options:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    if "tracemalloc" in options:
+        import tracemalloc
+
+        tracemalloc.start()
+    metrics.reset()
+    metrics.enabled = True
+    _run = {"label": label, "options": sorted(options), "date": datetime.now().isoformat(timespec="seconds"),
+            "started": time.perf_counter(), "profiler": profiler}
+    if profiler is not None:
+        profiler.enable()
+    return True
+
+
+# Завершение запуска: остановка профилирования и запись отчета в файлы <prefix>.txt,
+# <prefix>.json и (при cprofile) <prefix>.prof для pstats/snakeviz. Текстовый отчет
+# дополнительно выводится в stream, если он задан. Возвращает отчет (None, если сбор не был включен).
+def finish_run(prefix=None, stream=None):
+    global _run
+    if _run is None:
+        return None
+    import json
+
+    run, _run = _run, None
+    profiler = run["profiler"]
+    if profiler is not None:
+        profiler.disable()
+    wall_time = time.perf_counter() - run["started"]
+    metrics.enabled = False
+    prefix = prefix or os.environ.get(OUTPUT_VARIABLE) or DEFAULT_OUTPUT
+
+    report = {"label": run["label"], "date": run["date"], "options": run["options"], "wall_time": wall_time}
+    report.update(metrics.snapshot())
+    for stage in report["stages"].values():
+        stage["share"] = stage["total"] / wall_time if wall_time > 0 else 0.0
+    if "tracemalloc" in run["options"]:
+        report["memory"] = _memory_report()
+    if profiler is not None:
+        report["profile"] = _profile_report(profiler, prefix + ".prof")
+
+    text = format_report(report)
+    with open(prefix + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(prefix + ".txt", "w", encoding="utf-8") as f:
+        f.write(text)
+    if stream is not None:
+        stream.write("\n" + text)
+    return report
+
+
+# Запуск со сбором метрик, если он включен переменной окружения CALCVEU_PROFILE
+@contextmanager
+def profile_run(label="calcveu", prefix=None, stream=None):
+    start_run(label)
+    try:
+        yield
+    finally:
+        finish_run(prefix, stream)
+
+
+# Текущая и пиковая память и места наибольших выделений по данным tracemalloc
+def _memory_report():
+    import tracemalloc
+
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics("lineno")[:REPORT_TOP]
+    tracemalloc.stop()
+    top = [{"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "size": stat.size,
+            "count": stat.count} for stat in statistics]
+    return {"current": current, "peak": peak, "top": top}
+
+
+# Сохранение данных cProfile и список функций с наибольшим общим временем
+def _profile_report(profiler, path):
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(path)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:REPORT_TOP]
+    top = [{"function": f"{filename}:{line}({name})", "calls": calls, "own_time": own_time,
+            "cumulative_time": cumulative_time}
+           for (filename, line, name), (_, calls, own_time, cumulative_time, _) in rows]
+    return {"path": path, "top": top}
+
+
+# Текстовый отчет о запуске
+def format_report(report):
+    lines = [f"Метрики {report['label']} ({report['date']}), общее время {report['wall_time']:.3f} с", ""]
+    if report["stages"]:
+        lines.append(f"{'Этап':<24}{'вызовов':>10}{'всего, с':>12}{'среднее, мс':>14}{'макс, мс':>12}{'доля':>8}")
+        for name, stage in sorted(report["stages"].items(), key=lambda item: item[1]["total"], reverse=True):
+            lines.append(f"{name:<24}{stage['calls']:>10}{stage['total']:>12.3f}{stage['mean'] * 1000:>14.3f}"
+                         f"{stage['max'] * 1000:>12.3f}{stage['share']:>8.1%}")
+        lines.append("")
+    if report["counters"]:
+        lines.append("Счетчики:")
+        for name, value in sorted(report["counters"].items()):
+            rate = value / report["wall_time"] if report["wall_time"] > 0 else 0
+            lines.append(f"  {name}: {value} ({rate:,.0f} в секунду)")
+        lines.append("")
+    if "memory" in report:
+        memory = report["memory"]
+        lines.append(f"Память: текущая {memory['current'] / 2 ** 20:.1f} МБ, "
+                     f"пиковая {memory['peak'] / 2 ** 20:.1f} МБ")
+        for item in memory["top"]:
+            lines.append(f"  {item['size'] / 1024:>10.1f} КБ {item['count']:>8}  {item['where']}")
+        lines.append("")
+    if "profile" in report:
+        lines.append(f"Профиль ({report['profile']['path']}), функции с наибольшим общим временем:")
+        for item in report["profile"]["top"]:
+            lines.append(f"  {item['cumulative_time']:>9.3f} с {item['own_time']:>9.3f} с "
+                         f"{item['calls']:>9}  {item['function']}")
+        lines.append("")
+    return "\n".join(lines)
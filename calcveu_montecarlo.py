@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calcveu_core import WIND_POWER_DENSITY
+from calcveu_batch import wind_power_batch, HOURS_IN_YEAR
+from calcveu_economics import build_cash_flows, calculate_discounted_payback
+
+# Процентили, которые сохраняются в отчете
+REPORT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+# Параметры неопределенности для расчета методом Монте-Карло.
+# Средние значения задают базовый сценарий, стандартные отклонения — разброс:
+# weibull_k, weibull_c — параметры распределения Вейбулла скорости ветра (c в м/с);
+# air_density — плотность воздуха (кг/м³); degradation_min, degradation_max — границы
+# равномерного распределения ежегодного снижения выработки (доли);
+# tariff — цена электроэнергии (руб./кВт·ч).
+# Остальные параметры (ротор, затраты, срок службы, ставка) считаются известными точно.
+def make_uncertainty(weibull_k, weibull_c, tariff, weibull_k_std=0.0, weibull_c_std=0.0,
+                     air_density=WIND_POWER_DENSITY, air_density_std=0.0,
+                     degradation_min=0.0, degradation_max=0.0, tariff_std=0.0):
+    if weibull_k <= 0 or weibull_c <= 0:
+        raise ValueError("Параметры распределения Вейбулла должны быть положительными")
+    if min(weibull_k_std, weibull_c_std, air_density_std, tariff_std) < 0:
+        raise ValueError("Стандартные отклонения не могут быть отрицательными")
+    if not 0 <= degradation_min <= degradation_max < 1:
+        raise ValueError("Неверные границы снижения выработки")
+    return {
+        'weibull_k': weibull_k, 'weibull_k_std': weibull_k_std,
+        'weibull_c': weibull_c, 'weibull_c_std': weibull_c_std,
+        'air_density': air_density, 'air_density_std': air_density_std,
+        'degradation_min': degradation_min, 'degradation_max': degradation_max,
+        'tariff': tariff, 'tariff_std': tariff_std,
+    }
+
+
+# Годовая выработка (кВт·ч) для массива параметров Вейбулла k и c.
+# Как в calculate_energy_weibull, скорости разбиваются на интервалы шириной bin_width до max_speed;
+# кривая мощности строится один раз, а вероятности интервалов — матрицей (розыгрыши × интервалы).
+def weibull_energy_per_year(k, c, rotor_radius, generator_efficiency, gearbox_efficiency,
+                            bin_width=0.25, max_speed=30):
+    bin_edges = np.arange(0, max_speed + bin_width, bin_width)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    power_curve = wind_power_batch(bin_centers, rotor_radius, generator_efficiency, gearbox_efficiency)
+
+    cdf = bin_edges / np.asarray(c, dtype=np.float64)[:, None]
+    np.power(cdf, np.asarray(k, dtype=np.float64)[:, None], out=cdf)
+    np.negative(cdf, out=cdf)
+    np.exp(cdf, out=cdf)
+    # Вероятность интервала: F(v2) - F(v1) = exp(-(v1/c)^k) - exp(-(v2/c)^k)
+    probabilities = cdf[:, :-1] - cdf[:, 1:]
+    return probabilities @ power_curve / 1000 * HOURS_IN_YEAR
+
+
+# Розыгрыш одной порции из size вариантов с независимым генератором seed.
+# Возвращает годовую выработку в первый год (кВт·ч) и дисконтированный срок окупаемости (лет).
+def _simulate_chunk(seed, size, turbine, economics, uncertainty):
+    rng = np.random.default_rng(seed)
+    u = uncertainty
+    # Параметры ограничиваются снизу, чтобы нормальное распределение не давало нефизичных значений
+    k = np.maximum(rng.normal(u['weibull_k'], u['weibull_k_std'], size), 0.5)
+    c = np.maximum(rng.normal(u['weibull_c'], u['weibull_c_std'], size), 0.1)
+    air_density = np.maximum(rng.normal(u['air_density'], u['air_density_std'], size), 0.0)
+    degradation = rng.uniform(u['degradation_min'], u['degradation_max'], size)
+    tariff = np.maximum(rng.normal(u['tariff'], u['tariff_std'], size), 0.0)
+
+    energy = weibull_energy_per_year(k, c, *turbine)
+    # Мощность пропорциональна плотности воздуха, для которой составлена формула wind_power
+    energy *= air_density / WIND_POWER_DENSITY
+
+    capex, maintenance_cost, service_life, discount_rate = economics
+    cash_flows = build_cash_flows(capex, energy, tariff, maintenance_cost, service_life,
+                                  energy_degradation=degradation)
+    payback = calculate_discounted_payback(cash_flows, discount_rate)
+    return energy, payback
+
+
+# Сводка по выборке: процентили, среднее и гистограмма (для конечных значений).
+# P50 — медиана; P90 — значение с обеспеченностью 90 %: для выработки — 10-й процентиль
+# (превышается в 90 % случаев), для срока окупаемости — 90-й процентиль (не превышается в 90 % случаев).
+def summarize_samples(samples, bins=50, higher_is_better=True):
+    finite = samples[np.isfinite(samples)]
+    if len(finite):
+        percentiles = dict(zip(REPORT_PERCENTILES, np.percentile(finite, REPORT_PERCENTILES).tolist()))
+        counts, edges = np.histogram(finite, bins=bins)
+    else:
+        percentiles = {}
+        counts, edges = np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+    return {
+        'P50': percentiles.get(50, np.inf),
+        'P90': percentiles.get(10 if higher_is_better else 90, np.inf),
+        'mean': float(finite.mean()) if len(finite) else np.inf,
+        'percentiles': percentiles,
+        'histogram': (counts, edges),
+        # Доля розыгрышей с бесконечным значением (например, проект не окупается)
+        'infinite_share': 1 - len(finite) / len(samples),
+    }
+
+
+# Расчет выработки и срока окупаемости ВЭУ методом Монте-Карло.
+# turbine — (радиус ротора, КПД генератора, КПД редуктора); capex, maintenance_cost,
+# service_life и discount_rate — как в calcveu_economics; uncertainty — словарь make_uncertainty.
+# Розыгрыши делятся на порции по chunk_size; каждая порция получает свой генератор из
+# SeedSequence(seed), поэтому результат зависит только от seed, draws и chunk_size,
+# а не от числа процессов workers (1 — расчет в текущем процессе, None — все ядра).
+# Возвращает словарь со сводками 'energy_per_year' и 'discounted_payback' (summarize_samples)
+# и, при keep_samples=True, сами выборки.
+def run_monte_carlo(turbine, capex, maintenance_cost, service_life, discount_rate, uncertainty,
+                    draws=1000000, seed=0, chunk_size=100000, workers=1, bins=50, keep_samples=False):
+    if draws <= 0 or chunk_size <= 0:
+        raise ValueError("Количество розыгрышей и размер порции должны быть положительными")
+    sizes = [min(chunk_size, draws - start) for start in range(0, draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    economics = (capex, maintenance_cost, service_life, discount_rate)
+    arguments = [(chunk_seed, size, tuple(turbine), economics, uncertainty)
+                 for chunk_seed, size in zip(seeds, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sizes) == 1:
+        results = [_simulate_chunk(*chunk_arguments) for chunk_arguments in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as executor:
+            results = list(executor.map(_simulate_chunk, *zip(*arguments)))
+
+    energy = np.concatenate([chunk_energy for chunk_energy, _ in results])
+    payback = np.concatenate([chunk_payback for _, chunk_payback in results])
+    report = {
+        'draws': draws,
+        'seed': seed,
+        'energy_per_year': summarize_samples(energy, bins),
+        'discounted_payback': summarize_samples(payback, bins, higher_is_better=False),
+    }
+    if keep_samples:
+        report['samples'] = {'energy_per_year': energy, 'discounted_payback': payback}
+    return report
@@ -0,0 +1,52 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Сборка с быстрым запуском: pyinstaller calcveu_onedir.spec -> dist/calcveu_onedir/calcveu
+# - onedir: программа не распаковывается во временный каталог при каждом запуске, как onefile;
+# - без UPX: распаковка сжатых библиотек замедляет запуск и вызывает проверки антивируса;
+# - без консольного окна;
+# - исключены пакеты, которые интерфейс не использует. NumPy остается: окна АКБ и СБ считают
+#   через calcveu_hybrid и calcveu_solar, но импортируют их только при расчете, поэтому на время
+#   появления главного окна NumPy не влияет.
+# Время появления окна: python calcveu_bench.py --startup --only startup --startup-command dist/calcveu_onedir/calcveu
+
+
+a = Analysis(
+    ['calcveu.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['pyarrow', 'pandas', 'scipy', 'matplotlib', 'unittest', 'pydoc'],
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='calcveu',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='calcveu_onedir',
+)
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+
+# Файл настроек: значения полей ввода всех окон и история ввода по окнам
+SETTINGS_PATH = "calcveu_settings.json"
+FORMAT_VERSION = 1
+# Количество записей истории, хранимых для каждого окна: размер файла ограничен,
+# поэтому чтение при запуске занимает постоянное время
+HISTORY_SIZE = 20
+# Задержка записи (с): изменения за это время записываются на диск одной операцией
+SAVE_DELAY = 1.0
+# Файл прежнего формата (pickle с четырьмя полями главного окна) и окно, в которое он переносится
+LEGACY_VALUES_PATH = "values.pkl"
+LEGACY_DIALOG = "wind_power"
+LEGACY_FIELDS = ("speed", "radius", "generator_efficiency", "gearbox_efficiency")
+
+
+# Чтение values.pkl прежних версий без выполнения произвольного кода: разрешены только
+# встроенные значения (кортеж чисел и строк), загрузка любых классов запрещена
+def read_legacy_values(path=LEGACY_VALUES_PATH):
+    import pickle
+
+    class RestrictedUnpickler(pickle.Unpickler):
+        def find_class(self, module, name):
+            raise pickle.UnpicklingError(f"Недопустимый объект в файле {path}: {module}.{name}")
+
+    try:
+        with open(path, "rb") as f:
+            values = RestrictedUnpickler(f).load()
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if not isinstance(values, tuple) or len(values) != len(LEGACY_FIELDS):
+        return None
+    if not all(isinstance(value, (int, float, str)) for value in values):
+        return None
+    return {name: str(value) for name, value in zip(LEGACY_FIELDS, values)}
+
+
+# Хранилище настроек интерфейса: последние введенные значения и история ввода для каждого окна.
+# Файл JSON записывается целиком во временный файл и атомарно заменяет старый (os.replace),
+# поэтому прерванная запись не повреждает настройки. Запись откладывается на save_delay секунд
+# и выполняется в отдельном потоке: частые пересчеты приводят к одной записи на диск.
+# Методы можно вызывать из разных потоков.
+class SettingsStore:
+    def __init__(self, path=SETTINGS_PATH, history_size=HISTORY_SIZE, save_delay=SAVE_DELAY,
+                 legacy_path=LEGACY_VALUES_PATH):
+        self.path = path
+        self.history_size = history_size
+        self.save_delay = save_delay
+        self.lock = threading.Lock()
+        # Запись файла не выполняется одновременно из потока таймера и при закрытии
+        self.write_lock = threading.Lock()
+        self.timer = None
+        self.dirty = False
+        self.dialogs = self.read()
+        if self.dialogs is None:
+            self.dialogs = {}
+            legacy = read_legacy_values(legacy_path) if legacy_path else None
+            if legacy is not None:
+                self.dialogs[LEGACY_DIALOG] = {"values": legacy, "history": [legacy]}
+                self.dirty = True
+
+    # Чтение файла настроек. Возвращает словарь окон (None, если файла нет).
+    # Поврежденный или чужой файл не мешает запуску: настройки начинаются заново.
+    def read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            return {}
+        dialogs = data.get("dialogs")
+        return dialogs if isinstance(dialogs, dict) else {}
+
+    # Последние введенные значения окна dialog: {поле: строка}
+    def values(self, dialog):
+        with self.lock:
+            return dict(self.dialogs.get(dialog, {}).get("values", {}))
+
+    # История ввода окна dialog, начиная с последней записи
+    def history(self, dialog):
+        with self.lock:
+            return [dict(values) for values in self.dialogs.get(dialog, {}).get("history", [])]
+
+    # Сохранение значений окна dialog. При history=True значения добавляются в начало истории
+    # (такая же запись, если она уже есть, переносится в начало). Запись на диск откладывается.
+    def record(self, dialog, values, history=True):
+        values = {name: str(value) for name, value in values.items()}
+        with self.lock:
+            entry = self.dialogs.setdefault(dialog, {"values": {}, "history": []})
+            entry["values"] = values
+            if history:
+                entry["history"] = [values] + [item for item in entry["history"] if item != values]
+                del entry["history"][self.history_size:]
+            self.dirty = True
+            if self.timer is None and self.save_delay is not None:
+                self.timer = threading.Timer(self.save_delay, self.save_later)
+                self.timer.daemon = True
+                self.timer.start()
+
+    # Запись по таймеру; при ошибке изменения остаются несохраненными и записываются позже
+    def save_later(self):
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    # Немедленная запись несохраненных изменений
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                self.timer = None
+                if not self.dirty:
+                    return
+                text = json.dumps({"version": FORMAT_VERSION, "dialogs": self.dialogs}, ensure_ascii=False)
+                self.dirty = False
+            try:
+                self.write(text)
+            except OSError:
+                with self.lock:
+                    self.dirty = True
+                raise
+
+    # Атомарная запись файла: временный файл в том же каталоге, fsync и os.replace
+    def write(self, text):
+        # tempfile импортируется при первой записи: он заметно замедляет запуск программы
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp создает файл только для владельца; файлу настроек нужны обычные права с учетом umask
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporary_path, 0o666 & ~umask)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    # Отмена отложенной записи и запись всех изменений (при закрытии программы)
+    def close(self):
+        with self.lock:
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+
+from calcveu_batch import calculate_energy_weibull, calculate_energy_histogram
+
+
+# Годовая выработка (кВт·ч) ВЭУ с радиусом ротора 1 м и КПД генератора и редуктора 1.
+# Мощность wind_power пропорциональна r² · КПД генератора · КПД редуктора, поэтому
+# выработка любой конфигурации получается умножением этой величины.
+# Статистика ветра задается параметрами Вейбулла (k, c) или гистограммой (границы, повторяемость).
+def unit_energy_per_year(weibull=None, histogram=None):
+    if weibull is not None:
+        k, c = weibull
+        return calculate_energy_weibull(k, c, 1.0, 1.0, 1.0)[2]
+    if histogram is not None:
+        bin_edges, frequencies = histogram
+        return calculate_energy_histogram(bin_edges, frequencies, 1.0, 1.0, 1.0)[2]
+    raise ValueError("Нужно задать параметры Вейбулла или гистограмму скоростей ветра")
+
+
+# Пакетный расчет параметров лопастей по формулам calculate_wind_turbine_parameters.
+# Принимает массивы диаметров ротора (м) и количества лопастей.
+def calculate_blade_parameters_batch(rotor_diameter, number_of_blades):
+    rotor_diameter = np.asarray(rotor_diameter, dtype=np.float64)
+    number_of_blades = np.asarray(number_of_blades, dtype=np.float64)
+    swept_area = math.pi * (rotor_diameter / 2) ** 2
+    aspect_ratio = rotor_diameter / (number_of_blades * 2)
+    blade_area = swept_area / number_of_blades
+    return {
+        'rotor_diameter': rotor_diameter,
+        'swept_area': swept_area,
+        'aspect_ratio': aspect_ratio,
+        'solidity_factor': number_of_blades / swept_area,
+        'blade_area': blade_area,
+        'blade_length': np.sqrt(blade_area / aspect_ratio),
+    }
+
+
+# Подбор ВЭУ по требуемой годовой выработке (обратная задача).
+# Перебирает всю сетку радиус × количество лопастей × КПД генератора × КПД редуктора
+# за один векторизованный проход и возвращает Парето-оптимальные конструкции:
+# выработка не меньше target_energy (кВт·ч/год), а радиус ротора, КПД генератора и
+# КПД редуктора (более дешевые компоненты) нельзя уменьшить, не уменьшив другой параметр.
+# Количество лопастей в модели мощности не участвует, поэтому фронт строится для
+# каждого количества лопастей отдельно, а параметры лопастей рассчитываются для каждой конструкции.
+# Возвращает словарь массивов (по одному элементу на конструкцию), упорядоченных по радиусу.
+def size_wind_turbines(target_energy, radii, blade_counts, generator_efficiencies, gearbox_efficiencies,
+                       weibull=None, histogram=None):
+    radii = np.unique(np.asarray(radii, dtype=np.float64))
+    blade_counts = np.unique(np.asarray(blade_counts, dtype=np.int64))
+    generator_efficiencies = np.unique(np.asarray(generator_efficiencies, dtype=np.float64))
+    gearbox_efficiencies = np.unique(np.asarray(gearbox_efficiencies, dtype=np.float64))
+    if target_energy <= 0:
+        raise ValueError("Требуемая выработка должна быть положительной")
+
+    # Выработка всех сочетаний радиус × КПД генератора × КПД редуктора
+    unit_energy = unit_energy_per_year(weibull, histogram)
+    energy = (unit_energy * radii ** 2)[:, None, None] * generator_efficiencies[:, None] * gearbox_efficiencies
+    feasible = energy >= target_energy
+
+    # Выработка растет с радиусом, поэтому для каждой пары КПД достаточно наименьшего
+    # подходящего радиуса; если подходящего радиуса нет, пара исключается
+    any_feasible = feasible.any(axis=0)
+    radius_index = np.where(any_feasible, feasible.argmax(axis=0), len(radii))
+
+    # Наименьший радиус не возрастает с ростом КПД. Пара КПД не доминируется, если ее
+    # радиус строго меньше, чем у соседей с меньшим КПД генератора и меньшим КПД редуктора.
+    padded = np.full((len(generator_efficiencies) + 1, len(gearbox_efficiencies) + 1), len(radii) + 1)
+    padded[1:, 1:] = radius_index
+    pareto = any_feasible & (radius_index < padded[:-1, 1:]) & (radius_index < padded[1:, :-1])
+
+    generator_index, gearbox_index = np.nonzero(pareto)
+    radius_index = radius_index[generator_index, gearbox_index]
+    order = np.lexsort((gearbox_index, generator_index, radius_index))
+    generator_index, gearbox_index, radius_index = generator_index[order], gearbox_index[order], radius_index[order]
+
+    # Каждая конструкция фронта повторяется для всех количеств лопастей
+    designs = len(radius_index)
+    rotor_radius = np.tile(radii[radius_index], len(blade_counts))
+    number_of_blades = np.repeat(blade_counts, designs)
+    result = {
+        'rotor_radius': rotor_radius,
+        'number_of_blades': number_of_blades,
+        'generator_efficiency': np.tile(generator_efficiencies[generator_index], len(blade_counts)),
+        'gearbox_efficiency': np.tile(gearbox_efficiencies[gearbox_index], len(blade_counts)),
+        'energy_per_year': np.tile(energy[radius_index, generator_index, gearbox_index], len(blade_counts)),
+    }
+    result.update(calculate_blade_parameters_batch(2 * rotor_radius, number_of_blades))
+    return result
@@ -0,0 +1,213 @@
+import csv
+import itertools
+
+import numpy as np
+
+# Солнечная постоянная (Вт/м²)
+SOLAR_CONSTANT = 1367.0
+# Условия испытаний модулей: освещенность (Вт/м²) и температура элемента (°C)
+STC_IRRADIANCE = 1000.0
+STC_TEMPERATURE = 25.0
+
+# Названия столбцов файла метеоданных: время, суммарная, прямая (по нормали к лучу)
+# и рассеянная радиация на горизонтальную поверхность (Вт/м²), температура воздуха (°C).
+# Прямая и рассеянная радиация необязательны: при их отсутствии они оцениваются по суммарной.
+TMY_COLUMNS = {"time": "time", "ghi": "ghi", "dni": "dni", "dhi": "dhi", "temperature": "temp_air"}
+# Столбцы почасовых файлов PVGIS (время в формате ГГГГММДД:ЧЧММ, UTC)
+PVGIS_COLUMNS = {"time": "time(UTC)", "ghi": "G(h)", "dni": "Gb(n)", "dhi": "Gd(h)", "temperature": "T2m"}
+
+
+# Параметры солнечного модуля: номинальная мощность (Вт), температурный коэффициент
+# мощности (доли на °C, обычно около -0.004), номинальная рабочая температура элемента NOCT (°C)
+# и прочие потери (загрязнение, провода, инвертор; доли).
+def make_module(nominal_power, temperature_coefficient=-0.004, noct=45.0, losses=0.14):
+    if nominal_power <= 0:
+        raise ValueError("Номинальная мощность модуля должна быть положительной")
+    if not 0 <= losses < 1:
+        raise ValueError("Потери должны быть в диапазоне от 0 до 1")
+    return {
+        'nominal_power': nominal_power,
+        'temperature_coefficient': temperature_coefficient,
+        'noct': noct,
+        'losses': losses,
+    }
+
+
+# Положение солнца для массива моментов времени (UTC) и точки с широтой и долготой (градусы).
+# Склонение и уравнение времени — по формулам Спенсера.
+# Возвращает зенитный угол и азимут (от севера по часовой стрелке) в градусах.
+def solar_position(timestamps, latitude, longitude):
+    timestamps = np.asarray(timestamps).astype("datetime64[s]")
+    day_of_year = (timestamps.astype("datetime64[D]") - timestamps.astype("datetime64[Y]")).astype(np.int64) + 1
+    hours = (timestamps - timestamps.astype("datetime64[D]")).astype(np.int64) / 3600
+
+    b = 2 * np.pi * (day_of_year - 1) / 365
+    declination = (0.006918 - 0.399912 * np.cos(b) + 0.070257 * np.sin(b) - 0.006758 * np.cos(2 * b)
+                   + 0.000907 * np.sin(2 * b) - 0.002697 * np.cos(3 * b) + 0.00148 * np.sin(3 * b))
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(b) - 0.032077 * np.sin(b)
+                                 - 0.014615 * np.cos(2 * b) - 0.040849 * np.sin(2 * b))
+    solar_time = hours + longitude / 15 + equation_of_time / 60
+    hour_angle = np.radians(15 * (solar_time - 12))
+    phi = np.radians(latitude)
+
+    cos_zenith = np.sin(phi) * np.sin(declination) + np.cos(phi) * np.cos(declination) * np.cos(hour_angle)
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+    azimuth = np.degrees(np.arctan2(np.sin(hour_angle),
+                                    np.cos(hour_angle) * np.sin(phi) - np.tan(declination) * np.cos(phi))) + 180
+    return zenith, azimuth
+
+
+# Оценка прямой (по нормали к лучу) и рассеянной радиации по суммарной (модель Эрбса).
+# Возвращает (dni, dhi) в Вт/м².
+def decompose_ghi(ghi, zenith, timestamps):
+    ghi = np.asarray(ghi, dtype=np.float64)
+    day_of_year = (np.asarray(timestamps).astype("datetime64[D]")
+                   - np.asarray(timestamps).astype("datetime64[Y]")).astype(np.int64) + 1
+    cos_zenith = np.cos(np.radians(zenith))
+    # Внеатмосферная радиация на горизонтальную поверхность
+    extraterrestrial = SOLAR_CONSTANT * (1 + 0.033 * np.cos(2 * np.pi * day_of_year / 365)) * cos_zenith
+    with np.errstate(divide="ignore", invalid="ignore"):
+        clearness = np.where(extraterrestrial > 0, ghi / extraterrestrial, 0)
+    clearness = np.clip(clearness, 0, 1)
+    diffuse_fraction = np.where(
+        clearness <= 0.22, 1 - 0.09 * clearness,
+        np.where(clearness <= 0.8,
+                 0.9511 - 0.1604 * clearness + 4.388 * clearness ** 2 - 16.638 * clearness ** 3
+                 + 12.336 * clearness ** 4,
+                 0.165))
+    dhi = ghi * diffuse_fraction
+    # У горизонта прямая радиация не восстанавливается: деление на малый косинус неустойчиво
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dni = np.where(cos_zenith > 0.065, (ghi - dhi) / cos_zenith, 0)
+    return dni, dhi
+
+
+# Радиация в плоскости модулей (Вт/м²) по изотропной модели неба.
+# Временные ряды — длины T, наклон tilt и азимут surface_azimuth (градусы, от севера) — массивы
+# длины M (ориентации). Возвращает матрицу T × M.
+def plane_of_array_irradiance(ghi, dni, dhi, zenith, azimuth, tilt, surface_azimuth, albedo=0.2):
+    tilt = np.radians(np.atleast_1d(np.asarray(tilt, dtype=np.float64)))
+    surface_azimuth = np.radians(np.atleast_1d(np.asarray(surface_azimuth, dtype=np.float64)))
+    tilt, surface_azimuth = np.broadcast_arrays(tilt, surface_azimuth)
+    zenith = np.radians(np.asarray(zenith, dtype=np.float64))[:, None]
+    azimuth = np.radians(np.asarray(azimuth, dtype=np.float64))[:, None]
+
+    # Косинус угла падения прямых лучей на плоскость модулей
+    cos_incidence = (np.cos(zenith) * np.cos(tilt)
+                     + np.sin(zenith) * np.sin(tilt) * np.cos(azimuth - surface_azimuth))
+    np.maximum(cos_incidence, 0, out=cos_incidence)
+    # Солнце за горизонтом не дает прямой радиации
+    cos_incidence[np.broadcast_to(zenith >= np.pi / 2, cos_incidence.shape)] = 0
+
+    poa = cos_incidence * np.asarray(dni, dtype=np.float64)[:, None]
+    poa += np.asarray(dhi, dtype=np.float64)[:, None] * ((1 + np.cos(tilt)) / 2)
+    poa += np.asarray(ghi, dtype=np.float64)[:, None] * (albedo * (1 - np.cos(tilt)) / 2)
+    return poa
+
+
+# Мощность одного модуля (Вт) по радиации в плоскости модулей (Вт/м²) и температуре воздуха (°C).
+# Температура элемента оценивается по NOCT: нагрев пропорционален радиации (20 °C при 800 Вт/м²).
+# temperature — массив длины T, poa — матрица T × M.
+def module_power(poa, temperature, module):
+    temperature = np.asarray(temperature, dtype=np.float64)[:, None]
+    cell_temperature = temperature + (module['noct'] - 20) / 800 * poa
+    power = poa * (module['nominal_power'] / STC_IRRADIANCE * (1 - module['losses']))
+    power *= 1 + module['temperature_coefficient'] * (cell_temperature - STC_TEMPERATURE)
+    return np.maximum(power, 0, out=power)
+
+
+# Суточная выработка одного модуля (кВт·ч) по суточной радиации в плоскости модулей (кВт·ч/м²)
+# и средней температуре воздуха (°C), когда почасовых рядов нет: радиация пересчитывается в часы
+# пиковой освещенности (1000 Вт/м²), мощность в эти часы — по module_power.
+def daily_module_yield(radiation_per_day, temperature, module):
+    radiation_per_day = np.atleast_1d(np.asarray(radiation_per_day, dtype=np.float64))
+    if np.any(radiation_per_day < 0):
+        raise ValueError("Радиация не может быть отрицательной")
+    temperature = np.broadcast_to(np.asarray(temperature, dtype=np.float64), radiation_per_day.shape)
+    power = module_power(np.full((len(radiation_per_day), 1), STC_IRRADIANCE), temperature, module)[:, 0]
+    return power * radiation_per_day / 1000
+
+
+# Выработка солнечных батарей для набора ориентаций и количеств модулей за один вызов.
+# timestamps — моменты времени (UTC) с шагом step_hours, ghi — суммарная радиация (Вт/м²),
+# temperature — температура воздуха (°C); dni и dhi необязательны. tilt и surface_azimuth —
+# ориентации (M), module_counts — количества модулей (K). Выработка пропорциональна количеству
+# модулей, поэтому ряды мощности считаются для одного модуля каждой ориентации.
+# Возвращает словарь: power — мощность одного модуля (Вт, T × M),
+# energy — выработка батарей (кВт·ч, M × K).
+def solar_array_output(timestamps, ghi, temperature, module, tilt, surface_azimuth, latitude, longitude,
+                       module_counts=1, dni=None, dhi=None, albedo=0.2, step_hours=1.0):
+    zenith, azimuth = solar_position(timestamps, latitude, longitude)
+    if dni is None or dhi is None:
+        dni, dhi = decompose_ghi(ghi, zenith, timestamps)
+    poa = plane_of_array_irradiance(ghi, dni, dhi, zenith, azimuth, tilt, surface_azimuth, albedo)
+    power = module_power(poa, temperature, module)
+    module_counts = np.atleast_1d(np.asarray(module_counts, dtype=np.float64))
+    energy = power.sum(axis=0) * step_hours / 1000
+    return {
+        'power': power,
+        'energy': energy[:, None] * module_counts,
+    }
+
+
+# Разбор времени файла метеоданных: ISO (ГГГГ-ММ-ДД ЧЧ:ММ) или формат PVGIS (ГГГГММДД:ЧЧММ)
+def _parse_times(values):
+    if values and ":" in values[0][:9] and "-" not in values[0]:
+        values = [f"{v[0:4]}-{v[4:6]}-{v[6:8]}T{v[9:11]}:{v[11:13]}" for v in values]
+    return np.array(values, dtype="datetime64[s]")
+
+
+# Потоковое чтение почасового файла метеоданных (CSV в стиле TMY/PVGIS) порциями по chunk_size строк.
+# skip_rows — количество служебных строк перед заголовком; columns — соответствие столбцов
+# (TMY_COLUMNS, PVGIS_COLUMNS). Чтение прекращается на первой строке, которая не разбирается
+# (например, на пояснениях в конце файла PVGIS). Возвращает словари массивов по порциям.
+def read_tmy_chunks(path, columns=TMY_COLUMNS, chunk_size=8760, skip_rows=0):
+    with open(path, newline="", encoding="utf-8") as f:
+        for _ in range(skip_rows):
+            f.readline()
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = [columns[key] for key in ("time", "ghi", "temperature") if columns[key] not in header]
+        if missing:
+            raise ValueError(f"В файле {path} нет столбцов: {', '.join(missing)}")
+        indexes = {key: header.index(name) for key, name in columns.items() if name in header}
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            complete = list(itertools.takewhile(lambda row: len(row) == len(header), rows))
+            if not complete:
+                return
+            chunk = {"time": _parse_times([row[indexes["time"]] for row in complete])}
+            for key, index in indexes.items():
+                if key != "time":
+                    chunk[key] = np.array([row[index] for row in complete], dtype=np.float64)
+            yield chunk
+            if len(complete) < len(rows) or len(rows) < chunk_size:
+                return
+
+
+# Выработка солнечных батарей по многолетнему файлу метеоданных без загрузки файла целиком.
+# Параметры как у solar_array_output; файл читается порциями по chunk_size строк.
+# Возвращает словарь: energy — выработка за весь период (кВт·ч, M × K),
+# energy_per_year — выработка по годам ('ГГГГ' → M × K), hours — количество учтенных часов.
+def solar_yield_from_file(path, module, tilt, surface_azimuth, latitude, longitude, module_counts=1,
+                          columns=TMY_COLUMNS, skip_rows=0, albedo=0.2, step_hours=1.0, chunk_size=8760):
+    total = None
+    energy_per_year = {}
+    hours = 0.0
+    for chunk in read_tmy_chunks(path, columns, chunk_size, skip_rows):
+        years = chunk["time"].astype("datetime64[Y]")
+        for year in np.unique(years):
+            rows = years == year
+            output = solar_array_output(chunk["time"][rows], chunk["ghi"][rows], chunk["temperature"][rows],
+                                        module, tilt, surface_azimuth, latitude, longitude, module_counts,
+                                        chunk["dni"][rows] if "dni" in chunk else None,
+                                        chunk["dhi"][rows] if "dhi" in chunk else None,
+                                        albedo, step_hours)
+            key = str(year)
+            energy_per_year[key] = energy_per_year.get(key, 0) + output['energy']
+            total = output['energy'] if total is None else total + output['energy']
+            hours += rows.sum() * step_hours
+    if total is None:
+        raise ValueError(f"В файле {path} нет данных")
+    return {'energy': total, 'energy_per_year': energy_per_year, 'hours': hours}
@@ -0,0 +1,171 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from calcveu_batch import wind_power_batch, calculate_nominal_power_batch
+
+
+# Модели, доступные для перебора параметров.
+# Все модели принимают (скорость, радиус, КПД генератора, КПД редуктора, out);
+# для номинальной мощности КПД редуктора не используется.
+def _wind_power_model(speed, rotor_radius, generator_efficiency, gearbox_efficiency, out):
+    return wind_power_batch(speed, rotor_radius, generator_efficiency, gearbox_efficiency, out=out)
+
+
+# Номинальная мощность не зависит от КПД редуктора: в сетке результат повторяется по этой оси
+def _nominal_power_model(speed, rotor_radius, generator_efficiency, gearbox_efficiency, out):
+    shape = np.broadcast_shapes(np.shape(speed), np.shape(rotor_radius), np.shape(generator_efficiency))
+    if shape == out.shape:
+        return calculate_nominal_power_batch(rotor_radius, generator_efficiency, speed, out=out)
+    out[...] = calculate_nominal_power_batch(rotor_radius, generator_efficiency, speed)
+    return out
+
+
+SWEEP_MODELS = {
+    "wind_power": _wind_power_model,
+    "nominal_power": _nominal_power_model,
+}
+
+# Массивы, подключенные к разделяемой памяти в процессе-исполнителе
+_worker_arrays = {}
+_worker_blocks = []
+
+
+# Копирование массива в новый блок разделяемой памяти.
+# Возвращает блок и описание (имя, размер, тип) для подключения в другом процессе.
+def _share_array(array):
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+# Подключение процесса-исполнителя к разделяемой памяти (выполняется один раз на процесс)
+def _attach_arrays(specs):
+    _worker_arrays.clear()
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        _worker_arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Освобождение ссылок на разделяемую память в текущем процессе
+def _release_arrays():
+    _worker_arrays.clear()
+    while _worker_blocks:
+        _worker_blocks.pop().close()
+
+
+# Расчет участка [start, stop) набора сценариев; результат пишется прямо в разделяемую память
+def _run_scenarios_chunk(model, start, stop, inner_axes):
+    arrays = _worker_arrays
+    SWEEP_MODELS[model](arrays["speed"][start:stop], arrays["radius"][start:stop],
+                        arrays["generator_efficiency"][start:stop], arrays["gearbox_efficiency"][start:stop],
+                        arrays["result"][start:stop])
+    return start, stop
+
+
+# Расчет участка [start, stop) развернутой сетки параметров.
+# Последние inner_axes осей сетки целиком входят в порцию и считаются через broadcasting;
+# индексы вычисляются только для внешних осей, поэтому накладные расходы малы.
+def _run_grid_chunk(model, start, stop, inner_axes):
+    arrays = _worker_arrays
+    result = arrays["result"]
+    shape = result.shape
+    outer_axes = len(shape) - inner_axes
+    inner_size = int(np.prod(shape[outer_axes:]))
+    rows = np.arange(start // inner_size, stop // inner_size)
+    outer_index = np.unravel_index(rows, shape[:outer_axes]) if outer_axes else ()
+
+    axes = []
+    for axis, key in enumerate(("speed", "radius", "generator_efficiency", "gearbox_efficiency")):
+        if axis < outer_axes:
+            values = arrays[key][outer_index[axis]].reshape((len(rows),) + (1,) * inner_axes)
+        else:
+            values = arrays[key].reshape((1,) + tuple(-1 if a == axis else 1 for a in range(outer_axes, len(shape))))
+        axes.append(values)
+    out = result.reshape(-1)[start:stop].reshape((len(rows),) + shape[outer_axes:])
+    SWEEP_MODELS[model](*axes, out)
+    return start, stop
+
+
+# Общая часть перебора: размещает входные массивы и результат в разделяемой памяти,
+# делит [0, total) на порции по chunk_size и выполняет их в пуле процессов.
+# Результат собирается на месте, поэтому порядок строк совпадает с порядком входных данных.
+# Для сетки порции выравниваются по произведению последних осей (inner_axes), входящих в chunk_size.
+def _run_parallel(task, model, inputs, result_shape, workers, chunk_size, inner_axes=0):
+    if model not in SWEEP_MODELS:
+        raise ValueError(f"Неизвестная модель: {model}")
+    total = int(np.prod(result_shape))
+    inner_size = int(np.prod(result_shape[len(result_shape) - inner_axes:]))
+    chunk_size = max(chunk_size // inner_size, 1) * inner_size
+    workers = workers or os.cpu_count() or 1
+
+    blocks = []
+    try:
+        specs = {}
+        for key, array in inputs.items():
+            block, specs[key] = _share_array(array)
+            blocks.append(block)
+        block, specs["result"] = _share_array(np.empty(result_shape))
+        blocks.append(block)
+        result = np.ndarray(result_shape, dtype=np.float64, buffer=block.buf)
+
+        ranges = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+        if workers == 1 or len(ranges) <= 1:
+            _attach_arrays(specs)
+            try:
+                for start, stop in ranges:
+                    task(model, start, stop, inner_axes)
+            finally:
+                _release_arrays()
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=_attach_arrays,
+                                     initargs=(specs,)) as executor:
+                futures = [executor.submit(task, model, start, stop, inner_axes) for start, stop in ranges]
+                for future in futures:
+                    future.result()
+
+        return result.copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+# Параллельный расчет набора сценариев одинаковой длины (по строкам).
+# Принимает массивы скоростей, радиусов и КПД (числа расширяются до длины набора),
+# имя модели ("wind_power" или "nominal_power"), число процессов (по умолчанию — все ядра)
+# и размер порции. Возвращает массив мощностей (в ваттах) в порядке входных строк.
+def sweep_scenarios(speed, rotor_radius, generator_efficiency, gearbox_efficiency, model="wind_power",
+                    workers=None, chunk_size=1000000):
+    columns = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in
+                                    (speed, rotor_radius, generator_efficiency, gearbox_efficiency)))
+    if columns[0].ndim != 1:
+        raise ValueError("Сценарии должны задаваться одномерными массивами")
+    inputs = dict(zip(("speed", "radius", "generator_efficiency", "gearbox_efficiency"), columns))
+    return _run_parallel(_run_scenarios_chunk, model, inputs, columns[0].shape, workers, chunk_size)
+
+
+# Параллельный перебор сетки параметров скорость × радиус × КПД генератора × КПД редуктора.
+# Принимает одномерные массивы значений по каждой оси. Возвращает массив мощностей (в ваттах)
+# размером (len(speeds), len(radii), len(generator_efficiencies), len(gearbox_efficiencies)).
+def sweep_grid(speeds, radii, generator_efficiencies, gearbox_efficiencies, model="wind_power",
+               workers=None, chunk_size=1000000):
+    inputs = {
+        "speed": np.atleast_1d(np.asarray(speeds, dtype=np.float64)),
+        "radius": np.atleast_1d(np.asarray(radii, dtype=np.float64)),
+        "generator_efficiency": np.atleast_1d(np.asarray(generator_efficiencies, dtype=np.float64)),
+        "gearbox_efficiency": np.atleast_1d(np.asarray(gearbox_efficiencies, dtype=np.float64)),
+    }
+    result_shape = tuple(len(axis) for axis in inputs.values())
+
+    # Количество последних осей, которые целиком помещаются в одну порцию
+    inner_axes = 0
+    inner_size = 1
+    while inner_axes < len(result_shape) and inner_size * result_shape[-inner_axes - 1] <= chunk_size:
+        inner_size *= result_shape[-inner_axes - 1]
+        inner_axes += 1
+    return _run_parallel(_run_grid_chunk, model, inputs, result_shape, workers, chunk_size, inner_axes)
@@ -0,0 +1,79 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Исключение, которым длительная задача может прервать себя после отмены
+class TaskCancelled(Exception):
+    pass
+
+
+# Фоновая задача: поддерживает отмену и передачу хода выполнения в интерфейс.
+# Функция, запущенная с with_task=True, получает задачу первым аргументом и может
+# вызывать report_progress и check_cancelled.
+class BackgroundTask:
+    def __init__(self, events):
+        self.events = events
+        self.cancel_event = threading.Event()
+        # Функции, вызываемые при отмене (например, прерывание запроса к базе данных)
+        self.cancel_callbacks = []
+        self.on_progress = None
+        self.future = None
+
+    def cancel(self):
+        self.cancel_event.set()
+        for callback in list(self.cancel_callbacks):
+            callback()
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    # Передача хода выполнения (доля от 0 до 1 и текст) в поток интерфейса
+    def report_progress(self, fraction, text=""):
+        if self.on_progress is not None and not self.cancelled():
+            self.events.put((self.on_progress, (fraction, text)))
+
+
+# Исполнитель фоновых задач для интерфейса Tk.
+# Задачи выполняются в пуле потоков; обработчики результатов, ошибок и хода выполнения
+# ставятся в очередь и вызываются в потоке интерфейса из process_events, который
+# нужно периодически вызывать через root.after. Результаты отмененных задач отбрасываются.
+class BackgroundExecutor:
+    def __init__(self, max_workers=2):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="calcveu")
+        self.events = queue.SimpleQueue()
+
+    def submit(self, function, *args, on_done=None, on_error=None, on_progress=None, with_task=False):
+        task = BackgroundTask(self.events)
+        task.on_progress = on_progress
+
+        def run():
+            try:
+                result = function(task, *args) if with_task else function(*args)
+            except Exception as e:
+                # Ошибки отмененной задачи (в том числе прерванного запроса) не показываются
+                if not task.cancelled() and on_error is not None:
+                    self.events.put((on_error, (e,)))
+                return
+            if not task.cancelled() and on_done is not None:
+                self.events.put((on_done, (result,)))
+
+        task.future = self.pool.submit(run)
+        return task
+
+    # Вызов накопившихся обработчиков; выполняется в потоке интерфейса
+    def process_events(self, limit=100):
+        for _ in range(limit):
+            try:
+                callback, args = self.events.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
+
+    # Остановка исполнителя: ожидающие задачи отменяются, выполняющиеся не ожидаются
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+import numpy as np
+
+from calcveu_batch import wind_power_batch
+from calcveu_layout import find_overlapping_circles
+
+# Коэффициент тяги ротора при коэффициенте мощности, равном пределу Бетца (WIND_POWER_CP):
+# a = 1/3, Ct = 4a(1 - a) = 8/9
+BETZ_THRUST_COEFFICIENT = 8 / 9
+# Коэффициент расширения следа модели Йенсена для суши (для моря обычно 0.04)
+DEFAULT_WAKE_DECAY = 0.075
+
+
+# Площадь пересечения окружностей радиусов r1 и r2 с расстоянием между центрами distance
+# (массивы согласуются по правилам broadcasting)
+def _circle_overlap_area(r1, r2, distance):
+    r1, r2, distance = np.broadcast_arrays(r1, r2, distance)
+    area = np.zeros(distance.shape)
+    inside = distance <= np.abs(r1 - r2)
+    area[inside] = np.pi * np.minimum(r1, r2)[inside] ** 2
+    partial = ~inside & (distance < r1 + r2)
+    a, b, d = r1[partial], r2[partial], distance[partial]
+    area[partial] = (a ** 2 * np.arccos(np.clip((d ** 2 + a ** 2 - b ** 2) / (2 * d * a), -1, 1))
+                     + b ** 2 * np.arccos(np.clip((d ** 2 + b ** 2 - a ** 2) / (2 * d * b), -1, 1))
+                     - 0.5 * np.sqrt(np.maximum((-d + a + b) * (d + a - b) * (d - a + b) * (d + a + b), 0)))
+    return area
+
+
+# Длина следа (м), на которой дефицит скорости модели Йенсена падает до min_deficit.
+# Более далекие пары не рассматриваются; при min_deficit = 0.002 погрешность коэффициентов
+# скорости в глубине большого парка — порядка 0.1 %.
+def wake_length(rotor_radius, thrust_coefficient=BETZ_THRUST_COEFFICIENT, wake_decay=DEFAULT_WAKE_DECAY,
+                min_deficit=0.002):
+    initial_deficit = 1 - np.sqrt(1 - thrust_coefficient)
+    return float(np.max(rotor_radius) / wake_decay * max(np.sqrt(initial_deficit / min_deficit) - 1, 0))
+
+
+# Коэффициенты скорости ветра у каждой ВЭУ (доля скорости набегающего потока) для направлений ветра
+# directions (градусы, откуда дует ветер, от севера по часовой стрелке) по модели Йенсена (Park).
+# Дефициты от нескольких следов складываются в квадратах. Пары ВЭУ, которые могут влиять
+# друг на друга (расстояние меньше длины следа), находятся один раз через сетку ячеек
+# (find_overlapping_circles), после чего дефициты для всех направлений и пар считаются
+# одной матрицей направления × пары. При постоянном коэффициенте тяги коэффициенты не зависят
+# от скорости ветра. Возвращает матрицу (направления × ВЭУ).
+def sector_speed_factors(x, y, rotor_radius, directions, thrust_coefficient=BETZ_THRUST_COEFFICIENT,
+                         wake_decay=DEFAULT_WAKE_DECAY, min_deficit=0.002):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rotor_radius = np.broadcast_to(np.asarray(rotor_radius, dtype=np.float64), x.shape)
+    directions = np.atleast_1d(np.asarray(directions, dtype=np.float64))
+    if not 0 <= thrust_coefficient < 1:
+        raise ValueError("Коэффициент тяги должен быть в диапазоне от 0 до 1")
+
+    length = wake_length(rotor_radius, thrust_coefficient, wake_decay, min_deficit)
+    pairs = find_overlapping_circles(x, y, length / 2)
+    # Каждая пара рассматривается в обе стороны: ВЭУ up может затенять down и наоборот
+    up = np.concatenate((pairs[:, 0], pairs[:, 1]))
+    down = np.concatenate((pairs[:, 1], pairs[:, 0]))
+    dx = x[down] - x[up]
+    dy = y[down] - y[up]
+
+    # Направление потока противоположно направлению, откуда дует ветер
+    angle = np.radians(directions)[:, None]
+    flow_x = -np.sin(angle)
+    flow_y = -np.cos(angle)
+    downstream = dx * flow_x + dy * flow_y
+    lateral = np.abs(dx * flow_y - dy * flow_x)
+
+    shadowed = downstream > 0
+    wake_radius = rotor_radius[up] + wake_decay * np.maximum(downstream, 0)
+    overlap = _circle_overlap_area(wake_radius, rotor_radius[down], lateral) / (np.pi * rotor_radius[down] ** 2)
+    deficit = (1 - np.sqrt(1 - thrust_coefficient)) * (rotor_radius[up] / wake_radius) ** 2 * overlap
+    deficit[~shadowed] = 0
+
+    # Сумма квадратов дефицитов для каждой пары (направление, ВЭУ)
+    turbines = len(x)
+    index = (np.arange(len(directions))[:, None] * turbines + down).ravel()
+    squared = np.bincount(index, weights=(deficit ** 2).ravel(), minlength=len(directions) * turbines)
+    return 1 - np.sqrt(squared.reshape(len(directions), turbines))
+
+
+# Выработка ветропарка с учетом затенения ВЭУ следами по ряду скоростей и направлений ветра.
+# x, y — координаты ВЭУ (м), rotor_radius и КПД — массивы по ВЭУ или числа; speeds (м/с)
+# и directions (градусы) — ряды длины T с шагом step_hours. Направления округляются до
+# n_directions секторов. Коэффициенты скорости рассчитываются один раз на сектор, поэтому
+# время расчета ряда определяется одним вызовом wind_power_batch на порцию часов × ВЭУ.
+# Возвращает словарь: energy — выработка каждой ВЭУ (кВт·ч), free_energy — выработка без
+# затенения, wake_loss — доля потерь парка, factors — коэффициенты (секторы × ВЭУ),
+# при keep_power=True — мощность парка по шагам (Вт).
+def calculate_farm_energy(x, y, speeds, directions, rotor_radius, generator_efficiency, gearbox_efficiency,
+                          n_directions=36, thrust_coefficient=BETZ_THRUST_COEFFICIENT, wake_decay=DEFAULT_WAKE_DECAY,
+                          min_deficit=0.002, step_hours=1.0, chunk_size=8760, keep_power=False):
+    x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+    speeds = np.asarray(speeds, dtype=np.float64)
+    directions = np.asarray(directions, dtype=np.float64)
+    if speeds.shape != directions.shape or speeds.ndim != 1:
+        raise ValueError("Ряды скоростей и направлений ветра должны быть одномерными массивами одной длины")
+    turbines = len(x)
+    rotor_radius, generator_efficiency, gearbox_efficiency = (
+        np.broadcast_to(np.asarray(value, dtype=np.float64), x.shape)
+        for value in (rotor_radius, generator_efficiency, gearbox_efficiency))
+
+    sector_width = 360 / n_directions
+    factors = sector_speed_factors(x, y, rotor_radius, np.arange(n_directions) * sector_width,
+                                   thrust_coefficient, wake_decay, min_deficit)
+    sectors = np.rint(np.mod(directions, 360) / sector_width).astype(np.intp) % n_directions
+
+    energy = np.zeros(turbines)
+    free_energy = np.zeros(turbines)
+    farm_power = np.empty(len(speeds)) if keep_power else None
+    for start in range(0, len(speeds), chunk_size):
+        part = slice(start, start + chunk_size)
+        # Скорость у каждой ВЭУ: скорость набегающего потока × коэффициент сектора
+        effective = speeds[part, None] * factors[sectors[part]]
+        power = wind_power_batch(effective, rotor_radius, generator_efficiency, gearbox_efficiency)
+        energy += power.sum(axis=0) * step_hours / 1000
+        if keep_power:
+            farm_power[part] = power.sum(axis=1)
+        free_power = wind_power_batch(speeds[part, None], rotor_radius, generator_efficiency, gearbox_efficiency)
+        free_energy += free_power.sum(axis=0) * step_hours / 1000
+
+    total_free = free_energy.sum()
+    result = {
+        'energy': energy,
+        'free_energy': free_energy,
+        'wake_loss': 1 - energy.sum() / total_free if total_free > 0 else 0.0,
+        'factors': factors,
+    }
+    if keep_power:
+        result['power'] = farm_power
+    return result
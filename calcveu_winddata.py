@@ -0,0 +1,193 @@
+import argparse
+import csv
+import itertools
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Формат двоичного файла ветровых данных (по столбцам):
+# заголовок HEADER_SIZE байт, затем отметки времени (int64, секунды Unix) и скорости (float32, м/с).
+# В заголовке хранятся размер и время изменения исходного файла для проверки актуальности.
+MAGIC = b"CALCVEUW"
+FORMAT_VERSION = 1
+HEADER_FORMAT = "<8sIIQQq"
+HEADER_SIZE = 64
+# Расширение файла кэша, который создается рядом с исходным файлом
+CACHE_EXTENSION = ".cvw"
+
+
+# Чтение заголовка двоичного файла. Возвращает (количество отсчетов, размер и время изменения источника).
+def _read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Файл {path} поврежден")
+    magic, version, _, count, source_size, source_mtime = struct.unpack_from(HEADER_FORMAT, header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Файл {path} не является файлом ветровых данных")
+    if os.path.getsize(path) != HEADER_SIZE + count * (8 + 4):
+        raise ValueError(f"Файл {path} поврежден")
+    return count, source_size, source_mtime
+
+
+# Разбор столбца скоростей порции; пустые и нечисловые значения дают NaN
+def _parse_speeds(values):
+    try:
+        return np.array(values, dtype=np.float32)
+    except ValueError:
+        pass
+    speeds = np.empty(len(values), dtype=np.float32)
+    for i, value in enumerate(values):
+        try:
+            speeds[i] = float(value)
+        except ValueError:
+            speeds[i] = np.nan
+    return speeds
+
+
+# Чтение журнала анемометра (CSV) порциями по chunk_size строк.
+# Время — строка ISO ("2024-03-20 11:51:03") или секунды Unix.
+# Строки с пустой или нечисловой скоростью (пропуски в журнале) пропускаются: энергия за такой
+# отсчет считается по предыдущему отсчету в пределах max_gap, как при неравномерной записи.
+# Если задан словарь statistics, в statistics["skipped"] накапливается количество пропущенных строк.
+# Возвращает порции (отметки времени int64, скорости float32).
+def read_wind_csv(path, time_column="time", speed_column="speed", chunk_size=1000000, statistics=None):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = [column for column in (time_column, speed_column) if column not in header]
+        if missing:
+            raise ValueError(f"В файле {path} нет столбцов: {', '.join(missing)}")
+        time_index = header.index(time_column)
+        speed_index = header.index(speed_column)
+
+        epoch = None
+        while True:
+            rows = [row for row in itertools.islice(reader, chunk_size) if row]
+            if not rows:
+                return
+            speeds = _parse_speeds([row[speed_index] if len(row) > speed_index else "" for row in rows])
+            valid = ~np.isnan(speeds)
+            if not valid.all():
+                if statistics is not None:
+                    statistics["skipped"] = statistics.get("skipped", 0) + int((~valid).sum())
+                rows = list(itertools.compress(rows, valid.tolist()))
+                speeds = speeds[valid]
+                if not rows:
+                    continue
+            times = [row[time_index] for row in rows]
+            # Формат времени определяется по первой строке файла
+            if epoch is None:
+                epoch = times[0].replace(".", "", 1).isdigit()
+            if epoch:
+                timestamps = np.array(times, dtype=np.float64).astype(np.int64)
+            else:
+                timestamps = np.array(times, dtype="datetime64[s]").astype(np.int64)
+            yield timestamps, speeds
+
+
+# Однократный разбор журнала в двоичный файл cache_path.
+# Отметки времени пишутся сразу в итоговый файл, скорости — во временный, который затем
+# дописывается в конец; готовый файл атомарно заменяет старый (os.replace), поэтому
+# прерванный разбор не оставляет поврежденного кэша. progress(count) вызывается после каждой порции;
+# statistics — как в read_wind_csv. Возвращает количество отсчетов.
+def ingest_wind_csv(path, cache_path=None, time_column="time", speed_column="speed", chunk_size=1000000,
+                    progress=None, statistics=None):
+    cache_path = cache_path or path + CACHE_EXTENSION
+    source = os.stat(path)
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as output, tempfile.TemporaryFile(dir=directory) as speeds_file:
+            output.write(b"\0" * HEADER_SIZE)
+            count = 0
+            previous = None
+            for timestamps, speeds in read_wind_csv(path, time_column, speed_column, chunk_size, statistics):
+                if np.any(np.diff(timestamps) < 0) or (previous is not None and timestamps[0] < previous):
+                    raise ValueError("Отметки времени должны идти по возрастанию")
+                previous = timestamps[-1]
+                output.write(timestamps.astype("<i8").tobytes())
+                speeds_file.write(speeds.astype("<f4").tobytes())
+                count += len(timestamps)
+                if progress is not None:
+                    progress(count)
+
+            speeds_file.seek(0)
+            while True:
+                block = speeds_file.read(1 << 24)
+                if not block:
+                    break
+                output.write(block)
+            output.seek(0)
+            output.write(struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, 0, count,
+                                     source.st_size, source.st_mtime_ns))
+            output.flush()
+            os.fsync(output.fileno())
+        # mkstemp создает файл только для владельца; кэшу нужны обычные права с учетом umask
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary_path, 0o666 & ~umask)
+        os.replace(temporary_path, cache_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    return count
+
+
+# Открытие двоичного файла без чтения данных: столбцы отображаются в память (np.memmap).
+# Возвращает (отметки времени datetime64[s], скорости float32) — представления без копирования,
+# которые можно передавать в calculate_energy_series_arrays и wind_power_batch.
+def open_wind_data(cache_path):
+    count, _, _ = _read_header(cache_path)
+    if count == 0:
+        return np.empty(0, dtype="datetime64[s]"), np.empty(0, dtype=np.float32)
+    timestamps = np.memmap(cache_path, dtype="<i8", mode="r", offset=HEADER_SIZE, shape=(count,))
+    speeds = np.memmap(cache_path, dtype="<f4", mode="r", offset=HEADER_SIZE + 8 * count, shape=(count,))
+    return timestamps.view("datetime64[s]"), speeds
+
+
+# Загрузка журнала анемометра с кэшированием: если двоичный файл актуален (совпадают размер
+# и время изменения исходного CSV), он только отображается в память; иначе журнал разбирается заново.
+def load_wind_data(path, cache_path=None, time_column="time", speed_column="speed", chunk_size=1000000,
+                   progress=None):
+    cache_path = cache_path or path + CACHE_EXTENSION
+    source = os.stat(path)
+    try:
+        _, source_size, source_mtime = _read_header(cache_path)
+        fresh = source_size == source.st_size and source_mtime == source.st_mtime_ns
+    except (OSError, ValueError, struct.error):
+        fresh = False
+    if not fresh:
+        ingest_wind_csv(path, cache_path, time_column, speed_column, chunk_size, progress)
+    return open_wind_data(cache_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Разбор журнала анемометра в двоичный файл для быстрой загрузки")
+    parser.add_argument("input", help="CSV-файл со столбцами времени и скорости ветра")
+    parser.add_argument("output", nargs="?", help=f"двоичный файл (по умолчанию input{CACHE_EXTENSION})")
+    parser.add_argument("--time-column", default="time")
+    parser.add_argument("--speed-column", default="speed")
+    parser.add_argument("--chunk-size", type=int, default=1000000, help="количество строк в порции")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    statistics = {}
+    try:
+        count = ingest_wind_csv(args.input, args.output, args.time_column, args.speed_column, args.chunk_size,
+                                lambda count: sys.stderr.write(f"\rОбработано {count} отсчетов"), statistics)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"\nОшибка: {e}\n")
+        return 1
+    sys.stderr.write(f"\nГотово: {count} отсчетов за {time.perf_counter() - started:.1f} с\n")
+    if statistics.get("skipped"):
+        sys.stderr.write(f"Пропущено строк без скорости ветра: {statistics['skipped']}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+# Настройка pytest: модули программы лежат в корне репозитория, файл conftest.py в корне
+# добавляет этот каталог в sys.path, поэтому проверки из tests/ импортируют calcveu_* напрямую.
+# Запуск проверок: python -m pytest -q
@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+import pytest
+
+from calcveu_core import wind_power
+from calcveu_batch import calculate_energy_series, calculate_energy_series_arrays, wind_power_batch
+
+
+# Пакетный расчет поэлементно совпадает со скалярной функцией wind_power
+def test_wind_power_batch_matches_wind_power():
+    rng = np.random.default_rng(1)
+    speed = rng.uniform(0, 30, 200)
+    radius = rng.uniform(0.5, 60, 200)
+    generator_efficiency = rng.uniform(0.5, 1, 200)
+    gearbox_efficiency = rng.uniform(0.5, 1, 200)
+
+    result = wind_power_batch(speed, radius, generator_efficiency, gearbox_efficiency)
+    expected = [wind_power(*values) for values in zip(speed, radius, generator_efficiency, gearbox_efficiency)]
+    np.testing.assert_allclose(result, expected, rtol=1e-14)
+
+
+# Сетка через broadcasting и запись в готовый массив out
+def test_wind_power_batch_broadcasting_and_out():
+    speeds = np.array([0.0, 3.5, 12.0])
+    radii = np.array([1.0, 20.0])
+    out = np.empty((3, 2))
+    result = wind_power_batch(speeds[:, None], radii[None, :], 0.9, 0.95, out=out)
+    assert result is out
+    for i, speed in enumerate(speeds):
+        for j, radius in enumerate(radii):
+            assert math.isclose(out[i, j], wind_power(speed, radius, 0.9, 0.95), rel_tol=1e-14)
+
+    with pytest.raises(ValueError):
+        wind_power_batch(speeds, radii[:, None], 0.9, 0.95, out=np.empty(3))
+
+
+# Отсчеты с разным шагом и пропуском: гистограмма взвешивается по длительности отсчетов,
+# поэтому при скоростях в серединах интервалов обе оценки совпадают
+def test_histogram_accuracy_weights_samples_by_duration():
+    from calcveu_batch import check_energy_histogram_accuracy
+
+    steps = np.array([600] * 50 + [60] * 200 + [7200] + [600] * 50)
+    timestamps = np.datetime64("2024-01-01T00:00:00") + np.concatenate(([0], np.cumsum(steps))).astype("timedelta64[s]")
+    speeds = np.concatenate((np.full(51, 4.125), np.full(200, 11.875), np.full(51, 7.625)))
+
+    result = check_energy_histogram_accuracy(timestamps, speeds, 20, 0.9, 0.95)
+    assert result['relative_error'] < 1e-9
+
+
+# Энергия отсчета (кВт·ч) при постоянной мощности в течение seconds секунд
+def sample_energy(speed, seconds):
+    return wind_power(speed, 20, 0.9, 0.95) * seconds / 3600000
+
+
+# Энергия интервала относится к суткам его начала; суммы по месяцам и годам складываются из суток
+def test_energy_series_bucketing_matches_hand_sum():
+    timestamps = np.array(["2023-12-31T23:30:00", "2024-01-01T00:00:00", "2024-01-01T00:20:00"],
+                          dtype="datetime64[s]")
+    speeds = np.array([6.0, 8.0, 10.0])
+    per_day, per_month, per_year = calculate_energy_series_arrays(timestamps, speeds, 20, 0.9, 0.95)
+
+    december = sample_energy(6.0, 1800)
+    january = sample_energy(8.0, 1200) + sample_energy(10.0, 1200)
+    assert per_day == pytest.approx({"2023-12-31": december, "2024-01-01": january})
+    assert per_month == pytest.approx({"2023-12": december, "2024-01": january})
+    assert per_year == pytest.approx({"2023": december, "2024": january})
+
+
+# Интервалы длиннее max_gap не входят в энергию (ни сам интервал, ни последний отсчет после него)
+def test_energy_series_excludes_gaps():
+    timestamps = np.array(["2024-02-01T00:00:00", "2024-02-01T00:10:00", "2024-02-01T03:00:00",
+                           "2024-02-01T03:10:00"], dtype="datetime64[s]")
+    speeds = np.array([5.0, 7.0, 9.0, 11.0])
+    per_day, _, _ = calculate_energy_series_arrays(timestamps, speeds, 20, 0.9, 0.95, max_gap=3600)
+    expected = sample_energy(5.0, 600) + sample_energy(9.0, 600) + sample_energy(11.0, 600)
+    assert per_day == pytest.approx({"2024-02-01": expected})
+
+    # Последний интервал — пропуск: последний отсчет тоже не учитывается
+    per_day, _, _ = calculate_energy_series_arrays(timestamps[:3], speeds[:3], 20, 0.9, 0.95, max_gap=3600)
+    assert per_day == pytest.approx({"2024-02-01": sample_energy(5.0, 600)})
+
+
+# Ряд с неравномерным шагом и пропусками длиннее max_gap
+@pytest.fixture
+def irregular_series():
+    rng = np.random.default_rng(6)
+    steps = rng.choice([60, 600, 600, 1800, 7200], 2000)
+    timestamps = np.datetime64("2023-12-20T00:00:00") + np.cumsum(steps).astype("timedelta64[s]")
+    return timestamps, rng.weibull(2, 2000) * 7
+
+
+# Результат не зависит от размера порции, а итерируемый вход совпадает с массивами
+def test_energy_series_chunk_size_and_entry_points_agree(irregular_series):
+    timestamps, speeds = irregular_series
+    expected = calculate_energy_series_arrays(timestamps, speeds, 20, 0.9, 0.95)
+    for chunk_size in (1, 7, 333, 5000):
+        result = calculate_energy_series_arrays(timestamps, speeds, 20, 0.9, 0.95, chunk_size=chunk_size)
+        for got, wanted in zip(result, expected):
+            assert got.keys() == wanted.keys()
+            assert list(got.values()) == pytest.approx(list(wanted.values()), rel=1e-12)
+
+    samples = zip((str(t).replace("T", " ") for t in timestamps), speeds.tolist())
+    result = calculate_energy_series(samples, 20, 0.9, 0.95, chunk_size=97)
+    for got, wanted in zip(result, expected):
+        assert got.keys() == wanted.keys()
+        assert list(got.values()) == pytest.approx(list(wanted.values()), rel=1e-12)
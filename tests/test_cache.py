@@ -0,0 +1,31 @@
+import numpy as np
+
+from calcveu_batch import wind_power_batch
+from calcveu_cache import PowerCurveCache, PowerCurveTable, wind_power_lookup
+
+
+# Интерполяция по таблице с шагом 0,01 м/с близка к точному расчету
+# (погрешность линейной интерполяции кубической кривой мала по сравнению с мощностью при 30 м/с)
+def test_lookup_matches_batch():
+    speed = np.random.default_rng(3).uniform(0, 30, 10000)
+    expected = wind_power_batch(speed, 20, 0.9, 0.9)
+    np.testing.assert_allclose(wind_power_lookup(speed, 20, 0.9, 0.9), expected,
+                               rtol=1e-4, atol=1e-7 * expected.max())
+
+
+# Скорости вне таблицы, бесконечности и пропуски рассчитываются как в wind_power_batch
+def test_lookup_outside_and_missing_values():
+    speed = np.array([1.0, np.nan, 5.0, -2.0, 45.0, np.inf, 30.0, 0.0])
+    result = wind_power_lookup(speed, 20, 0.9, 0.9)
+    expected = wind_power_batch(speed, 20, 0.9, 0.9)
+    assert np.isnan(result[1])
+    np.testing.assert_allclose(result, expected, rtol=1e-4)
+    assert np.isnan(PowerCurveTable(20, 0.9, 0.9).power(np.nan))
+
+
+def test_cache_statistics_and_eviction():
+    cache = PowerCurveCache(maxsize=2)
+    for radius in (10, 20, 10, 30, 10):
+        cache.power(5.0, radius, 0.9, 0.9)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 3, 1, 2)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from calcveu_batch import calculate_energy_series_arrays
+from calcveu_correction import calculate_hub_height_energy, correct_wind_speed
+
+HUB_HEIGHTS = [30.0, 60.0, 100.0]
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(5)
+    steps = rng.choice([600, 600, 600, 5400], 3000)
+    timestamps = np.datetime64("2024-01-01T00:00:00") + np.cumsum(steps).astype("timedelta64[s]")
+    speeds = rng.weibull(2, 3000) * 7
+    temperature = rng.uniform(-20, 30, 3000)
+    pressure = rng.uniform(97000, 103000, 3000)
+    return timestamps, speeds, temperature, pressure
+
+
+# Расчет за один проход совпадает с интегрированием ряда, заранее пересчитанного на каждую высоту
+def test_hub_height_energy_matches_full_series(series):
+    timestamps, speeds, temperature, pressure = series
+    result = calculate_hub_height_energy(timestamps, speeds, 10, HUB_HEIGHTS, 20, 0.9, 0.95,
+                                         temperature=temperature, pressure=pressure, chunk_size=700)
+    corrected = correct_wind_speed(speeds, 10, HUB_HEIGHTS, temperature=temperature, pressure=pressure)
+    for hub_height, hub_speeds in zip(HUB_HEIGHTS, corrected):
+        expected = calculate_energy_series_arrays(timestamps, hub_speeds, 20, 0.9, 0.95)
+        for got, wanted in zip(result[hub_height], expected):
+            assert got.keys() == wanted.keys()
+            np.testing.assert_allclose(list(got.values()), list(wanted.values()), rtol=1e-12)
+
+
+# Температура и давление могут быть заданы числами
+def test_hub_height_energy_scalar_temperature_and_pressure(series):
+    timestamps, speeds, _, _ = series
+    scalar = calculate_hub_height_energy(timestamps, speeds, 10, HUB_HEIGHTS, 20, 0.9, 0.95,
+                                         temperature=15.0, pressure=101325.0, chunk_size=700)
+    arrays = calculate_hub_height_energy(timestamps, speeds, 10, HUB_HEIGHTS, 20, 0.9, 0.95,
+                                         temperature=np.full(len(speeds), 15.0),
+                                         pressure=np.full(len(speeds), 101325.0), chunk_size=700)
+    for hub_height in HUB_HEIGHTS:
+        np.testing.assert_allclose(list(scalar[hub_height][2].values()), list(arrays[hub_height][2].values()),
+                                   rtol=1e-12)
@@ -0,0 +1,151 @@
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from calcveu_core import calculate_energy
+from calcveu_db import (RESULT_COLUMNS, SCHEMA_VERSION, SECONDS_PER_DAY, SUMMARY_COLUMNS,
+                        WindPowerResultsRepository)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = WindPowerResultsRepository(str(tmp_path / "results.db"))
+    yield repository
+    repository.close()
+
+
+# Соединение только для чтения видит записанные строки, не пишет в базу, а его прерывание
+# не мешает записи через основное соединение
+def test_read_only_repository(repository):
+    run_id = repository.create_run("Проверка")
+    repository.save_many([(run_id, i, 5.0, 10.0, 0.9, 0.9, 100.0, None, None, None) for i in range(10)])
+    reader = WindPowerResultsRepository(repository.path, read_only=True)
+    try:
+        assert reader.count() == 10
+        with pytest.raises(sqlite3.OperationalError):
+            reader.save(run_id, 0, 5.0, 10.0, 0.9, 0.9, 100.0)
+        reader.interrupt()
+        repository.save(run_id, 10, 5.0, 10.0, 0.9, 0.9, 100.0)
+        assert reader.count() == 11
+    finally:
+        reader.close()
+
+
+# Результаты нескольких запусков за несколько суток; у части строк нет энергии и скорости (NULL),
+# значения сортируемых столбцов повторяются
+def fill_results(repository):
+    runs = [repository.create_run(f"Запуск {i}") for i in range(3)]
+    rows = []
+    for i in range(60):
+        power = float(i % 7 * 100)
+        energy = (None, None, None) if i % 4 == 0 else calculate_energy(power)
+        speed = None if i % 9 == 0 else float(i % 5)
+        rows.append((runs[i % 3], 1700000000 + i * 7200, speed, float(i % 3 + 1), 0.9, 0.95, power) + energy)
+    repository.save_many(rows, batch_size=17)
+    return runs
+
+
+def all_pages(repository, column, descending, limit, filters=None):
+    rowids = []
+    after = None
+    while True:
+        rows, after = repository.fetch_page(column, descending, after, limit, filters)
+        rowids.extend(row[0] for row in rows)
+        if len(rows) < limit:
+            return rowids
+
+
+# Постраничный просмотр по каждому столбцу в обоих направлениях выдает все строки ровно один раз
+# в порядке ORDER BY столбец, rowid — в том числе строки со значением NULL
+@pytest.mark.parametrize("column", RESULT_COLUMNS)
+@pytest.mark.parametrize("descending", [False, True])
+def test_fetch_page_visits_every_row(repository, column, descending):
+    fill_results(repository)
+    order = "DESC" if descending else "ASC"
+    expected = [row[0] for row in repository.conn.execute(
+        f"SELECT rowid FROM wind_power_results ORDER BY {column} {order}, rowid {order}")]
+    assert all_pages(repository, column, descending, 7) == expected
+    assert all_pages(repository, column, descending, 1) == expected
+
+    filters = {"radius": (2.0, None)}
+    filtered = [row[0] for row in repository.conn.execute(
+        f"SELECT rowid FROM wind_power_results WHERE radius >= 2 ORDER BY {column} {order}, rowid {order}")]
+    assert all_pages(repository, column, descending, 5, filters) == filtered
+
+
+# Без переданной энергии save рассчитывает ее по мощности
+def test_save_fills_energy_from_power(repository):
+    run_id = repository.create_run("Проверка")
+    repository.save(run_id, 1700000000, 5.0, 10.0, 0.9, 0.9, 1000.0)
+    row = repository.conn.execute("SELECT energy_per_day, energy_per_month, energy_per_year "
+                                  "FROM wind_power_results").fetchone()
+    assert row == pytest.approx(calculate_energy(1000.0))
+
+
+# Сводки по запускам и по дням совпадают с агрегатами по всем строкам таблицы
+def test_rollups_match_full_aggregates(repository):
+    fill_results(repository)
+    run_id = repository.create_run("Отдельные записи")
+    for i in range(5):
+        repository.save(run_id, 1700000000 + i * 40000, 3.0, 1.0, 0.9, 0.9, 50.0 * i)
+
+    aggregates = ("COUNT(*), TOTAL(power), MIN(power), MAX(power), TOTAL(energy_per_day), "
+                  "TOTAL(energy_per_month), TOTAL(energy_per_year)")
+    expected = {row[0]: row[1:] for row in repository.conn.execute(
+        f"SELECT run_id, {aggregates}, MIN(timestamp), MAX(timestamp) FROM wind_power_results GROUP BY run_id")}
+    summaries = repository.run_summaries()
+    assert {summary["run_id"] for summary in summaries} == set(expected)
+    for summary in summaries:
+        values = tuple(summary[column] for column in SUMMARY_COLUMNS) + (summary["first_timestamp"],
+                                                                          summary["last_timestamp"])
+        assert values == pytest.approx(expected[summary["run_id"]])
+
+    expected_days = {row[0]: row[1:] for row in repository.conn.execute(
+        f"SELECT timestamp / {SECONDS_PER_DAY} * {SECONDS_PER_DAY}, {aggregates} FROM wind_power_results "
+        f"GROUP BY timestamp / {SECONDS_PER_DAY}")}
+    days = repository.daily_summaries()
+    assert [day["day_start"] for day in days] == sorted(expected_days)
+    for day in days:
+        assert tuple(day[column] for column in SUMMARY_COLUMNS) == pytest.approx(expected_days[day["day_start"]])
+
+    total = repository.conn.execute("SELECT COUNT(*) FROM wind_power_results").fetchone()[0]
+    assert repository.count() == total
+    assert repository.count({"run_id": (run_id, run_id)}) == 5
+
+
+# База прежнего формата (wind_power_results.db из репозитория) переводится на версию 2:
+# все строки переносятся в один запуск, время — в секунды Unix, энергия рассчитывается по мощности
+def test_migrate_tracked_v1_database(tmp_path):
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wind_power_results.db")
+    path = str(tmp_path / "results.db")
+    shutil.copyfile(source, path)
+    with sqlite3.connect(path) as connection:
+        old_rows = connection.execute("SELECT speed, radius, generator_efficiency, gearbox_efficiency, power, "
+                                      "date_time FROM wind_power_results ORDER BY rowid").fetchall()
+    connection.close()
+
+    repository = WindPowerResultsRepository(path)
+    try:
+        assert repository.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        rows = repository.conn.execute(f"SELECT {', '.join(RESULT_COLUMNS)} FROM wind_power_results "
+                                       f"ORDER BY rowid").fetchall()
+        assert len(rows) == len(old_rows) > 0
+        summaries = repository.run_summaries()
+        assert len(summaries) == 1 and summaries[0]["rows"] == len(old_rows)
+        for row, old in zip(rows, old_rows):
+            assert row[0] == summaries[0]["run_id"]
+            assert row[1] == int(datetime.fromisoformat(old[5]).timestamp())
+            assert row[2:7] == old[:5]
+            assert row[7:] == pytest.approx(calculate_energy(old[4]))
+    finally:
+        repository.close()
+
+    # Повторное открытие не переносит данные еще раз
+    repository = WindPowerResultsRepository(path)
+    try:
+        assert repository.count() == len(old_rows)
+    finally:
+        repository.close()
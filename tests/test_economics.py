@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from calcveu_economics import (build_cash_flows, calculate_discounted_payback, calculate_irr, calculate_lcoe,
+                               calculate_npv)
+
+
+# В найденной ВНД ЧПС обращается в ноль; без смены знака потоков ВНД не определена
+def test_irr_root_and_no_sign_change():
+    cash_flows = np.array([[-1000.0, 300, 400, 500, 200],
+                           [-1000.0, 1500, 0, 0, 0],
+                           [-1000.0, -50, -50, -50, -50],
+                           [500.0, 100, 100, 100, 100]])
+    irr = calculate_irr(cash_flows)
+
+    assert irr[1] == pytest.approx(0.5)
+    np.testing.assert_allclose(calculate_npv(cash_flows[:2], irr[:2]), 0, atol=1e-6)
+    assert np.isnan(irr[2:]).all()
+
+
+# Срок окупаемости уточняется внутри года; неокупаемый проект получает inf
+def test_discounted_payback_interpolates_within_year():
+    cash_flows = np.array([[-1000.0, 600, 600, 600],
+                           [-1000.0, 100, 100, 100]])
+    payback = calculate_discounted_payback(cash_flows, 0.1)
+
+    first = 600 / 1.1
+    second = 600 / 1.1 ** 2
+    assert payback[0] == pytest.approx(1 + (1000 - first) / second)
+    assert payback[1] == math.inf
+
+    # Без дисконтирования: 1000 = 600 + 400, т. е. 400/600 второго года
+    assert calculate_discounted_payback(cash_flows[:1], 0.0)[0] == pytest.approx(1 + 400 / 600)
+
+
+# Годы после окончания срока службы проекта заполнены нулями
+def test_cash_flows_zero_after_service_life():
+    cash_flows = build_cash_flows([1000, 2000], 100, 5, [50, 80], [3, 5], tariff_escalation=0.1)
+
+    assert cash_flows.shape == (2, 6)
+    np.testing.assert_array_equal(cash_flows[:, 0], [-1000, -2000])
+    np.testing.assert_allclose(cash_flows[0, 1:4], [450, 500, 555])
+    np.testing.assert_array_equal(cash_flows[0, 4:], 0)
+    np.testing.assert_allclose(cash_flows[1, 1:], 500 * 1.1 ** np.arange(5) - 80)
+
+
+# LCOE совпадает с ручным расчетом: дисконтированные затраты на дисконтированную выработку
+def test_lcoe_matches_hand_calculation():
+    capex, energy, maintenance, life, rate = 150000.0, 12000.0, 3000.0, 12, 0.08
+    escalation, degradation = 0.04, 0.01
+
+    costs = capex
+    production = 0.0
+    for year in range(1, life + 1):
+        costs += maintenance * (1 + escalation) ** (year - 1) / (1 + rate) ** year
+        production += energy * (1 - degradation) ** (year - 1) / (1 + rate) ** year
+
+    lcoe = calculate_lcoe(capex, energy, maintenance, life, rate, escalation, degradation)
+    assert lcoe[0] == pytest.approx(costs / production, rel=1e-12)
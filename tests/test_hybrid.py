@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from calcveu_hybrid import (simulate_dispatch, size_battery_bank, solar_unit_profile, synthetic_profiles,
+                            wind_scale, wind_unit_profile)
+from calcveu_solar import make_module, module_power
+
+
+# Без выработки емкость покрывает нагрузку за весь период с учетом КПД разряда и остатка заряда
+def test_size_battery_bank_constant_load_without_generation():
+    result = size_battery_bank(np.zeros(8), np.full(8, 0.5), battery_capacity_ah=100, voltage=12)
+    assert result['capacity'] == pytest.approx(8 * 0.5 / 0.95 / 0.8)
+    assert result['unmet_load'] == 0
+    assert result['battery_count'] == 5
+
+
+# Допустимый недоотпуск уменьшает емкость, но не превышается
+def test_size_battery_bank_allowed_unmet_load():
+    rng = np.random.default_rng(4)
+    generation = rng.uniform(0, 2, 24 * 30)
+    load = np.full(24 * 30, 1.0)
+    full = size_battery_bank(generation, load)
+    partial = size_battery_bank(generation, load, max_unmet_fraction=0.05)
+    assert partial['capacity'] < full['capacity']
+    assert partial['unmet_fraction'] <= 0.05 + 1e-9
+
+
+# Месяц почасовых профилей и набор конфигураций, включая АКБ нулевой емкости
+@pytest.fixture
+def dispatch_case():
+    wind_speed, irradiance = synthetic_profiles(6.0, 800.0, hours=24 * 30, seed=2)
+    load = np.random.default_rng(3).uniform(0.5, 3.0, 24 * 30)
+    return {
+        'wind_profile': wind_unit_profile(wind_speed),
+        'solar_profile': solar_unit_profile(irradiance, 20.0),
+        'load': load,
+        'wind_scale': wind_scale([0.8, 1.2, 1.5, 2.0], 0.9, 0.95),
+        'solar_power': [0.0, 2.0, 3.0, 5.0],
+        'battery_capacity': [0.0, 5.0, 20.0, 60.0],
+    }
+
+
+# Баланс энергии: выработка − энергия на заряд + разряд = отпущенная нагрузка + сброс
+def test_simulate_dispatch_energy_balance(dispatch_case):
+    result = simulate_dispatch(**dispatch_case, battery_power=2.5, charge_efficiency=0.9, discharge_efficiency=0.85,
+                               min_soc=0.3, initial_soc=0.6)
+    generation = result['wind_energy'] + result['solar_energy']
+    served = result['load'] - result['unmet_load']
+    np.testing.assert_allclose(generation - result['battery_charge'] / 0.9 + result['battery_discharge'],
+                               served + result['curtailment'], rtol=1e-10)
+    capacity = np.array(dispatch_case['battery_capacity'])
+    np.testing.assert_allclose(result['final_soc'],
+                               capacity * 0.6 + result['battery_charge'] - result['battery_discharge'] / 0.85,
+                               rtol=1e-10, atol=1e-9)
+
+    # При КПД заряда 1 энергия на заряд совпадает с запасенной
+    result = simulate_dispatch(**dispatch_case, charge_efficiency=1.0)
+    np.testing.assert_allclose(result['wind_energy'] + result['solar_energy'] - result['battery_charge']
+                               + result['battery_discharge'],
+                               result['load'] - result['unmet_load'] + result['curtailment'], rtol=1e-10)
+
+
+# Без АКБ недоотпуск равен сумме положительной разности нагрузки и выработки
+def test_simulate_dispatch_without_battery(dispatch_case):
+    result = simulate_dispatch(**dispatch_case)
+    generation = (np.outer(dispatch_case['wind_profile'], dispatch_case['wind_scale'])
+                  + np.outer(dispatch_case['solar_profile'], dispatch_case['solar_power']))
+    expected = np.maximum(dispatch_case['load'][:, None] - generation, 0).sum(axis=0)
+    assert result['unmet_load'][0] == pytest.approx(expected[0], rel=1e-12)
+    assert result['battery_discharge'][0] == 0
+
+
+# Размер блока не влияет на результат; заряд АКБ остается между допустимым остатком и емкостью
+def test_simulate_dispatch_block_size_and_soc_bounds(dispatch_case):
+    expected = simulate_dispatch(**dispatch_case, battery_power=2.0, min_soc=0.25, keep_soc=True)
+    for block_size in (1, 7, 1000):
+        result = simulate_dispatch(**dispatch_case, battery_power=2.0, min_soc=0.25, keep_soc=True,
+                                   block_size=block_size)
+        for name, value in expected.items():
+            np.testing.assert_allclose(result[name], value, rtol=1e-12, err_msg=name)
+
+    capacity = np.array(dispatch_case['battery_capacity'])
+    soc = expected['soc']
+    assert soc.shape == (24 * 30, 4)
+    assert np.all(soc >= capacity * 0.25 - 1e-9)
+    assert np.all(soc <= capacity + 1e-9)
+
+
+# Удельный профиль СБ совпадает с моделью модуля calcveu_solar и учитывает нагрев
+def test_solar_unit_profile_uses_module_model():
+    irradiance = np.array([0.0, 200.0, 600.0, 1000.0])
+    temperature = np.array([10.0, 15.0, 25.0, 35.0])
+    module = make_module(350.0, temperature_coefficient=-0.005, losses=0.1)
+    expected = module_power(irradiance[:, None], temperature, module)[:, 0] / 350.0
+    np.testing.assert_allclose(solar_unit_profile(irradiance, temperature, module), expected)
+
+    hot = solar_unit_profile(irradiance, 40.0)
+    cold = solar_unit_profile(irradiance, 0.0)
+    assert np.all(hot[1:] < cold[1:])
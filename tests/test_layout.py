@@ -0,0 +1,33 @@
+import math
+
+import numpy as np
+import pytest
+
+from calcveu_core import calculate_ground_area
+from calcveu_layout import calculate_ground_area_batch, calculate_site_layout
+
+
+def test_ground_area_batch_matches_scalar():
+    d, h, omega = np.meshgrid([5.0, 20.0, 100.0], [0.0, 50.0, 200.0], [0.0, 30.0, 90.0])
+    expected = np.vectorize(calculate_ground_area)(d, h, omega)
+    np.testing.assert_allclose(calculate_ground_area_batch(d, h, omega), expected, rtol=1e-14)
+
+
+# Для одной мачты общая площадь равна площади мачты
+def test_single_mast_land_use_equals_footprint():
+    layout = calculate_site_layout([0.0], [0.0], 10, 50, 60)
+    assert layout['land_use'] == pytest.approx(layout['footprints'][0], rel=1e-12)
+    assert layout['land_use'] >= layout['footprints'][0] * (1 - 1e-12)
+
+
+# Без пересечений площади складываются; пересечения уменьшают общую площадь
+def test_site_land_use_with_and_without_overlaps():
+    far = calculate_site_layout([0.0, 1000.0], [0.0, 0.0], 10, 50, 60)
+    assert len(far['overlaps']) == 0
+    assert far['land_use'] == pytest.approx(far['footprint_total'], rel=1e-12)
+
+    near = calculate_site_layout([0.0, 40.0], [0.0, 0.0], 10, 50, 60)
+    r = near['radius'][0]
+    lens = 2 * r * r * math.acos(20 / r) - 20 * math.sqrt(4 * r * r - 1600)
+    assert near['overlaps'].tolist() == [[0, 1]]
+    assert near['land_use'] == pytest.approx(near['footprint_total'] - lens, rel=1e-9)
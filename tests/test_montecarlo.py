@@ -0,0 +1,28 @@
+import numpy as np
+
+from calcveu_montecarlo import make_uncertainty, run_monte_carlo
+
+
+# Неопределенность всех разыгрываемых параметров
+def make_test_uncertainty():
+    return make_uncertainty(2.0, 7.0, 5.0, weibull_k_std=0.2, weibull_c_std=0.7, air_density_std=0.03,
+                            degradation_min=0.0, degradation_max=0.01, tariff_std=0.5)
+
+
+# Запуск с фиксированным набором параметров проекта
+def simulate(seed, workers):
+    return run_monte_carlo((20, 0.9, 0.95), 5e6, 1e5, 25, 0.1, make_test_uncertainty(), draws=5000, seed=seed,
+                           chunk_size=1000, workers=workers, keep_samples=True)
+
+
+# Выборки зависят только от seed: число процессов на них не влияет, другой seed дает другие значения
+def test_monte_carlo_samples_do_not_depend_on_workers():
+    serial = simulate(seed=3, workers=1)
+    parallel = simulate(seed=3, workers=2)
+    for name in ('energy_per_year', 'discounted_payback'):
+        assert len(serial['samples'][name]) == 5000
+        np.testing.assert_array_equal(serial['samples'][name], parallel['samples'][name])
+    assert serial['energy_per_year']['percentiles'] == parallel['energy_per_year']['percentiles']
+
+    other = simulate(seed=4, workers=1)
+    assert not np.array_equal(serial['samples']['energy_per_year'], other['samples']['energy_per_year'])
@@ -0,0 +1,100 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from calcveu_settings import FORMAT_VERSION, LEGACY_DIALOG, SettingsStore, read_legacy_values
+
+
+# Объект, который при загрузке обычным pickle создал бы файл marker
+class CreatesFile:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return open, (self.marker, "w")
+
+
+# Хранилище без отложенной записи и без файла прежнего формата
+def make_store(tmp_path, **options):
+    options.setdefault("save_delay", None)
+    options.setdefault("legacy_path", None)
+    return SettingsStore(str(tmp_path / "settings.json"), **options)
+
+
+# Прежний файл с объектами любых классов не загружается и не выполняет код
+def test_read_legacy_values_refuses_classes(tmp_path):
+    marker = tmp_path / "marker"
+    path = tmp_path / "values.pkl"
+    path.write_bytes(pickle.dumps((CreatesFile(str(marker)), "5", "0.9", "0.95")))
+    assert read_legacy_values(str(path)) is None
+    assert not marker.exists()
+
+    path.write_bytes(pickle.dumps((6.5, 20, "0.9", 0.95)))
+    assert read_legacy_values(str(path)) == {"speed": "6.5", "radius": "20", "generator_efficiency": "0.9",
+                                             "gearbox_efficiency": "0.95"}
+
+
+# Кортеж прежнего формата переносится в окно расчета мощности и записывается в новый файл
+def test_legacy_values_migrate_to_wind_power(tmp_path):
+    legacy_path = tmp_path / "values.pkl"
+    legacy_path.write_bytes(pickle.dumps((7.0, 12.5, 0.9, 0.95)))
+    store = make_store(tmp_path, legacy_path=str(legacy_path))
+    expected = {"speed": "7.0", "radius": "12.5", "generator_efficiency": "0.9", "gearbox_efficiency": "0.95"}
+    assert store.values(LEGACY_DIALOG) == expected
+    assert store.history(LEGACY_DIALOG) == [expected]
+
+    store.close()
+    with open(tmp_path / "settings.json", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["version"] == FORMAT_VERSION
+    assert data["dialogs"][LEGACY_DIALOG]["values"] == expected
+
+
+# Повторная запись переносится в начало истории, а длина истории ограничена history_size
+def test_history_deduplicated_and_capped(tmp_path):
+    store = make_store(tmp_path, history_size=3)
+    for speed in ("5", "6", "7", "6", "8"):
+        store.record("wind_power", {"speed": speed})
+    assert [values["speed"] for values in store.history("wind_power")] == ["8", "6", "7"]
+    assert store.values("wind_power") == {"speed": "8"}
+
+    store.record("wind_power", {"speed": "9"}, history=False)
+    assert store.values("wind_power") == {"speed": "9"}
+    assert len(store.history("wind_power")) == 3
+
+
+# Закрытие записывает изменения, отложенные таймером, не дожидаясь его
+def test_close_flushes_pending_changes(tmp_path):
+    store = make_store(tmp_path, save_delay=3600)
+    store.record("geu", {"veu_power": "3"})
+    assert store.timer is not None
+    assert not (tmp_path / "settings.json").exists()
+
+    store.close()
+    assert store.timer is None
+    assert make_store(tmp_path).values("geu") == {"veu_power": "3"}
+
+
+# Ошибка при замене файла оставляет прежний файл и удаляет временный
+def test_failed_write_keeps_old_file(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    store.record("geu", {"veu_power": "3"})
+    store.flush()
+    old_text = (tmp_path / "settings.json").read_text(encoding="utf-8")
+
+    def fail(source, destination):
+        raise OSError("диск недоступен")
+
+    monkeypatch.setattr(os, "replace", fail)
+    store.record("geu", {"veu_power": "4"})
+    with pytest.raises(OSError):
+        store.flush()
+    assert (tmp_path / "settings.json").read_text(encoding="utf-8") == old_text
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["settings.json"]
+    # Несохраненные изменения записываются при следующей попытке
+    assert store.dirty
+    monkeypatch.undo()
+    store.close()
+    assert make_store(tmp_path).values("geu") == {"veu_power": "4"}
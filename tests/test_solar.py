@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+
+from calcveu_solar import (STC_IRRADIANCE, daily_module_yield, make_module, module_power, solar_array_output,
+                           solar_position, solar_yield_from_file)
+
+
+# Суточная выработка по радиации совпадает с мощностью модуля в часы пиковой освещенности
+def test_daily_module_yield_matches_module_power():
+    module = make_module(300)
+    power = module_power(np.array([[STC_IRRADIANCE]]), np.array([25.0]), module)[0, 0]
+    assert daily_module_yield(4.0, 25.0, module)[0] == pytest.approx(power * 4 / 1000)
+    # Нагрев модуля снижает выработку
+    hot, cold = daily_module_yield([4.0, 4.0], [35.0, 5.0], module)
+    assert hot < cold
+    with pytest.raises(ValueError):
+        daily_module_yield(-1.0, 25.0, module)
+
+
+# Два ясных дня почасовых рядов (UTC) для точки в средних широтах
+@pytest.fixture
+def clear_days():
+    timestamps = np.datetime64("2024-06-20T00:00") + np.arange(48).astype("timedelta64[h]")
+    zenith, _ = solar_position(timestamps, 55.0, 37.0)
+    cos_zenith = np.maximum(np.cos(np.radians(zenith)), 0)
+    dni = 850 * cos_zenith ** 0.3 * (cos_zenith > 0)
+    dhi = 120 * cos_zenith
+    ghi = dni * cos_zenith + dhi
+    temperature = 18 + 8 * np.sin(np.arange(48) * np.pi / 12)
+    return timestamps, ghi, dni, dhi, temperature
+
+
+# Матрица T × M и масштабирование по количеству модулей совпадают со скалярным расчетом
+# для каждой ориентации и каждого часа
+def test_solar_array_output_matches_scalar_loop(clear_days):
+    timestamps, ghi, dni, dhi, temperature = clear_days
+    module = make_module(400, temperature_coefficient=-0.0035, noct=47, losses=0.12)
+    tilts, azimuths, counts = [0.0, 30.0, 60.0], [180.0, 150.0, 240.0], [1, 10, 24]
+    result = solar_array_output(timestamps, ghi, temperature, module, tilts, azimuths, 55.0, 37.0, counts,
+                                dni=dni, dhi=dhi, albedo=0.25)
+    zenith, azimuth = solar_position(timestamps, 55.0, 37.0)
+
+    assert result['power'].shape == (48, 3)
+    assert result['energy'].shape == (3, 3)
+    for m, (tilt, surface_azimuth) in enumerate(zip(tilts, azimuths)):
+        beta, gamma = math.radians(tilt), math.radians(surface_azimuth)
+        energy = 0.0
+        for t in range(48):
+            theta, phi = math.radians(zenith[t]), math.radians(azimuth[t])
+            cos_incidence = math.cos(theta) * math.cos(beta) + math.sin(theta) * math.sin(beta) * math.cos(phi - gamma)
+            if zenith[t] >= 90:
+                cos_incidence = 0.0
+            poa = (max(cos_incidence, 0.0) * dni[t] + dhi[t] * (1 + math.cos(beta)) / 2
+                   + ghi[t] * 0.25 * (1 - math.cos(beta)) / 2)
+            cell = temperature[t] + (47 - 20) / 800 * poa
+            power = max(poa * 400 / 1000 * 0.88 * (1 - 0.0035 * (cell - 25)), 0.0)
+            assert result['power'][t, m] == pytest.approx(power, rel=1e-10, abs=1e-9)
+            energy += power / 1000
+        np.testing.assert_allclose(result['energy'][m], energy * np.array(counts), rtol=1e-10)
+
+
+# Годовые суммы по файлу не зависят от размера порции и совпадают с расчетом по всему ряду
+def test_solar_yield_from_file_is_chunk_size_independent(tmp_path):
+    timestamps = np.datetime64("2021-12-28T00:00") + np.arange(24 * 8).astype("timedelta64[h]")
+    zenith, _ = solar_position(timestamps, 45.0, 30.0)
+    ghi = np.round(700 * np.maximum(np.cos(np.radians(zenith)), 0), 1)
+    temperature = np.round(-5 + 6 * np.sin(np.arange(len(timestamps)) * np.pi / 12), 1)
+    path = tmp_path / "tmy.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("time,ghi,temp_air\n")
+        for values in zip(timestamps, ghi, temperature):
+            f.write(f"{str(values[0]).replace('T', ' ')},{values[1]},{values[2]}\n")
+
+    module = make_module(300)
+    tilts, azimuths, counts = [30.0, 45.0], [180.0, 200.0], [1, 8]
+    expected = solar_yield_from_file(path, module, tilts, azimuths, 45.0, 30.0, counts)
+    assert sorted(expected['energy_per_year']) == ["2021", "2022"]
+    assert expected['hours'] == len(timestamps)
+    for chunk_size in (1, 7, 50):
+        result = solar_yield_from_file(path, module, tilts, azimuths, 45.0, 30.0, counts, chunk_size=chunk_size)
+        np.testing.assert_allclose(result['energy'], expected['energy'], rtol=1e-12)
+        for year, energy in expected['energy_per_year'].items():
+            np.testing.assert_allclose(result['energy_per_year'][year], energy, rtol=1e-12)
+
+    years = timestamps.astype("datetime64[Y]")
+    for year in ("2021", "2022"):
+        rows = years == np.datetime64(year)
+        output = solar_array_output(timestamps[rows], ghi[rows], temperature[rows], module, tilts, azimuths,
+                                    45.0, 30.0, counts)
+        np.testing.assert_allclose(expected['energy_per_year'][year], output['energy'], rtol=1e-12)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from calcveu_core import calculate_nominal_power
+from calcveu_batch import wind_power_batch, calculate_nominal_power_batch
+from calcveu_sweep import SWEEP_MODELS, sweep_grid, sweep_scenarios
+
+SPEEDS = np.array([2.0, 5.5, 9.0, 14.0])
+RADII = np.array([1.5, 10.0, 40.0])
+GENERATOR_EFFICIENCIES = np.array([0.8, 0.95])
+GEARBOX_EFFICIENCIES = np.array([0.85, 0.9, 0.97])
+
+
+# Ожидаемый результат модели на сетке через broadcasting
+def expected_grid(model):
+    speed = SPEEDS[:, None, None, None]
+    radius = RADII[None, :, None, None]
+    generator_efficiency = GENERATOR_EFFICIENCIES[None, None, :, None]
+    gearbox_efficiency = GEARBOX_EFFICIENCIES[None, None, None, :]
+    shape = (len(SPEEDS), len(RADII), len(GENERATOR_EFFICIENCIES), len(GEARBOX_EFFICIENCIES))
+    if model == "wind_power":
+        return wind_power_batch(speed, radius, generator_efficiency, gearbox_efficiency)
+    return np.broadcast_to(calculate_nominal_power_batch(radius, generator_efficiency, speed), shape)
+
+
+# Перебор сетки совпадает с пакетным расчетом для всех моделей и размеров порций
+@pytest.mark.parametrize("model", sorted(SWEEP_MODELS))
+@pytest.mark.parametrize("chunk_size", [1, 5, 18, 72, 1000])
+def test_sweep_grid_matches_batch(model, chunk_size):
+    result = sweep_grid(SPEEDS, RADII, GENERATOR_EFFICIENCIES, GEARBOX_EFFICIENCIES, model=model,
+                        workers=1, chunk_size=chunk_size)
+    np.testing.assert_allclose(result, expected_grid(model), rtol=1e-14)
+
+
+@pytest.mark.parametrize("model", sorted(SWEEP_MODELS))
+def test_sweep_grid_process_pool(model):
+    result = sweep_grid(SPEEDS, RADII, GENERATOR_EFFICIENCIES, GEARBOX_EFFICIENCIES, model=model,
+                        workers=2, chunk_size=18)
+    np.testing.assert_allclose(result, expected_grid(model), rtol=1e-14)
+
+
+# Номинальная мощность на небольшой сетке совпадает со скалярной calculate_nominal_power
+def test_sweep_grid_nominal_power_matches_scalar():
+    result = sweep_grid(SPEEDS, RADII, GENERATOR_EFFICIENCIES, GEARBOX_EFFICIENCIES, model="nominal_power",
+                        workers=1, chunk_size=6)
+    for i, speed in enumerate(SPEEDS):
+        for j, radius in enumerate(RADII):
+            for k, generator_efficiency in enumerate(GENERATOR_EFFICIENCIES):
+                expected = calculate_nominal_power(radius, generator_efficiency, speed)
+                np.testing.assert_allclose(result[i, j, k, :], expected, rtol=1e-14)
+
+
+@pytest.mark.parametrize("model", sorted(SWEEP_MODELS))
+def test_sweep_scenarios_matches_batch(model):
+    rng = np.random.default_rng(2)
+    speed = rng.uniform(0, 25, 1000)
+    radius = rng.uniform(1, 50, 1000)
+    result = sweep_scenarios(speed, radius, 0.9, 0.95, model=model, workers=1, chunk_size=128)
+    if model == "wind_power":
+        expected = wind_power_batch(speed, radius, 0.9, 0.95)
+    else:
+        expected = calculate_nominal_power_batch(radius, 0.9, speed)
+    np.testing.assert_allclose(result, expected, rtol=1e-14)
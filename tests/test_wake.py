@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from calcveu_core import wind_power
+from calcveu_wake import BETZ_THRUST_COEFFICIENT, calculate_farm_energy, sector_speed_factors
+
+
+# Площадь пересечения двух окружностей (скалярная формула)
+def overlap_area(r1, r2, d):
+    if d <= abs(r1 - r2):
+        return math.pi * min(r1, r2) ** 2
+    if d >= r1 + r2:
+        return 0.0
+    return (r1 ** 2 * math.acos((d ** 2 + r1 ** 2 - r2 ** 2) / (2 * d * r1))
+            + r2 ** 2 * math.acos((d ** 2 + r2 ** 2 - r1 ** 2) / (2 * d * r2))
+            - 0.5 * math.sqrt((-d + r1 + r2) * (d + r1 - r2) * (d - r1 + r2) * (d + r1 + r2)))
+
+
+# Коэффициенты скорости перебором всех пар ВЭУ для каждого направления (O(n²) без отсечения по длине следа)
+def brute_force_factors(x, y, radius, directions, thrust_coefficient, wake_decay):
+    factors = np.ones((len(directions), len(x)))
+    for i, direction in enumerate(directions):
+        flow_x, flow_y = -math.sin(math.radians(direction)), -math.cos(math.radians(direction))
+        for down in range(len(x)):
+            squared = 0.0
+            for up in range(len(x)):
+                dx, dy = x[down] - x[up], y[down] - y[up]
+                downstream = dx * flow_x + dy * flow_y
+                if up == down or downstream <= 0:
+                    continue
+                wake_radius = radius[up] + wake_decay * downstream
+                overlap = overlap_area(wake_radius, radius[down], abs(dx * flow_y - dy * flow_x))
+                deficit = ((1 - math.sqrt(1 - thrust_coefficient)) * (radius[up] / wake_radius) ** 2
+                           * overlap / (math.pi * radius[down] ** 2))
+                squared += deficit ** 2
+            factors[i, down] = 1 - math.sqrt(squared)
+    return factors
+
+
+# Небольшой парк: сетка с искажениями и разными радиусами роторов
+@pytest.fixture
+def farm():
+    rng = np.random.default_rng(5)
+    gx, gy = np.meshgrid(np.arange(4) * 250.0, np.arange(3) * 300.0)
+    x = gx.ravel() + rng.uniform(-40, 40, 12)
+    y = gy.ravel() + rng.uniform(-40, 40, 12)
+    return x, y, rng.uniform(15, 30, 12)
+
+
+# Векторный расчет по парам из сетки ячеек совпадает с перебором всех пар
+def test_sector_speed_factors_match_brute_force(farm):
+    x, y, radius = farm
+    directions = np.arange(0, 360, 7.5)
+    factors = sector_speed_factors(x, y, radius, directions, 0.75, 0.05, min_deficit=1e-9)
+    expected = brute_force_factors(x, y, radius, directions, 0.75, 0.05)
+    np.testing.assert_allclose(factors, expected, rtol=1e-10, atol=1e-12)
+    assert factors.min() < 0.9
+
+
+# Выработка парка совпадает с почасовым расчетом по wind_power с коэффициентом сектора
+def test_farm_energy_matches_scalar_loop(farm):
+    x, y, radius = farm
+    rng = np.random.default_rng(8)
+    speeds = rng.weibull(2, 60) * 8
+    directions = rng.uniform(0, 360, 60)
+    result = calculate_farm_energy(x, y, speeds, directions, radius, 0.9, 0.95, n_directions=12,
+                                   min_deficit=1e-9, chunk_size=17)
+    factors = brute_force_factors(x, y, radius, np.arange(12) * 30.0, BETZ_THRUST_COEFFICIENT, 0.075)
+
+    energy = np.zeros(len(x))
+    free_energy = np.zeros(len(x))
+    for speed, direction in zip(speeds, directions):
+        sector = round(direction / 30) % 12
+        for turbine in range(len(x)):
+            energy[turbine] += wind_power(speed * factors[sector, turbine], radius[turbine], 0.9, 0.95) / 1000
+            free_energy[turbine] += wind_power(speed, radius[turbine], 0.9, 0.95) / 1000
+    np.testing.assert_allclose(result['energy'], energy, rtol=1e-10)
+    np.testing.assert_allclose(result['free_energy'], free_energy, rtol=1e-12)
+    assert result['wake_loss'] == pytest.approx(1 - energy.sum() / free_energy.sum(), rel=1e-9)
+
+
+# Две ВЭУ на одной линии с ветром: у нижней по потоку при полном перекрытии
+# коэффициент 1 − 2a / (1 + kx/r)², верхняя по потоку следом не затеняется
+def test_two_turbines_in_line():
+    radius, distance, wake_decay = 20.0, 400.0, 0.075
+    # Ветер с севера (0°): ВЭУ 1 южнее ВЭУ 0 на distance
+    factors = sector_speed_factors([0.0, 0.0], [0.0, -distance], radius, [0.0, 180.0], wake_decay=wake_decay)
+    induction = (1 - math.sqrt(1 - BETZ_THRUST_COEFFICIENT)) / 2
+    assert induction == pytest.approx(1 / 3)
+    downstream = 1 - 2 * induction / (1 + wake_decay * distance / radius) ** 2
+    np.testing.assert_allclose(factors, [[1.0, downstream], [downstream, 1.0]], rtol=1e-12)
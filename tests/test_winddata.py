@@ -0,0 +1,33 @@
+import numpy as np
+
+from calcveu_winddata import load_wind_data, read_wind_csv
+
+
+def write_log(path, lines):
+    path.write_text("time,speed\n" + "\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+# Пустые и нечисловые скорости пропускаются и подсчитываются, остальные строки сохраняются
+def test_read_wind_csv_skips_missing_speeds(tmp_path):
+    path = write_log(tmp_path / "log.csv", ["2024-03-20 00:00:00,5.5", "2024-03-20 00:10:00,",
+                                            "2024-03-20 00:20:00,н/д", "2024-03-20 00:30:00,7",
+                                            "2024-03-20 00:40:00"])
+    statistics = {}
+    chunks = list(read_wind_csv(path, chunk_size=2, statistics=statistics))
+    timestamps = np.concatenate([chunk[0] for chunk in chunks])
+    speeds = np.concatenate([chunk[1] for chunk in chunks])
+    assert statistics["skipped"] == 3
+    np.testing.assert_array_equal(speeds, [5.5, 7.0])
+    assert (timestamps[1] - timestamps[0]) == 1800
+
+
+# Двоичный кэш совпадает с разбором CSV и используется повторно
+def test_load_wind_data_cache(tmp_path):
+    path = write_log(tmp_path / "log.csv", [f"{1700000000 + 600 * i},{i % 17 * 0.5}" for i in range(1000)])
+    timestamps, speeds = load_wind_data(path, chunk_size=300)
+    assert len(speeds) == 1000
+    assert timestamps[0].astype(np.int64) == 1700000000
+    np.testing.assert_allclose(speeds[:20], [i % 17 * 0.5 for i in range(20)])
+    again = load_wind_data(path)
+    np.testing.assert_array_equal(again[1], speeds)